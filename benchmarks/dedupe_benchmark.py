@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cnbc_crawler.crawler import merge_page_logs, remove_duplicates_id, remove_file_that_not_in_info  # noqa: E402
+
+# 중복 제거/정리 단계가 기록 수에 선형으로 늘어나는지 확인한다.
+#   python benchmarks/dedupe_benchmark.py --sizes 1000 10000 100000
+# 기록당 시간(us/record)이 크기와 관계없이 비슷하면 선형이다.
+# --legacy 를 주면 예전 리스트 조회 방식도 같이 잰다(10k 까지만, 그 이상은 너무 느림).
+
+LEGACY_MAX_SIZE = 10000
+
+
+def legacy_remove_duplicates_id(info_list: List[Dict[str, any]]) -> List[Dict[str, any]]:
+    id_list = []
+    new_info_list = []
+    for info in info_list:
+        if info['id'] not in id_list:
+            id_list.append(info['id'])
+            new_info_list.append(info)
+    return new_info_list
+
+
+def make_records(size: int, duplicate_ratio: float = 0.2) -> List[Dict[str, any]]:
+    unique = max(1, int(size * (1 - duplicate_ratio)))
+    records = []
+    for i in range(size):
+        id = str(100000000 + (i if i < unique else random.randrange(unique)))
+        records.append({
+            "title": f"title {i}", "url": f"https://www.cnbc.com/{id}.html", "_id": i,
+            "id": id, "datePublished": "2024-05-01T00:00:00+0000", "author": "author",
+        })
+    random.shuffle(records)
+    return records
+
+
+def timed(function, *args) -> float:
+    started = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - started
+
+
+def bench_size(size: int, legacy: bool, page_size: int = 10) -> Dict[str, float]:
+    records = make_records(size)
+    result = {"remove_duplicates_id": timed(remove_duplicates_id, records)}
+    if legacy and size <= LEGACY_MAX_SIZE:
+        result["legacy_remove_duplicates_id"] = timed(
+            legacy_remove_duplicates_id, records)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # 페이지 로그 병합
+        log_dir = os.path.join(temp_dir, "info_logs")
+        os.makedirs(log_dir)
+        log_paths = []
+        for page, start in enumerate(range(0, size, page_size * 100)):
+            path = os.path.join(log_dir, f"kw_{page}.json")
+            with open(path, 'w') as f:
+                json.dump(records[start:start + page_size * 100], f)
+            log_paths.append(path)
+        result["merge_page_logs"] = timed(merge_page_logs, log_paths)
+
+        # 기사 파일 정리: 기록의 10% 는 info 에 없는 파일
+        articles_dir = os.path.join(temp_dir, "articles")
+        os.makedirs(articles_dir)
+        for info in records:
+            open(os.path.join(articles_dir, f"{info['id']}.txt"), 'w').close()
+        keep = remove_duplicates_id(records)
+        keep = keep[:int(len(keep) * 0.9)]
+        result["remove_file_that_not_in_info"] = timed(
+            remove_file_that_not_in_info, keep, articles_dir)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that dedupe and reconciliation scale linearly")
+    parser.add_argument("--sizes", nargs="*", type=int,
+                        default=[1000, 10000, 100000])
+    parser.add_argument("--legacy", action="store_true",
+                        help="also time the old list-membership dedupe (up to 10k)")
+    args = parser.parse_args()
+
+    random.seed(0)
+    print(f"{'records':>10}  {'step':<32}{'seconds':>10}{'us/record':>12}")
+    stdout = sys.stdout
+    for size in args.sizes:
+        sys.stdout = open(os.devnull, 'w')  # remove_file_that_not_in_info 의 출력 숨김
+        try:
+            result = bench_size(size, args.legacy)
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+        for step, seconds in result.items():
+            print(f"{size:>10}  {step:<32}{seconds:>10.4f}{seconds / size * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
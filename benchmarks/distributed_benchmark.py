@@ -0,0 +1,120 @@
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cnbc_crawler.corpus_reader import CorpusReader  # noqa: E402
+from cnbc_crawler.work_queue import WorkQueue  # noqa: E402
+
+# mock_server.py 하나에 distributed coordinator 하나와 worker 프로세스 여러 개를 붙여서 작업자 수에 따른 처리량을 잰다.
+# 작업자마다 concurrency 한도가 따로라서(컴퓨터 / IP 마다 한도가 있는 것과 같다) 작업자 수에 거의 비례해서 빨라져야 한다.
+#   python benchmarks/distributed_benchmark.py --keywords Amazon:600 Apple:400 --workers 1 2 4 --latency-ms 200
+#   python benchmarks/distributed_benchmark.py ... --kill-one  # 작업자 하나를 중간에 죽여서 임대 만료 후 이어받는지 확인
+MOCK_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_server.py")
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_mock_server(args) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, MOCK_SERVER, "--port", "0", "--keywords", *args.keywords,
+                             "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+                             "--error-rate", str(args.error_rate), "--seed", str(args.seed)],
+                            stdout=subprocess.PIPE, text=True)
+
+
+def run_cluster(args, api_url: str, workers: int) -> Dict[str, any]:
+    run_dir = tempfile.mkdtemp(prefix="cnbc_distributed_")
+    queue_path = os.path.join(run_dir, "queue.sqlite")
+    output_dir = os.path.join(run_dir, "output")
+    env = {**os.environ, "CNBC_QUERYLY_API_URL": api_url, "PYTHONPATH": PACKAGE_DIR}
+    # mock 서버의 가장 오래된 기사보다 하루 이른 날짜까지 받는다(= 모든 페이지).
+    largest = max(int(value.partition(":")[2] or 100) for value in args.keywords)
+    target_date = datetime(2024, 5, 20) - timedelta(hours=6 * largest) - timedelta(days=1)
+    log = open(os.path.join(run_dir, "log.txt"), 'w')
+    started = time.perf_counter()
+    coordinator = subprocess.Popen(
+        [sys.executable, "-m", "cnbc_crawler.distributed", "coordinator", "--queue", queue_path,
+         "--output", output_dir, "--keywords", *[value.partition(":")[0] for value in args.keywords],
+         "--target-date", target_date.strftime('%Y-%m-%d'), "--pages-per-task", str(args.pages_per_task),
+         "--concurrency", str(args.concurrency), "--rate-limit", "0", "--parser-backend", args.parser_backend,
+         "--article-store", args.article_store],
+        env=env, stdout=log, stderr=subprocess.STDOUT)
+    worker_processes = [subprocess.Popen(
+        [sys.executable, "-m", "cnbc_crawler.distributed", "worker", "--queue", queue_path,
+         "--work-dir", os.path.join(run_dir, f"worker_{index}"), "--lease", str(args.lease)],
+        env=env, stdout=log, stderr=subprocess.STDOUT) for index in range(workers)]
+    try:
+        if args.kill_one and workers > 1:
+            time.sleep(args.kill_after)
+            worker_processes[0].kill()
+        if coordinator.wait() != 0:
+            raise Exception(f"Coordinator failed (see {log.name})")
+        elapsed = time.perf_counter() - started
+        for process in worker_processes:
+            process.wait()
+        with WorkQueue(queue_path) as queue:
+            keywords = queue.get_keywords()
+            counts = queue.counts()
+        with CorpusReader(output_dir) as reader:
+            texts = sum(1 for _ in reader)
+    finally:
+        for process in [coordinator, *worker_processes]:
+            if process.poll() is None:
+                process.kill()
+        log.close()
+        if not args.keep:
+            shutil.rmtree(run_dir, ignore_errors=True)
+    articles = sum(state["articles"] or 0 for state in keywords.values())
+    return {"workers": workers, "articles": articles, "texts": texts, "seconds": elapsed,
+            "articles_per_sec": articles / elapsed if elapsed else 0.0, "tasks": counts,
+            "keywords": {keyword: state["status"] for keyword, state in keywords.items()}}
+
+
+def print_results(results: List[Dict[str, any]]):
+    # speedup 은 작업자 수가 가장 적은 실행과 비교한다(실행이 하나뿐이면 비교할 대상이 없다).
+    print(f"\n{'workers':>8}{'articles':>10}{'texts':>8}{'seconds':>10}{'articles/sec':>14}{'speedup':>9}")
+    base = min(results, key=lambda result: result["workers"]) if len(results) > 1 else None
+    for result in results:
+        speedup = "n/a"
+        if base is not None and base["articles_per_sec"]:
+            speedup = f"{result['articles_per_sec'] / base['articles_per_sec']:.2f}"
+        print(f"{result['workers']:>8}{result['articles']:>10}{result['texts']:>8}{result['seconds']:>10.2f}"
+              f"{result['articles_per_sec']:>14.1f}{speedup:>9}")
+        print(f"{'':>8}tasks {result['tasks']} keywords {result['keywords']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed crawl benchmark: coordinator + N worker processes")
+    parser.add_argument("--keywords", nargs="*", default=["Amazon:600", "Apple:400", "Netflix:200"])
+    parser.add_argument("--workers", nargs="*", type=int, default=[1, 2, 4])
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pages-per-task", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8, help="download concurrency per worker")
+    parser.add_argument("--parser-backend", default="selectolax")
+    parser.add_argument("--article-store", default="files")
+    parser.add_argument("--lease", type=float, default=10)
+    parser.add_argument("--kill-one", action="store_true", help="kill the first worker after --kill-after seconds")
+    parser.add_argument("--kill-after", type=float, default=3)
+    parser.add_argument("--keep", action="store_true", help="keep the run folders")
+    args = parser.parse_args()
+
+    mock = start_mock_server(args)
+    try:
+        api_url = mock.stdout.readline().strip().split("=", 1)[1]
+        results = [run_cluster(args, api_url, workers) for workers in args.workers]
+    finally:
+        mock.terminate()
+        mock.wait()
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cnbc_crawler import fetch_engine, http_client, parse_pipeline, queryly  # noqa: E402
+from cnbc_crawler.config import CrawlConfig  # noqa: E402
+from cnbc_crawler.session import CrawlSession  # noqa: E402
+
+# mock_server.py 를 별도 프로세스로 띄우고 main.py 와 같은 진입점(CrawlConfig -> CrawlSession.crawl)으로
+# 전체 크롤링을 돌려서 성능을 잰다. 네트워크가 필요 없다.
+#   python benchmarks/e2e_benchmark.py --keywords Amazon:300 Apple:200 --latency-ms 20 --concurrency 8
+#   python benchmarks/e2e_benchmark.py ... --output result.json
+#   python benchmarks/e2e_benchmark.py ... --baseline result.json  # 기준보다 max_regression 이상 느리면 exit 1
+# 출력: articles/sec, 기사 요청 지연 p50/p99, parse / write CPU 시간, 최대 RSS.
+# parse_workers > 0 이면 파싱은 자식 프로세스에서 일어나므로 parse CPU 는 자식 프로세스 CPU 전체로 잰다.
+
+MOCK_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_server.py")
+
+
+def percentile(values: List[float], ratio: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(ratio * (len(values) - 1))))]
+
+
+def start_mock_server(args) -> subprocess.Popen:
+    command = [sys.executable, MOCK_SERVER, "--port", "0", "--keywords", *args.keywords,
+               "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+               "--error-rate", str(args.error_rate), "--seed", str(args.seed)]
+    if args.mock_rate_limit:
+        command += ["--rate-limit", str(args.mock_rate_limit)]
+    if args.mock_max_batch:
+        command += ["--max-batch", str(args.mock_max_batch)]
+    if args.mock_total_offset:
+        command += ["--total-offset", str(args.mock_total_offset)]
+    if args.mock_no_total:
+        command += ["--no-total"]
+    return subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+
+
+class Probe:
+    # 크롤러 함수를 감싸서 기사 요청 지연과 parse / write 스레드 CPU 시간을 모은다.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.fetch_latencies: List[float] = []
+        self.api_latencies: List[float] = []
+        self.parse_cpu = 0.0
+        self.write_cpu = 0.0
+
+    def wrap_send(self, client: http_client.HttpClient):
+        send = client._send
+
+        def timed_send(url, host, **kwargs):
+            started = time.perf_counter()
+            try:
+                return send(url, host, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                with self.lock:
+                    if urlsplit(url).path == urlsplit(queryly.QUERYLY_API_URL).path:
+                        self.api_latencies.append(elapsed)
+                    else:
+                        self.fetch_latencies.append(elapsed)
+        client._send = timed_send
+
+    def wrap_cpu(self, module, name: str, counter: str):
+        function = getattr(module, name)
+
+        def timed(*args, **kwargs):
+            started = time.thread_time()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = time.thread_time() - started
+                with self.lock:
+                    setattr(self, counter, getattr(self, counter) + elapsed)
+        setattr(module, name, timed)
+        return function
+
+    def restore(self, module, name: str, function):
+        setattr(module, name, function)
+
+
+def run_pipeline(args, api_url: str) -> Dict[str, any]:
+    queryly.QUERYLY_API_URL = api_url
+    project_dir = tempfile.mkdtemp(prefix="cnbc_bench_")
+    keyword_list = [value.partition(":")[0] for value in args.keywords]
+    config = CrawlConfig(
+        batch_size=args.batch_size,
+        max_batch_size=args.max_batch_size or None,
+        save_format=args.save_format,
+        article_store=args.article_store,
+        concurrency=args.concurrency,
+        pool_maxsize=max(args.concurrency, 10),
+        rate_limit=args.rate_limit,
+        parser_backend=args.parser_backend,
+        parse_workers=args.parse_workers,
+        keyword_workers=args.keyword_workers,
+        page_prefetch=args.page_prefetch,
+        keyword_shards=args.keyword_shards,
+        probe_cache_dir=None,
+        seen_index_path=os.path.join(project_dir, "seen_index.sqlite") if args.seen_index else None,
+        http_cache_dir=os.path.join(project_dir, ".http_cache") if args.http_cache else None,
+        progress_interval=3600,
+        queryly_key='benchmark',
+        additionalindexes='benchmark')
+    # mock 서버의 가장 오래된 기사보다 하루 이른 날짜까지 받는다(= 모든 페이지).
+    largest = max(int(value.partition(":")[2] or 100) for value in args.keywords)
+    target_date = datetime(2024, 5, 20) - timedelta(hours=6 * largest) - timedelta(days=1)
+
+    probe = Probe()
+    wrapped = [(fetch_engine, "extract_article_text", "parse_cpu"),
+               (fetch_engine, "write_article_text", "write_cpu"),
+               (parse_pipeline, "write_article_text", "write_cpu")]
+    originals = [(module, name, probe.wrap_cpu(module, name, counter)) for module, name, counter in wrapped]
+
+    children_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    self_before = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    try:
+        with CrawlSession(config, project_dir) as session:
+            probe.wrap_send(http_client.get_client())  # start() 가 만든 공유 클라이언트
+            progress = session.crawl(keyword_list, datetime(target_date.year, target_date.month, target_date.day))
+        elapsed = time.perf_counter() - started
+        self_after = resource.getrusage(resource.RUSAGE_SELF)
+        children_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    finally:
+        for module, name, function in originals:
+            probe.restore(module, name, function)
+        shutil.rmtree(project_dir, ignore_errors=True)
+
+    articles = sum(p["articles"] for p in progress.values())
+    children_cpu = (children_after.ru_utime - children_before.ru_utime) + \
+        (children_after.ru_stime - children_before.ru_stime)
+    return {
+        "keywords": {keyword: p["status"] for keyword, p in progress.items()},
+        "articles": articles,
+        "seconds": elapsed,
+        "articles_per_sec": articles / elapsed if elapsed else 0.0,
+        "fetch_requests": len(probe.fetch_latencies),
+        "fetch_p50_ms": percentile(probe.fetch_latencies, 0.5) * 1000,
+        "fetch_p99_ms": percentile(probe.fetch_latencies, 0.99) * 1000,
+        "api_requests": len(probe.api_latencies),
+        "api_p50_ms": percentile(probe.api_latencies, 0.5) * 1000,
+        "cpu_total_sec": (self_after.ru_utime - self_before.ru_utime) + (self_after.ru_stime - self_before.ru_stime),
+        "cpu_parse_sec": children_cpu if config.parse_workers > 0 else probe.parse_cpu,
+        "cpu_write_sec": probe.write_cpu,
+        # ru_maxrss 는 Linux 에서 KiB 단위
+        "peak_rss_mib": self_after.ru_maxrss / 1024,
+        "children_peak_rss_mib": children_after.ru_maxrss / 1024 if config.parse_workers > 0 else 0.0,
+        "http": http_client.get_stats(),
+    }
+
+
+def compare(result: Dict[str, any], baseline: Dict[str, any], max_regression: float) -> List[str]:
+    # 처리량이 줄었거나 p99 지연이 늘어난 항목을 돌려준다.
+    regressions = []
+    if result["articles_per_sec"] < baseline["articles_per_sec"] * (1 - max_regression):
+        regressions.append(f"articles/sec {result['articles_per_sec']:.1f} < "
+                           f"baseline {baseline['articles_per_sec']:.1f}")
+    if result["fetch_p99_ms"] > baseline["fetch_p99_ms"] * (1 + max_regression):
+        regressions.append(f"fetch p99 {result['fetch_p99_ms']:.1f}ms > "
+                           f"baseline {baseline['fetch_p99_ms']:.1f}ms")
+    return regressions
+
+
+def print_result(result: Dict[str, any]):
+    print(f"\n{'articles':<24}{result['articles']:>12}")
+    print(f"{'seconds':<24}{result['seconds']:>12.2f}")
+    print(f"{'articles/sec':<24}{result['articles_per_sec']:>12.1f}")
+    print(f"{'fetch p50 / p99 (ms)':<24}{result['fetch_p50_ms']:>12.1f}{result['fetch_p99_ms']:>10.1f}")
+    print(f"{'api requests / p50 (ms)':<24}{result['api_requests']:>12}{result['api_p50_ms']:>10.1f}")
+    print(f"{'cpu total (s)':<24}{result['cpu_total_sec']:>12.2f}")
+    print(f"{'cpu parse / write (s)':<24}{result['cpu_parse_sec']:>12.2f}{result['cpu_write_sec']:>10.2f}")
+    print(f"{'peak rss (MiB)':<24}{result['peak_rss_mib']:>12.1f}{result['children_peak_rss_mib']:>10.1f}")
+    print(f"{'keywords':<24}{json.dumps(result['keywords'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end crawl benchmark against the local mock server")
+    parser.add_argument("--keywords", nargs="*", default=["Amazon:300", "Apple:200", "Netflix:100"],
+                        help="keyword:article_count pairs served by the mock")
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--mock-rate-limit", type=float, default=None, help="mock server requests/sec before 429")
+    parser.add_argument("--mock-max-batch", type=int, default=None, help="mock server cuts Queryly responses to this size")
+    parser.add_argument("--mock-total-offset", type=int, default=0,
+                        help="mock server overstates metadata.total by this many results")
+    parser.add_argument("--mock-no-total", action="store_true", help="mock server leaves metadata.total out")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--max-batch-size", type=int, default=100, help="largest Queryly batch to try (0: batch size)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate-limit", type=float, default=None, help="crawler rate limit (None: off)")
+    parser.add_argument("--parser-backend", default="bs4")
+    parser.add_argument("--parse-workers", type=int, default=0)
+    parser.add_argument("--keyword-workers", type=int, default=1)
+    parser.add_argument("--keyword-shards", type=int, default=1)
+    parser.add_argument("--page-prefetch", type=int, default=2, help="Queryly pages fetched ahead (0: page by page)")
+    parser.add_argument("--save-format", default="json")
+    parser.add_argument("--article-store", default="files")
+    parser.add_argument("--http-cache", action="store_true")
+    parser.add_argument("--seen-index", action="store_true")
+    parser.add_argument("--output", default=None, help="write the result as json")
+    parser.add_argument("--baseline", default=None, help="compare with a previous --output json")
+    parser.add_argument("--max-regression", type=float, default=0.15)
+    args = parser.parse_args()
+
+    mock = start_mock_server(args)
+    try:
+        api_url = mock.stdout.readline().strip().split("=", 1)[1]
+        result = run_pipeline(args, api_url)
+    finally:
+        mock.terminate()
+        mock.wait()
+    print_result(result)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=4)
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(result, json.load(f), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
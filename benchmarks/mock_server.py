@@ -0,0 +1,283 @@
+import argparse
+import copy
+import glob
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+# 네트워크 없이 크롤러를 돌리기 위한 로컬 Queryly + CNBC 서버.
+#   python benchmarks/mock_server.py --port 8080 --keywords Amazon:500 Apple:200 --latency-ms 50
+#   CNBC_QUERYLY_API_URL=http://127.0.0.1:8080/cnbc/json.aspx python main.py
+# Queryly 응답은 fixtures/queryly/results_page.json 의 모양을 그대로 따라 키워드별 기사 수만큼 만들고,
+# 기사 HTML 은 fixtures/articles/*.html 을 돌려쓴다(ETag / If-None-Match 지원).
+# fixtures/recorded/<keyword>/ 에 record_fixtures.py 로 녹화한 응답이 있으면 그 키워드는 녹화본을 그대로 재생한다.
+# 지연(latency/jitter), 오류(503) 비율, 초당 요청 제한(429 + Retry-After)을 넣을 수 있다.
+# max_batch 를 주면 Queryly 응답을 그 개수에서 자른다(큰 batchsize 를 다 주지 않는 API 흉내).
+# total_offset 을 주면 metadata.total 을 실제보다 그만큼 크게 준다(None 이면 total 을 빼고 준다, 추정값인 total 흉내).
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+QUERYLY_PATH = "/cnbc/json.aspx"
+PRO_EVERY = 13    # 이 간격마다 Pro 기사(크롤러가 건너뜀)
+VIDEO_EVERY = 17  # 이 간격마다 video 기사(크롤러가 건너뜀)
+
+
+def recorded_article_name(url_path: str) -> str:
+    # 녹화한 기사 HTML 파일 이름: URL 경로의 '/' 를 '_' 로 바꾼다.
+    return url_path.strip("/").replace("/", "_")
+
+
+class MockCnbcServer:
+    def __init__(self, keywords: Dict[str, int], host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 rate_limit: Optional[float] = None, fixtures_dir: str = FIXTURES_DIR,
+                 seed: int = 0, newest: Optional[datetime] = None, hours_per_article: float = 6,
+                 max_batch: Optional[int] = None, total_offset: Optional[int] = 0):
+        self.keywords = keywords
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.newest = newest or datetime(2024, 5, 20, 12, tzinfo=timezone.utc)
+        self.hours_per_article = hours_per_article
+        self.max_batch = max_batch
+        self.total_offset = total_offset
+
+        with open(os.path.join(fixtures_dir, "queryly", "results_page.json"), 'r') as f:
+            self.template = json.load(f)
+        self.article_pages = []
+        for path in sorted(glob.glob(os.path.join(fixtures_dir, "articles", "*.html"))):
+            if os.path.basename(path).startswith("video_"):  # 본문이 없는 video 페이지는 기사로 돌려주지 않는다.
+                continue
+            with open(path, 'rb') as f:
+                self.article_pages.append(f.read())
+        self.recorded_dir = os.path.join(fixtures_dir, "recorded")
+
+        self.tokens = rate_limit or 0
+        self.token_time = time.monotonic()
+        self.token_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "api": 0, "articles": 0, "not_modified": 0,
+                      "errors": 0, "throttled": 0}
+
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.base_url = f"http://{host}:{self.server.server_port}"
+        self.thread = None
+
+    @property
+    def api_url(self) -> str:
+        return self.base_url + QUERYLY_PATH
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _count(self, name: str):
+        with self.stats_lock:
+            self.stats[name] += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.stats_lock:
+            return dict(self.stats)
+
+    def _take_token(self) -> bool:
+        if not self.rate_limit:
+            return True
+        with self.token_lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate_limit, self.tokens + (now - self.token_time) * self.rate_limit)
+            self.token_time = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+    def _delay(self):
+        with self.random_lock:
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            failed = self.random.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        return failed
+
+    # Queryly
+
+    def get_result(self, keyword: str, index: int) -> Dict[str, any]:
+        if index % VIDEO_EVERY == VIDEO_EVERY - 1:
+            result = copy.deepcopy(self.template["results"][2])
+        elif index % PRO_EVERY == PRO_EVERY - 1:
+            result = copy.deepcopy(self.template["results"][1])
+        else:
+            result = copy.deepcopy(self.template["results"][0])
+        published = self.newest - timedelta(hours=self.hours_per_article * index)
+        article_id = 100000000 + sum(map(ord, keyword)) * 100000 + index
+        result["cn:title"] = f"{keyword} article {index}"
+        result["cn:keyword"] = keyword
+        result["_id"] = article_id
+        result["@id"] = str(article_id)
+        result["datePublished"] = published.strftime('%Y-%m-%dT%H:%M:%S+0000')
+        slug = f"{published.strftime('%Y/%m/%d')}/{keyword.lower()}-article-{index}.html"
+        if "/video/" in result["url"]:
+            result["url"] = f"https://www.cnbc.com/video/{slug}"
+        else:
+            result["url"] = f"{self.base_url}/{slug}"
+        return result
+
+    def get_page(self, keyword: str, endindex: int, batch_size: int) -> Dict[str, any]:
+        recorded = os.path.join(self.recorded_dir, keyword, f"page_{endindex}.json")
+        if os.path.exists(recorded):
+            with open(recorded, 'r') as f:
+                data = json.load(f)
+            # 녹화한 페이지까지만 있는 것처럼 totalpage 를 줄인다.
+            recorded_pages = len(glob.glob(os.path.join(self.recorded_dir, keyword, "page_*.json")))
+            data["metadata"]["totalpage"] = min(data["metadata"].get("totalpage", recorded_pages), recorded_pages)
+            for result in data["results"]:
+                if result["url"].startswith("https://www.cnbc.com/") and "/video/" not in result["url"]:
+                    result["url"] = f"{self.base_url}/recorded/{keyword}{urlsplit(result['url']).path}"
+            return data
+        total = self.keywords.get(keyword, 0)
+        metadata = dict(self.template["metadata"], query=keyword, total=total,
+                        totalpage=-(-total // batch_size) if batch_size else 0,
+                        pagerequested=endindex // batch_size + 1 if batch_size else 1)
+        if self.total_offset is None:
+            del metadata["total"]
+        else:
+            metadata["total"] = total + self.total_offset
+        if self.max_batch:
+            batch_size = min(batch_size, self.max_batch)
+        results = [self.get_result(keyword, index)
+                   for index in range(endindex, min(endindex + batch_size, total))]
+        return {"metadata": metadata, "results": results}
+
+    # CNBC
+
+    def get_article(self, path: str) -> Optional[bytes]:
+        if path.startswith("/recorded/"):
+            _, _, keyword, rest = path.split("/", 3)
+            recorded = os.path.join(self.recorded_dir, keyword, "articles", recorded_article_name(rest) + ".html")
+            if not os.path.exists(recorded):
+                return None
+            with open(recorded, 'rb') as f:
+                return f.read()
+        if not path.endswith(".html") or not self.article_pages:
+            return None
+        index = int(hashlib.sha1(path.encode()).hexdigest(), 16) % len(self.article_pages)
+        return self.article_pages[index]
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, status: int, body: bytes = b"", headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                mock._count("requests")
+                if not mock._take_token():
+                    mock._count("throttled")
+                    self._send(429, b"Too Many Requests", {"Retry-After": "1"})
+                    return
+                if mock._delay():
+                    mock._count("errors")
+                    self._send(503, b"Service Unavailable")
+                    return
+
+                url = urlsplit(self.path)
+                if url.path == QUERYLY_PATH:
+                    mock._count("api")
+                    query = parse_qs(url.query)
+                    body = json.dumps(mock.get_page(
+                        query["query"][0], int(query["endindex"][0]), int(query["batchsize"][0]))).encode()
+                    self._send(200, body, {"Content-Type": "application/json; charset=utf-8"})
+                    return
+
+                body = mock.get_article(url.path)
+                if body is None:
+                    self._send(404, b"Not Found")
+                    return
+                mock._count("articles")
+                etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    mock._count("not_modified")
+                    self._send(304, b"", {"ETag": etag})
+                    return
+                self._send(200, body, {"Content-Type": "text/html; charset=utf-8", "ETag": etag})
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def parse_keywords(values: List[str]) -> Dict[str, int]:
+    # ["Amazon:500", "Apple"] -> {"Amazon": 500, "Apple": 100}
+    keywords = {}
+    for value in values:
+        name, _, count = value.partition(":")
+        keywords[name] = int(count) if count else 100
+    return keywords
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock Queryly + CNBC server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080, help="0 picks a free port")
+    parser.add_argument("--keywords", nargs="*", default=["samsung:100"],
+                        help="keyword:article_count pairs")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0, help="share of requests answered with 503")
+    parser.add_argument("--rate-limit", type=float, default=None, help="requests/sec before 429")
+    parser.add_argument("--max-batch", type=int, default=None, help="cut Queryly responses to this many results")
+    parser.add_argument("--total-offset", type=int, default=0,
+                        help="report metadata.total this much larger than the real count")
+    parser.add_argument("--no-total", action="store_true", help="leave metadata.total out of Queryly responses")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockCnbcServer(parse_keywords(args.keywords), args.host, args.port,
+                            args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate,
+                            args.rate_limit, args.fixtures, args.seed, max_batch=args.max_batch,
+                            total_offset=None if args.no_total else args.total_offset)
+    # 첫 줄은 e2e_benchmark.py 가 읽는다.
+    print(f"CNBC_QUERYLY_API_URL={server.api_url}", flush=True)
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"\nMock server stats: {server.get_stats()}", file=sys.stderr)
+        server.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
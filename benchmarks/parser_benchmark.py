@@ -0,0 +1,97 @@
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cnbc_crawler.extractors import available_backends, get_extractor  # noqa: E402
+
+# 저장된 기사 HTML 로 본문 추출 방식들을 비교한다.
+#   python benchmarks/parser_benchmark.py --fixtures <html 폴더> --repeat 20
+# 모든 방식의 결과 텍스트가 bs4 와 같은지 확인하고, 페이지당 파싱 시간과 최대 메모리를 출력한다.
+# 최대 메모리는 tracemalloc 기준(파이썬 힙)이라 lxml/selectolax 의 C 힙 사용량은 일부만 잡힌다.
+
+FIXTURES_DIR = os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), "fixtures", "articles")
+
+
+def run_extractor(extractor, html: str) -> str:
+    try:
+        return extractor(html)
+    except Exception as e:
+        return f"<error: {e}>"
+
+
+def load_fixtures(fixtures_dir: str) -> Dict[str, str]:
+    fixtures = {}
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, "*.html"))):
+        with open(path, 'r') as f:
+            fixtures[os.path.basename(path)] = f.read()
+    return fixtures
+
+
+def benchmark(backends: List[str], fixtures: Dict[str, str], repeat: int) -> List[Dict[str, any]]:
+    reference = {name: run_extractor(get_extractor("bs4"), html)
+                 for name, html in fixtures.items()}
+    results = []
+    for backend in backends:
+        extractor = get_extractor(backend)
+
+        mismatched = [name for name, html in fixtures.items()
+                      if run_extractor(extractor, html) != reference[name]]
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for html in fixtures.values():
+                run_extractor(extractor, html)
+        elapsed = time.perf_counter() - started
+
+        peak = 0
+        for html in fixtures.values():
+            tracemalloc.start()
+            run_extractor(extractor, html)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+        results.append({
+            "backend": backend,
+            "identical": len(fixtures) - len(mismatched),
+            "mismatched": mismatched,
+            "ms_per_page": elapsed / (repeat * len(fixtures)) * 1000,
+            "peak_kib": peak / 1024,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare article body extractors on saved HTML fixtures")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR,
+                        help="folder with saved article *.html files")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--backends", nargs="*", default=None,
+                        help="backends to compare (default: all installed)")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        print(f"No *.html fixtures found in {args.fixtures}")
+        sys.exit(1)
+
+    backends = args.backends or available_backends()
+    print(f"{len(fixtures)} fixtures, repeat {args.repeat}, "
+          f"backends: {', '.join(backends)}\n")
+    print(f"{'backend':<12}{'identical':>12}{'ms/page':>12}{'peak KiB':>12}")
+    for row in benchmark(backends, fixtures, args.repeat):
+        print(f"{row['backend']:<12}"
+              f"{row['identical']:>8}/{len(fixtures):<3}"
+              f"{row['ms_per_page']:>12.2f}{row['peak_kib']:>12.1f}")
+        for name in row["mismatched"]:
+            print(f"    output differs from bs4: {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import json
+import os
+import sys
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cnbc_crawler import http_client  # noqa: E402
+from cnbc_crawler.queryly import get_api_url  # noqa: E402
+from mock_server import FIXTURES_DIR, recorded_article_name  # noqa: E402
+
+# 실제 Queryly / CNBC 응답을 녹화해서 mock_server.py 가 재생할 수 있게 저장한다.
+#   python benchmarks/record_fixtures.py --keyword samsung --pages 3 --queryly-key <key> --additionalindexes <indexes>
+# fixtures/recorded/<keyword>/page_<endindex>.json 과 fixtures/recorded/<keyword>/articles/*.html 이 생긴다.
+
+
+def record(keyword: str, pages: int, batch_size: int, queryly_key: str, additionalindexes: str,
+           output_dir: str) -> int:
+    keyword_dir = os.path.join(output_dir, keyword)
+    articles_dir = os.path.join(keyword_dir, "articles")
+    os.makedirs(articles_dir, exist_ok=True)
+    recorded = 0
+    for page in range(pages):
+        endindex = page * batch_size
+        response = http_client.get(get_api_url(keyword, endindex, batch_size, queryly_key, additionalindexes))
+        if response.status_code != 200:
+            print(f"Stop at page {page + 1}: status {response.status_code}")
+            break
+        data = response.json()
+        with open(os.path.join(keyword_dir, f"page_{endindex}.json"), 'w') as f:
+            json.dump(data, f, indent=4)
+        for result in data["results"]:
+            url = result["url"]
+            if "/video/" in url or str(result.get("section", "")).replace(' ', '').startswith("Pro:"):
+                continue
+            article = http_client.get(url)
+            if article.status_code != 200:
+                continue
+            with open(os.path.join(articles_dir, recorded_article_name(urlsplit(url).path) + ".html"), 'wb') as f:
+                f.write(article.content)
+            recorded += 1
+        print(f"Recorded page {page + 1} ({len(data['results'])} results)")
+    return recorded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record live Queryly / CNBC responses as mock server fixtures")
+    parser.add_argument("--keyword", required=True)
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--queryly-key", required=True)
+    parser.add_argument("--additionalindexes", required=True)
+    parser.add_argument("--output", default=os.path.join(FIXTURES_DIR, "recorded"))
+    args = parser.parse_args()
+
+    http_client.configure({"rate_limit": 2})
+    count = record(args.keyword, args.pages, args.batch_size, args.queryly_key,
+                   args.additionalindexes, args.output)
+    print(f"Recorded {count} articles into {os.path.join(args.output, args.keyword)}")
+
+
+if __name__ == "__main__":
+    main()
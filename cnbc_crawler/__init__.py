@@ -0,0 +1 @@
+# CNBC 뉴스 크롤러 공용 모듈 (main.py, app.py 에서 사용)
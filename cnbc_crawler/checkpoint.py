@@ -0,0 +1,131 @@
+import json
+import os
+import threading
+import zlib
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+JOURNAL_FILE_NAME = "checkpoint.journal"
+READ_BLOCK_SIZE = 4096
+
+
+def _encode_record(record: Dict[str, any]) -> bytes:
+    # 한 줄 = "<crc32> <json>\n". crc 가 맞지 않거나 줄바꿈이 없는 줄은 쓰다가 끊긴 기록이다.
+    body = json.dumps(record, separators=(',', ':')).encode()
+    return f"{zlib.crc32(body):08x} ".encode() + body + b"\n"
+
+
+def _decode_line(line: bytes) -> Optional[Dict[str, any]]:
+    try:
+        crc, body = line.rstrip(b"\n").split(b" ", 1)
+        if int(crc, 16) != zlib.crc32(body):
+            return None
+        return json.loads(body)
+    except Exception:
+        return None
+
+
+class CheckpointJournal:
+    # 키워드별 append-only 체크포인트. 페이지 로그까지 저장한 뒤 (page, ids) 한 줄을 쓰고 fsync 한다.
+    # kill -9 로 중간에 끊겨도 마지막 완전한 줄까지가 완료된 페이지다.
+    def __init__(self, keyword_dir: str):
+        self.path = os.path.join(keyword_dir, JOURNAL_FILE_NAME)
+        self.lock = threading.Lock()
+        self.file = None
+
+    def _open(self):
+        if self.file is None:
+            is_new = not os.path.exists(self.path)
+            self._truncate_torn_tail()
+            self.file = open(self.path, 'ab')
+            if is_new:  # 새 파일의 디렉터리 항목도 디스크에 남긴다.
+                dir_fd = os.open(os.path.dirname(self.path), os.O_RDONLY)
+                try:
+                    os.fsync(dir_fd)
+                finally:
+                    os.close(dir_fd)
+        return self.file
+
+    def _read_last_record(self) -> Tuple[Optional[Dict[str, any]], int]:
+        # 파일 끝에서부터 블록 단위로 거꾸로 읽어 마지막으로 완전한 기록과 그 끝 위치를 찾는다.
+        # 줄바꿈으로 끝나지 않는 마지막 조각과 crc 가 틀린 줄은 건너뛴다.
+        if not os.path.exists(self.path):
+            return None, 0
+        with open(self.path, 'rb') as f:
+            position = f.seek(0, os.SEEK_END)
+            buffer = b""  # 파일의 [position, 끝) 구간
+            search_end = 0
+            while True:
+                line_end = buffer.rfind(b"\n", 0, search_end)
+                line_start = buffer.rfind(b"\n", 0, line_end) if line_end != -1 else -1
+                if (line_end == -1 or line_start == -1) and position > 0:
+                    read_size = min(READ_BLOCK_SIZE, position)
+                    position -= read_size
+                    f.seek(position)
+                    buffer = f.read(read_size) + buffer
+                    search_end += read_size
+                    continue
+                if line_end == -1:
+                    return None, 0
+                record = _decode_line(buffer[line_start + 1:line_end])
+                if record is not None:
+                    return record, position + line_end + 1
+                if line_start == -1:
+                    return None, 0
+                search_end = line_start + 1
+
+    def _truncate_torn_tail(self):
+        if not os.path.exists(self.path):
+            return
+        record, valid_end = self._read_last_record()
+        if os.path.getsize(self.path) != valid_end:
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_end)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def append_page(self, page: int, ids):
+        line = _encode_record({"page": page, "ids": [str(id) for id in ids]})
+        with self.lock:
+            f = self._open()
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def last_completed_page(self) -> int:
+        record, _ = self._read_last_record()
+        return record["page"] if record else 0
+
+    def iter_records(self) -> Iterator[Dict[str, any]]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                record = _decode_line(line)
+                if record is None:
+                    break
+                yield record
+
+    def completed_pages(self) -> Set[int]:
+        return {record["page"] for record in self.iter_records()}
+
+    def completed_ids(self) -> Set[str]:
+        ids = set()
+        for record in self.iter_records():
+            ids.update(record["ids"])
+        return ids
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def remove(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,122 @@
+import dataclasses
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from cnbc_crawler import http_cache, http_client, metrics
+from cnbc_crawler.extractors import DEFAULT_BACKEND, EXTRACTORS
+from cnbc_crawler.page_log import DEFAULT_FLUSH_INTERVAL, DEFAULT_FLUSH_PAGES
+from cnbc_crawler.page_search import DEFAULT_PROBE_CACHE_TTL
+from cnbc_crawler.parquet_store import DEFAULT_DICTIONARY_COLUMNS
+from cnbc_crawler.queryly import DEFAULT_ADDITIONALINDEXES, DEFAULT_QUERYLY_KEY
+from cnbc_crawler.queryly_pager import DEFAULT_MAX_BATCH_SIZE
+
+# main.py(CLI), cnbc_crawler.gui(PyQt), 노트북이 같이 쓰는 크롤링 설정.
+# 모듈 내부 함수들은 예전처럼 dict(setting)를 받으므로 to_setting() 으로 바꿔서 넘긴다.
+DEFAULT_KEYWORD_WORKERS = 4
+DEFAULT_LARGE_PAGE_THRESHOLD = 200  # 받을 페이지가 이보다 많으면 큰 키워드로 본다
+DEFAULT_MAX_LARGE_KEYWORDS = 1      # 동시에 돌 수 있는 큰 키워드 수
+DEFAULT_PROGRESS_INTERVAL = 30      # 진행 상황 출력 간격(초)
+DEFAULT_PAGE_PREFETCH = 2           # 키워드마다 미리 받아 둘 Queryly 결과 페이지 수
+
+SAVE_FORMATS = (None, "json", "excel", "parquet")
+ARTICLE_STORES = ("files", "packed", "shared")
+PRIVATE_KEYS = ("queryly_key", "additionalindexes")
+
+
+@dataclass
+class CrawlConfig:
+    # 저장
+    batch_size: int = 10  # 페이지 하나의 기사 수(페이지 번호, 페이지 로그, resume 의 기준)
+    max_batch_size: Optional[int] = DEFAULT_MAX_BATCH_SIZE  # Queryly 요청 한 번에 받을 최대 결과 수(None 이면 batch_size)
+    save_as_json: bool = True
+    save_format: Optional[str] = None  # "json" / "excel" / "parquet" (None 이면 save_as_json 을 따른다)
+    article_store: str = "files"       # "files" / "packed" / "shared"
+    article_compression: str = "zstd"  # packed / shared 세그먼트 압축: "zstd" / "none"
+    parquet_dictionary_columns: Tuple[str, ...] = DEFAULT_DICTIONARY_COLUMNS  # ()이면 dictionary 인코딩 안 함
+    page_log_flush_pages: int = DEFAULT_FLUSH_PAGES
+    page_log_flush_interval: float = DEFAULT_FLUSH_INTERVAL
+
+    # 네트워크
+    concurrency: int = 8
+    connect_timeout: float = http_client.DEFAULT_CONNECT_TIMEOUT
+    read_timeout: float = http_client.DEFAULT_READ_TIMEOUT
+    pool_maxsize: int = http_client.DEFAULT_POOL_MAXSIZE
+    http2: bool = False
+    rate_limit: Optional[float] = 5  # None 이면 속도 제한 없음
+    max_per_host: Optional[int] = None
+    max_page_retries: int = 3
+    page_prefetch: int = DEFAULT_PAGE_PREFETCH  # 0 이면 한 페이지의 기사가 모두 끝난 뒤 다음 페이지를 받는다
+    http_cache_dir: Optional[str] = None
+    http_cache_max_bytes: int = http_cache.DEFAULT_MAX_BYTES
+    http_cache_mode: str = http_cache.MODE_NORMAL
+    http_cache_fresh_for: float = http_cache.DEFAULT_FRESH_FOR
+
+    # 파싱
+    parser_backend: str = DEFAULT_BACKEND
+    parse_workers: int = 0  # 0 이면 다운로드 스레드에서 바로 파싱
+    parse_queue_size: int = 64
+
+    # 페이지 탐색 / 증분
+    probe_cache_dir: Optional[str] = None
+    probe_cache_ttl: float = DEFAULT_PROBE_CACHE_TTL
+    seen_index_path: Optional[str] = None
+    incremental: bool = False
+
+    # 전문 검색 인덱스(search_index): 경로를 주면 저장한 기사를 페이지마다 색인한다.
+    search_index_path: Optional[str] = None
+
+    # 키워드 스케줄링
+    keyword_workers: int = DEFAULT_KEYWORD_WORKERS
+    large_page_threshold: int = DEFAULT_LARGE_PAGE_THRESHOLD
+    max_large_keywords: int = DEFAULT_MAX_LARGE_KEYWORDS
+    progress_interval: float = DEFAULT_PROGRESS_INTERVAL
+    keyword_shards: int = 1  # 키워드 하나의 페이지 구간을 나눠 동시에 받을 조각 수(조각마다 최소 20페이지)
+
+    # 지표
+    metrics_port: Optional[int] = None
+    metrics_json_path: Optional[str] = None
+    metrics_json_interval: float = metrics.DEFAULT_JSON_INTERVAL
+
+    # Queryly
+    queryly_key: str = DEFAULT_QUERYLY_KEY
+    additionalindexes: str = DEFAULT_ADDITIONALINDEXES
+
+    def __post_init__(self):
+        if self.save_format not in SAVE_FORMATS:
+            raise Exception(f"Unknown save_format: {self.save_format} (json / excel / parquet)")
+        if self.article_store not in ARTICLE_STORES:
+            raise Exception(f"Unknown article_store: {self.article_store} ({' / '.join(ARTICLE_STORES)})")
+        if self.parser_backend not in EXTRACTORS:
+            raise Exception(f"Unknown parser backend: {self.parser_backend} (choose from {', '.join(EXTRACTORS)})")
+        if self.http_cache_mode not in (http_cache.MODE_NORMAL, http_cache.MODE_OFFLINE):
+            raise Exception(f"Unknown http cache mode: {self.http_cache_mode} (normal / offline)")
+        if self.batch_size < 1 or self.concurrency < 1:
+            raise Exception("batch_size and concurrency must be at least 1")
+        if self.max_batch_size is not None and self.max_batch_size < 1:
+            raise Exception("max_batch_size must be at least 1 (None: same as batch_size)")
+        if self.keyword_shards < 1:
+            raise Exception("keyword_shards must be at least 1")
+        if self.page_prefetch < 0:
+            raise Exception("page_prefetch must be 0 or more")
+        if self.incremental and not self.seen_index_path:
+            raise Exception("Incremental mode needs seen_index_path")
+
+    def replace(self, **changes) -> "CrawlConfig":
+        return dataclasses.replace(self, **changes)
+
+    def to_setting(self) -> Dict[str, any]:
+        # crawler / keyword_scheduler / http_client 가 쓰는 dict. Queryly 키는 private_key 아래에 둔다.
+        setting = dataclasses.asdict(self)
+        setting['private_key'] = {name: setting.pop(name) for name in PRIVATE_KEYS}
+        return setting
+
+    @classmethod
+    def from_setting(cls, setting: Dict[str, any]) -> "CrawlConfig":
+        # 예전 dict 설정을 읽는다. Queryly 키는 private_key 아래에 있어도(main.py) 평평하게 있어도(app.py) 된다.
+        # 설정에 없는 키(search_term, full_path 등)는 무시한다.
+        fields = {field.name for field in dataclasses.fields(cls)}
+        values = {name: value for name, value in setting.items() if name in fields}
+        for name, value in (setting.get('private_key') or {}).items():
+            if name in PRIVATE_KEYS:
+                values[name] = value
+        return cls(**values)
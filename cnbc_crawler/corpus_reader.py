@@ -0,0 +1,176 @@
+import mmap
+import os
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional, Union
+
+import pandas as pd
+
+from cnbc_crawler import corpus_store, shared_store
+from cnbc_crawler.page_log import read_page_log
+
+# 다운로드한 코퍼스(키워드 폴더 하나 또는 cnbc_news_* 실행 폴더 전체)를 (id, 기사 정보, 본문) 으로 읽는다.
+#   packed 저장(articles.seg)은 mmap 으로 열고 memoryview 조각을 돌려준다.
+#     compression="none" 세그먼트는 본문을 전혀 복사하지 않고, zstd 세그먼트는 압축 해제 결과만 새로 만든다.
+#   shared 저장(articles.refs)은 실행 폴더의 _shared 세그먼트를 같은 방식으로 읽는다.
+#   articles/<id>.txt 저장은 파일마다 한 번 읽는다.
+# 본문은 기본적으로 UTF-8 memoryview 이다. decode=True 이면 str 로 돌려준다.
+# memoryview 는 reader 를 닫기 전까지만 쓴다.
+INFO_EXTENSIONS = ('.parquet', '.json', '.xlsx')
+DateLike = Union[str, datetime, None]
+
+
+class Article(NamedTuple):
+    id: str
+    info: Dict[str, any]
+    text: Union[memoryview, str]
+
+
+def find_info_path(keyword_dir: str) -> Optional[str]:
+    keyword = os.path.basename(os.path.normpath(keyword_dir))
+    for ext in INFO_EXTENSIONS:
+        path = os.path.join(keyword_dir, f"info_{keyword}{ext}")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def find_keyword_dirs(path: str) -> List[str]:
+    # path 가 키워드 폴더면 그 폴더만, 실행 폴더면 info_<keyword> 가 있는(끝난) 키워드 폴더들
+    if find_info_path(path):
+        return [path]
+    return [os.path.join(path, name) for name in sorted(os.listdir(path))
+            if os.path.isdir(os.path.join(path, name)) and find_info_path(os.path.join(path, name))]
+
+
+def _to_timestamp(value: DateLike) -> Optional[pd.Timestamp]:
+    if value is None:
+        return None
+    timestamp = pd.Timestamp(value)
+    return timestamp.tz_localize("UTC") if timestamp.tzinfo is None else timestamp
+
+
+def load_info(keyword_dir: str, start_date: DateLike = None, end_date: DateLike = None) -> pd.DataFrame:
+    # 키워드의 info 를 읽고 start_date <= datePublished < end_date 인 행만 남긴다.
+    info_df = read_page_log(find_info_path(keyword_dir))
+    if info_df.empty or (start_date is None and end_date is None):
+        return info_df
+    published = pd.to_datetime(info_df['datePublished'], utc=True, format='%Y-%m-%dT%H:%M:%S%z')
+    mask = pd.Series(True, index=info_df.index)
+    if start_date is not None:
+        mask &= published >= _to_timestamp(start_date)
+    if end_date is not None:
+        mask &= published < _to_timestamp(end_date)
+    return info_df[mask]
+
+
+class _SegmentReader:
+    # 읽기 전용 mmap. 인덱스가 없으면 세그먼트를 훑어서 만든다.
+    def __init__(self, keyword_dir: str):
+        self.zstandard = None
+        segment_path = os.path.join(keyword_dir, corpus_store.SEGMENT_FILE_NAME)
+        index_path = os.path.join(keyword_dir, corpus_store.INDEX_FILE_NAME)
+        size = os.path.getsize(segment_path)
+        if os.path.exists(index_path):
+            self.index, _ = corpus_store.read_index(index_path, size)
+        else:
+            self.index = {id: (offset, length, compression) for id, offset, length, compression
+                          in corpus_store._iter_segment(segment_path)}
+        self.mmap = None
+        self.view = memoryview(b"")
+        if size:
+            with open(segment_path, 'rb') as f:
+                self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                self.mmap.madvise(mmap.MADV_SEQUENTIAL)
+            self.view = memoryview(self.mmap)
+
+    def read(self, id: str) -> memoryview:
+        offset, length, compression = self.index[id]
+        data = self.view[offset:offset + length]
+        if compression == "none":
+            return data
+        if self.zstandard is None:
+            self.zstandard = corpus_store._import_zstandard()
+            self.decompressor = self.zstandard.ZstdDecompressor()
+        return memoryview(self.decompressor.decompress(data))
+
+    def order(self, ids) -> List[str]:
+        # 세그먼트 위치 순서로 읽어서 mmap 을 앞에서부터 차례대로 훑는다.
+        return sorted((id for id in ids if id in self.index), key=lambda id: self.index[id][0])
+
+    def close(self):
+        self.view.release()
+        if self.mmap is not None:
+            try:
+                self.mmap.close()
+            except BufferError:  # 밖에서 아직 쓰고 있는 memoryview 가 있으면 GC 에 맡긴다.
+                pass
+
+
+class CorpusReader:
+    def __init__(self, path: str, start_date: DateLike = None, end_date: DateLike = None,
+                 decode: bool = False):
+        self.keyword_dirs = find_keyword_dirs(path)
+        self.start_date = start_date
+        self.end_date = end_date
+        self.decode = decode
+        self.segments: Dict[str, _SegmentReader] = {}
+
+    def keywords(self) -> List[str]:
+        return [os.path.basename(os.path.normpath(keyword_dir)) for keyword_dir in self.keyword_dirs]
+
+    def iter_keyword(self, keyword_dir: str) -> Iterator[Article]:
+        info_df = load_info(keyword_dir, self.start_date, self.end_date)
+        if info_df.empty:
+            return
+        infos = {str(info['id']): info for info in info_df.to_dict('records')}
+        if shared_store.exists(keyword_dir):
+            # 참조(id -> 본문 hash) 를 공용 세그먼트 위치 순서로 읽는다.
+            segment = self._get_segment(shared_store.get_shared_dir(keyword_dir))
+            refs = shared_store.read_keyword_refs(keyword_dir)
+            ids = [id for id in infos if refs.get(id) in segment.index]
+            for id in sorted(ids, key=lambda id: segment.index[refs[id]][0]):
+                yield self._article(id, infos[id], segment.read(refs[id]))
+            return
+        if corpus_store.exists(keyword_dir):
+            segment = self._get_segment(keyword_dir)
+            for id in segment.order(infos):
+                yield self._article(id, infos[id], segment.read(id))
+            return
+        articles_dir = os.path.join(keyword_dir, "articles")
+        for id, info in infos.items():
+            path = os.path.join(articles_dir, f"{id}.txt")
+            if not os.path.exists(path):
+                continue
+            with open(path, 'rb') as f:
+                yield self._article(id, info, memoryview(f.read()))
+
+    def _get_segment(self, segment_dir: str) -> _SegmentReader:
+        if segment_dir not in self.segments:
+            self.segments[segment_dir] = _SegmentReader(segment_dir)
+        return self.segments[segment_dir]
+
+    def _article(self, id: str, info: Dict[str, any], text: memoryview) -> Article:
+        return Article(id, info, str(text, 'utf-8') if self.decode else text)
+
+    def __iter__(self) -> Iterator[Article]:
+        for keyword_dir in self.keyword_dirs:
+            yield from self.iter_keyword(keyword_dir)
+
+    def close(self):
+        for segment in self.segments.values():
+            segment.close()
+        self.segments = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def iter_corpus(path: str, start_date: DateLike = None, end_date: DateLike = None,
+                decode: bool = True) -> Iterator[Article]:
+    # 간단히 쓰는 용도: 본문을 str 로 돌려준다.
+    with CorpusReader(path, start_date, end_date, decode) as reader:
+        yield from reader
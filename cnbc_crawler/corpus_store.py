@@ -0,0 +1,279 @@
+import argparse
+import os
+import struct
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# 키워드별 기사 본문을 articles/<id>.txt 파일 대신 압축된 세그먼트 파일 하나에 이어 붙여 저장한다.
+#   articles.seg : [헤더(magic, id 길이, 데이터 길이) + id + 본문] 이 이어진 append-only 파일
+#                  본문은 zstd 로 압축(magic CNA1)하거나, compression="none" 이면 UTF-8 그대로(magic CNA0) 저장한다.
+#                  압축하지 않은 세그먼트는 corpus_reader 가 mmap 에서 복사 없이 바로 읽을 수 있다.
+#   articles.idx : "<id>\t<데이터 위치>\t<데이터 길이>\t<zstd|none>\n" 줄이 이어진 append-only 인덱스
+# 같은 id 를 다시 저장하면 인덱스의 마지막 줄이 이긴다. compact() 가 필요 없는 기록을 정리한다.
+# zstandard 는 zstd 압축을 쓸 때만 필요하다.
+SEGMENT_FILE_NAME = "articles.seg"
+INDEX_FILE_NAME = "articles.idx"
+RECORD_MAGICS = {"zstd": b"CNA1", "none": b"CNA0"}
+RECORD_COMPRESSIONS = {magic: compression for compression, magic in RECORD_MAGICS.items()}
+RECORD_HEADER = struct.Struct("<4sHI")
+DEFAULT_COMPRESSION = "zstd"
+DEFAULT_COMPRESSION_LEVEL = 3
+
+
+def _import_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise Exception("zstandard is required for the packed article store: pip install zstandard")
+    return zstandard
+
+
+def exists(keyword_dir: str) -> bool:
+    return os.path.exists(os.path.join(keyword_dir, SEGMENT_FILE_NAME))
+
+
+def _iter_segment(path: str, start: int = 0) -> Iterator[Tuple[str, int, int, str]]:
+    # 세그먼트를 start(기록의 시작 위치)부터 읽어 (id, 데이터 위치, 데이터 길이, 압축 방식) 을 돌려준다.
+    # 끊긴 마지막 기록에서 멈춘다.
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        f.seek(start)
+        offset = start
+        while offset + RECORD_HEADER.size <= size:
+            magic, id_length, data_length = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))
+            data_offset = offset + RECORD_HEADER.size + id_length
+            if magic not in RECORD_COMPRESSIONS or data_offset + data_length > size:
+                return
+            id = f.read(id_length).decode()
+            yield id, data_offset, data_length, RECORD_COMPRESSIONS[magic]
+            f.seek(data_length, os.SEEK_CUR)
+            offset = data_offset + data_length
+
+
+def read_index(index_path: str, segment_size: int) -> Tuple[Dict[str, Tuple[int, int, str]], int]:
+    # 인덱스를 읽어 ({id: (데이터 위치, 데이터 길이, 압축 방식)}, 유효한 마지막 줄의 끝 위치) 를 돌려준다.
+    # 세그먼트보다 뒤를 가리키거나 끊긴 줄에서 멈춘다(세그먼트를 먼저 쓰고 인덱스를 쓰기 때문).
+    index = {}
+    valid_end = 0
+    with open(index_path, 'rb') as f:
+        for line in f:
+            try:
+                id, offset, length, compression = line.decode().rstrip("\n").split("\t")
+                offset, length = int(offset), int(length)
+            except Exception:
+                break
+            if not line.endswith(b"\n") or offset + length > segment_size or \
+                    compression not in RECORD_MAGICS:
+                break
+            index[id] = (offset, length, compression)
+            valid_end += len(line)
+    return index, valid_end
+
+
+class PackedArticleStore:
+    # articles_dir 대신 fetch_engine / ParsePipeline 에 넘길 수 있다(put 으로 저장).
+    # put/get 은 여러 스레드에서 불러도 된다. 여러 프로세스가 같은 store 에 동시에 쓰면 안 된다.
+    def __init__(self, keyword_dir: str, compression: str = DEFAULT_COMPRESSION,
+                 level: int = DEFAULT_COMPRESSION_LEVEL):
+        if compression not in RECORD_MAGICS:
+            raise Exception(f"Unknown compression: {compression} (zstd / none)")
+        self.compression = compression
+        self.zstandard = None
+        self.keyword_dir = keyword_dir
+        self.segment_path = os.path.join(keyword_dir, SEGMENT_FILE_NAME)
+        self.index_path = os.path.join(keyword_dir, INDEX_FILE_NAME)
+        self.level = level
+        self.lock = threading.Lock()
+        self.local = threading.local()  # zstd (de)compressor 는 스레드마다 하나씩
+        os.makedirs(keyword_dir, exist_ok=True)
+        self.index: Dict[str, Tuple[int, int, str]] = {}
+        self._open()
+
+    def _open(self):
+        # 인덱스가 가리키는 마지막 기록 뒤를 훑어서 인덱스에 남기지 못한 기록은 되살리고(인덱스가 없으면 처음부터),
+        # 끊긴 마지막 기록은 잘라낸다. 자르지 않으면 새 기록이 끊긴 기록 뒤에 붙어서 세그먼트를 훑을 때 보이지 않는다.
+        if not os.path.exists(self.segment_path):
+            open(self.segment_path, 'ab').close()
+        segment_size = os.path.getsize(self.segment_path)
+        self.index = {}
+        if os.path.exists(self.index_path):
+            self._load_index(segment_size)
+        valid_end = max((offset + length for offset, length, compression in self.index.values()), default=0)
+        tail = list(_iter_segment(self.segment_path, valid_end))
+        if tail:
+            valid_end = tail[-1][1] + tail[-1][2]
+        if valid_end < segment_size:
+            os.truncate(self.segment_path, valid_end)
+        self.segment = open(self.segment_path, 'ab')
+        self.index_file = open(self.index_path, 'ab')
+        for id, offset, length, compression in tail:
+            self.index[id] = (offset, length, compression)
+            self.index_file.write(f"{id}\t{offset}\t{length}\t{compression}\n".encode())
+        self.index_file.flush()
+        self.reader_fd = os.open(self.segment_path, os.O_RDONLY)
+
+    def _load_index(self, segment_size: int):
+        self.index, valid_end = read_index(self.index_path, segment_size)
+        if valid_end != os.path.getsize(self.index_path):
+            with open(self.index_path, 'r+b') as f:
+                f.truncate(valid_end)
+
+    def _compressor(self):
+        if not hasattr(self.local, "compressor"):
+            self.zstandard = self.zstandard or _import_zstandard()
+            self.local.compressor = self.zstandard.ZstdCompressor(level=self.level)
+        return self.local.compressor
+
+    def _decompressor(self):
+        if not hasattr(self.local, "decompressor"):
+            self.zstandard = self.zstandard or _import_zstandard()
+            self.local.decompressor = self.zstandard.ZstdDecompressor()
+        return self.local.decompressor
+
+    def decode_data(self, data, compression: str) -> bytes:
+        # data 는 bytes 또는 memoryview. 압축하지 않은 기록은 그대로 돌려준다.
+        if compression == "none":
+            return data
+        return self._decompressor().decompress(data)
+
+    def put(self, id: str, text: str):
+        id = str(id)
+        id_bytes = id.encode()
+        data = text.encode()
+        if self.compression == "zstd":
+            data = self._compressor().compress(data)
+        magic = RECORD_MAGICS[self.compression]
+        with self.lock:
+            offset = self.segment.tell() + RECORD_HEADER.size + len(id_bytes)
+            self.segment.write(RECORD_HEADER.pack(magic, len(id_bytes), len(data)) + id_bytes + data)
+            self.segment.flush()
+            self.index_file.write(f"{id}\t{offset}\t{len(data)}\t{self.compression}\n".encode())
+            self.index_file.flush()
+            self.index[id] = (offset, len(data), self.compression)
+
+    def get_bytes(self, id: str) -> bytes:
+        offset, length, compression = self.index[str(id)]
+        return self.decode_data(os.pread(self.reader_fd, length, offset), compression)
+
+    def get(self, id: str) -> str:
+        return self.get_bytes(id).decode()
+
+    def __contains__(self, id) -> bool:
+        return str(id) in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def ids(self) -> Iterable[str]:
+        return list(self.index)
+
+    def _ordered_index(self) -> List[Tuple[str, Tuple[int, int, str]]]:
+        # 인덱스의 (마지막) 기록들을 세그먼트 위치 순서로. 덮어쓴 예전 기록은 들어 있지 않다.
+        return sorted(self.index.items(), key=lambda item: item[1][0])
+
+    def iter_articles(self) -> Iterator[Tuple[str, str]]:
+        # 세그먼트 순서대로 (id, 본문) 을 읽는다.
+        self.segment.flush()
+        with open(self.segment_path, 'rb') as f:
+            for id, (offset, length, compression) in self._ordered_index():
+                f.seek(offset)
+                yield id, self.decode_data(f.read(length), compression).decode()
+
+    def compact(self, keep_ids: Optional[Iterable[str]] = None):
+        # keep_ids 에 있는 id 의 마지막 기록만 남기고 세그먼트와 인덱스를 새로 쓴다.
+        keep_ids = None if keep_ids is None else {str(id) for id in keep_ids}
+        with self.lock:
+            self.segment.flush()
+            temp_segment_path = self.segment_path + ".tmp"
+            temp_index_path = self.index_path + ".tmp"
+            new_index = {}
+            with open(self.segment_path, 'rb') as source, \
+                    open(temp_segment_path, 'wb') as segment, open(temp_index_path, 'w') as index_file:
+                for id, (offset, length, compression) in self._ordered_index():
+                    if keep_ids is not None and id not in keep_ids:
+                        continue
+                    id_bytes = id.encode()
+                    source.seek(offset)
+                    new_offset = segment.tell() + RECORD_HEADER.size + len(id_bytes)
+                    segment.write(RECORD_HEADER.pack(RECORD_MAGICS[compression], len(id_bytes), length) + id_bytes)
+                    segment.write(source.read(length))
+                    index_file.write(f"{id}\t{new_offset}\t{length}\t{compression}\n")
+                    new_index[id] = (new_offset, length, compression)
+                segment.flush()
+                os.fsync(segment.fileno())
+                index_file.flush()
+                os.fsync(index_file.fileno())
+            removed = len(self.index) - len(new_index)
+            self._close_files()
+            os.replace(temp_segment_path, self.segment_path)
+            os.replace(temp_index_path, self.index_path)
+            self._open()
+        return removed
+
+    def export_txt(self, articles_dir: str, ids: Optional[Iterable[str]] = None) -> int:
+        # 예전 형식(articles/<id>.txt)으로 내보낸다.
+        os.makedirs(articles_dir, exist_ok=True)
+        count = 0
+        for id in (self.ids() if ids is None else ids):
+            with open(os.path.join(articles_dir, f'{id}.txt'), 'w') as f:
+                f.write(self.get(id))
+            count += 1
+        return count
+
+    def flush(self):
+        with self.lock:
+            self.segment.flush()
+            os.fsync(self.segment.fileno())
+            self.index_file.flush()
+            os.fsync(self.index_file.fileno())
+
+    def _close_files(self):
+        self.segment.close()
+        self.index_file.close()
+        os.close(self.reader_fd)
+
+    def close(self):
+        if self.segment.closed:
+            return
+        self.flush()
+        self._close_files()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def export_run(path: str) -> int:
+    # 키워드 폴더 또는 cnbc_news_* 폴더 안의 packed / shared 저장소를 모두 <keyword>/articles/<id>.txt 로 내보낸다.
+    from cnbc_crawler import shared_store  # shared_store 가 이 모듈을 import 하므로 여기서 불러온다.
+
+    def is_keyword_dir(keyword_dir):
+        if os.path.basename(os.path.normpath(keyword_dir)) == shared_store.SHARED_DIR_NAME:
+            return False
+        return exists(keyword_dir) or shared_store.exists(keyword_dir)
+
+    keyword_dirs = [path] if is_keyword_dir(path) else \
+        [os.path.join(path, name) for name in sorted(os.listdir(path)) if is_keyword_dir(os.path.join(path, name))]
+    total = 0
+    for keyword_dir in keyword_dirs:
+        articles_dir = os.path.join(keyword_dir, "articles")
+        if shared_store.exists(keyword_dir):
+            shared = shared_store.SharedArticleStore(os.path.dirname(os.path.normpath(keyword_dir)))
+            with shared.keyword_refs(keyword_dir) as refs:
+                count = refs.export_txt(articles_dir)
+            shared.close()
+        else:
+            with PackedArticleStore(keyword_dir) as store:
+                count = store.export_txt(articles_dir)
+        print(f"Export {count} articles: {keyword_dir}")
+        total += count
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export packed article stores to articles/<id>.txt")
+    parser.add_argument("path", help="keyword folder or cnbc_news_* folder")
+    args = parser.parse_args()
+    export_run(args.path)
@@ -0,0 +1,594 @@
+import json
+import os
+import shutil
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+from tqdm import tqdm
+
+from cnbc_crawler import http_cache, http_client, keyword_shards, metrics
+from cnbc_crawler.checkpoint import CheckpointJournal
+from cnbc_crawler.config import CrawlConfig
+from cnbc_crawler.corpus_store import PackedArticleStore
+from cnbc_crawler.fetch_engine import fetch_article_list, read_article_text
+from cnbc_crawler.page_log import (PageLogWriter, count_page_log, get_page_log_path, read_page_log,
+                                   save_page_log)
+from cnbc_crawler.parquet_store import save_parquet
+from cnbc_crawler.shared_store import SharedArticleStore
+from cnbc_crawler.page_search import PageProbeCache, get_closest_page, get_source_id
+from cnbc_crawler.queryly import get_api_url
+from cnbc_crawler.queryly_pager import QuerylyPager, request_results
+
+# CrawlConfig 기본값을 dict 로 바꾼 것(예전 코드와 노트북은 {**DEFAULT_SETTING, ...} 로 쓴다).
+DEFAULT_SETTING = CrawlConfig().to_setting()
+
+
+def get_api(search_term: str, page: int, setting: Dict[str, any]):
+    batch_size = setting['batch_size']
+    return get_api_url(search_term, page*batch_size, batch_size,
+                       setting['private_key']['queryly_key'],
+                       setting['private_key']['additionalindexes'])
+
+
+def get_save_format(setting: Dict[str, any]) -> str:
+    # save_format 이 없으면 예전 설정(save_as_json)을 따른다.
+    if setting.get("save_format"):
+        return setting["save_format"]
+    return "json" if setting["save_as_json"] else "excel"
+
+
+def save_array(array, file_name, save_format="json"):
+    # save_format: "json" / "excel" / "parquet" (예전처럼 True=json, False=excel 도 가능)
+    if save_format is True:
+        save_format = "json"
+    elif save_format is False:
+        save_format = "excel"
+
+    if save_format == "json":  # json으로 저장
+        with open(f'{file_name}.json', 'w') as f:
+            f.write(json.dumps(array, indent=4))
+        print(
+            f"Save page info as json: {file_name}.json\n")
+    elif save_format == "parquet":  # parquet으로 저장
+        save_parquet(array, f'{file_name}.parquet')
+        print(
+            f"Save page info as parquet: {file_name}.parquet\n")
+    else:  # 엑셀로 저장
+        df = pd.DataFrame(array)
+        df.to_excel(
+            f'{file_name}.xlsx', index=False)
+        print(
+            f"Save page info as excel: {file_name}.xlsx\n")
+
+
+def get_page_date(search_term: str, page: int, setting: Dict[str, any]):
+    try:
+        response = http_client.get(get_api(search_term, page - 1, setting), cache=http_cache.RECORD)
+        if response.status_code != 200:
+            raise Exception(
+                f"Response Error with status code {response.status_code}")
+
+        # Get Article Info
+        data = response.json()
+        article_info_list = data["results"]
+        if not article_info_list:
+            raise Exception("Article info not found")
+        return article_info_list[len(article_info_list) // 2]['datePublished'].split('T')[0]
+    except Exception as e:
+        # print(f"Error: {e}")
+        metrics.inc("cnbc_api_failures_total", stage="page_date")
+        return "NaN"
+
+
+def get_article_page(search_term: str, page: int, setting: Dict[str, any],
+                     pager: Optional[QuerylyPager] = None):
+    # Get Article Info: pager 를 주면 여러 페이지를 한 번에 받아 둔 결과에서 이 페이지 몫을 꺼낸다.
+    if pager is not None:
+        article_info_list = pager.get_results(page)
+    else:
+        article_info_list, _ = request_results(
+            search_term, (page - 1) * setting['batch_size'], setting['batch_size'], setting)
+    if not article_info_list:
+        raise Exception("Article info not found")
+
+    # Extract Article Info
+    new_article_info_list = []
+    except_article_count = 0
+    for article_info in article_info_list:
+        try:
+            # Pro article은 제외: section이 Pro로 시작하면 제외
+            section = str(article_info["section"])
+            if section.split(':')[0].replace(' ', '') == "Pro":
+                metrics.inc("cnbc_articles_skipped_total", reason="pro")
+                raise Exception("Pro Article")
+
+            # Video article은 제외: url에 https://www.cnbc.com/video/가 포함되어 있으면 제외
+            url = article_info["url"]
+            if "https://www.cnbc.com/video/" in url:
+                metrics.inc("cnbc_articles_skipped_total", reason="video")
+                raise Exception("Video Article")
+
+            new_article_info_list.append({
+                "title": article_info["cn:title"],
+                "keyword": article_info["cn:keyword"],
+                "description": article_info["description"],
+                "url": url,
+                "_id": article_info["_id"],
+                "id": article_info["@id"],
+                "datePublished": article_info["datePublished"],
+                "author": article_info["author"],
+                "summary": article_info["summary"],
+            })
+        except Exception as e:
+            # print(f"Error: {e}")
+            except_article_count += 1
+
+    print(
+        f"Total {len(new_article_info_list)} articles found in page {page}", end="  |  Get articles...\n")
+
+    return new_article_info_list
+
+
+def get_article_list(new_article_info_list: List[Dict[str, any]], articles_dir, setting: Dict[str, any],
+                     parse_pipeline=None, executor=None, show_progress_bar: bool = True,
+                     on_done: Optional[Callable[[int, int], None]] = None):
+    # Get Article: 한 페이지의 기사들을 동시에 다운로드하고 실패한 항목은 제외한다.
+    # on_done(done, total) 은 기사 하나가 끝날 때마다 불린다(GUI 진행 표시용).
+    with tqdm(total=len(new_article_info_list), disable=not show_progress_bar) as progress:
+        def update(done, total):
+            progress.update(1)
+            if on_done:
+                on_done(done, total)
+
+        if parse_pipeline is not None:
+            article_info_list = parse_pipeline.fetch_article_list(
+                new_article_info_list, articles_dir, on_done=update)
+        else:
+            article_info_list = fetch_article_list(
+                new_article_info_list, articles_dir, setting["concurrency"],
+                on_done=update, backend=setting["parser_backend"], executor=executor)
+    metrics.inc("cnbc_articles_total", len(article_info_list), result="saved")
+    metrics.inc("cnbc_articles_total", len(new_article_info_list) - len(article_info_list), result="failed")
+    return article_info_list
+
+
+def compare_lists(list1, list2):
+    set1 = {str(i) for i in list1}
+    set2 = {str(i) for i in list2}
+
+    common_elements = set1 & set2  # 두 집합의 교집합 (공통 요소)
+    # 첫 번째 집합에서 두 번째 집합을 뺀 차집합 (list1에서만 존재하는 요소)
+    unique_to_list1 = set1 - set2
+    # 두 번째 집합에서 첫 번째 집합을 뺀 차집합 (list2에서만 존재하는 요소)
+    unique_to_list2 = set2 - set1
+
+    return {
+        "Common": list(common_elements),
+        "Only in list1": list(unique_to_list1),
+        "Only in list2": list(unique_to_list2)
+    }
+
+
+def get_continue_start_page(keyword: str, continue_folder_path: str) -> int:
+    # 이어서 다운로드: 체크포인트 저널의 마지막 완료 페이지 다음부터 다시 시작한다.
+    # 저널은 파일 끝만 읽으므로 페이지 로그를 모두 읽을 필요가 없다.
+    # 중단된 페이지에서 저장된 기사 파일은 그 페이지를 다시 받을 때 덮어쓰고,
+    # 마지막 단계(remove_file_that_not_in_info)에서 정리된다.
+    keyword_dir = os.path.join(continue_folder_path, keyword)
+    journal = CheckpointJournal(keyword_dir)
+    if journal.exists():
+        return journal.last_completed_page() + 1
+
+    # 저널이 없는 예전 실행 폴더: 페이지 로그 파일 이름에서 완료된 마지막 페이지를 찾는다.
+    # 읽을 수 없는 로그는 지우지 않고 건너뛰며, 그 페이지부터 다시 받는다.
+    log_list_path = os.path.join(keyword_dir, 'info_logs')
+    if not os.path.exists(log_list_path):
+        return 1
+    pages = set()
+    for file in os.listdir(log_list_path):
+        page = get_log_page(file, keyword)
+        if page is None:
+            continue
+        try:
+            read_page_log(os.path.join(log_list_path, file))
+            pages.add(page)
+        except Exception as e:
+            print(f"Skip broken page log: {file}")
+    last_page = 0
+    while last_page + 1 in pages:
+        last_page += 1
+    return last_page + 1
+
+
+def get_log_page(file: str, keyword: str) -> Optional[int]:
+    # info_logs/<keyword>_<page>.json|xlsx|parquet 에서 page 를 읽는다.
+    name, ext = os.path.splitext(file)
+    if ext not in ('.json', '.xlsx', '.parquet') or not name.startswith(f"{keyword}_"):
+        return None
+    try:
+        return int(name[len(keyword) + 1:])
+    except ValueError:
+        return None
+
+
+def load_page_logs(keyword: str, info_logs_dir: str, end_page: int) -> List[Tuple[int, List[Dict[str, any]]]]:
+    # 예전 형식(페이지마다 파일 하나) 폴더를 이어서 받을 때 완료된 페이지(1 ~ end_page)를 (page, 기사 정보) 로 불러온다.
+    file_paths = []
+    for file in os.listdir(info_logs_dir):
+        page = get_log_page(file, keyword)
+        if page is not None and page <= end_page:
+            file_paths.append((page, os.path.join(info_logs_dir, file)))
+    return [(page, read_page_log(file_path).to_dict('records')) for page, file_path in sorted(file_paths)]
+
+
+def merge_page_logs(file_paths: List[str]) -> pd.DataFrame:
+    # 여러 페이지 로그를 하나로 합치고 id 기준으로 처음 나온 행만 남긴다(벡터 연산).
+    log_dfs = [read_page_log(file_path) for file_path in file_paths]
+    log_dfs = [log_df for log_df in log_dfs if not log_df.empty]
+    if not log_dfs:
+        return pd.DataFrame()
+    merged = pd.concat(log_dfs, ignore_index=True)
+    return merged.drop_duplicates(subset='id', keep='first').reset_index(drop=True)
+
+
+def list_article_ids(folder_name: str) -> List[str]:
+    return [entry.name[:-len('.txt')] for entry in os.scandir(folder_name)
+            if entry.name.endswith('.txt')]
+
+
+def remove_duplicates_id(info_list: List[Dict[str, any]]) -> List[Dict[str, any]]:
+    # 순서를 유지하면서 id 가 처음 나온 항목만 남긴다. set 조회라 O(n)
+    id_set = set()
+    new_info_list = []
+    for info in info_list:
+        if info['id'] not in id_set:
+            id_set.add(info['id'])
+            new_info_list.append(info)
+    return new_info_list
+
+
+def remove_file_that_not_in_info(info_list: List[Dict[str, any]], folder_name: str):
+    remove_file_that_not_in_ids({str(info['id']) for info in info_list}, folder_name)
+
+
+def remove_file_that_not_in_ids(id_set: Iterable[str], folder_name: str):
+    for id in list_article_ids(folder_name):
+        if id not in id_set:
+            print(f"Remove empty file: {id}.txt")
+            os.remove(os.path.join(folder_name, f'{id}.txt'))
+
+
+def get_probe_setting(setting: Dict[str, any]) -> Dict[str, any]:
+    # get_closest_page / probe_page 는 키가 평평한 설정을 사용한다.
+    return {
+        'batch_size': setting['batch_size'],
+        'queryly_key': setting['private_key']['queryly_key'],
+        'additionalindexes': setting['private_key']['additionalindexes'],
+        'probe_cache_dir': setting['probe_cache_dir'],
+        'probe_cache_ttl': setting['probe_cache_ttl'],
+    }
+
+
+def get_resume_start_page(keyword: str, project_dir: str) -> Optional[int]:
+    # 이어서 다운로드: 이미 끝난 키워드면 None, 중단된 키워드면 이어서 시작할 페이지
+    if keyword not in os.listdir(project_dir):
+        return 1
+    if any(os.path.exists(os.path.join(project_dir, keyword, f'info_{keyword}{ext}'))
+           for ext in ('.json', '.xlsx', '.parquet')):
+        print(f"{keyword} is already downloaded.")
+        return None
+    # 폴더는 존재하는데 info_{keyword}.json 파일이 없는 경우 하다가 중단된 곳.
+    print(f"Continue from {keyword}")
+    continue_start_page = get_continue_start_page(keyword, project_dir)
+    print(f"Get continue_start_page: {continue_start_page}")
+    return continue_start_page
+
+
+def find_target_page(keyword: str, target_date: datetime, setting: Dict[str, any]) -> int:
+    print(
+        f"Searching closest page for {target_date.strftime('%Y/%m/%d')}...")
+    probe_setting = get_probe_setting(setting)
+    cache = PageProbeCache(probe_setting['probe_cache_dir'], keyword, probe_setting['batch_size'],
+                           probe_setting['probe_cache_ttl'], get_source_id(probe_setting))
+    # 가장 가까운 페이지의 다음 페이지까지 받는다. 단 마지막 페이지를 넘기면 없는 페이지를 요청하게 되므로 자른다.
+    with metrics.span("search"):
+        target_page_num = get_closest_page(keyword, target_date, probe_setting, cache) + 1
+    total_page = cache.get_total_page()
+    if total_page is not None and total_page >= 1:
+        target_page_num = min(target_page_num, total_page)
+    print(f"Find closest page: {target_page_num}\n")
+    return target_page_num
+
+
+def crawl_page_range(keyword: str, setting: Dict[str, any], start_page: int, target_page_num: Optional[int],
+                     page_log: PageLogWriter, article_store, parse_pipeline=None, executor=None,
+                     on_page: Optional[Callable[[int, int], None]] = None, show_progress_bar: bool = True,
+                     seen_index=None, incremental: bool = False, target_date: Optional[datetime] = None,
+                     on_article: Optional[Callable[[str, int, int, int], None]] = None,
+                     should_stop: Optional[Callable[[], bool]] = None, search_index=None):
+    # start_page ~ target_page_num 을 받아서 page_log 에 페이지 순서대로 남긴다. on_page(page, 저장한 기사 수)
+    # article_store 는 articles 폴더 경로 또는 저장소, executor 는 기사 다운로드 스레드 풀(parse_pipeline 이 없을 때).
+    # 페이지 파이프라인: Queryly 결과 페이지를 page_prefetch 개 앞서 받아 두고, 앞 페이지의 기사가 모두 끝나기를
+    # 기다리지 않고 다음 페이지의 기사도 같은 스레드 풀에 넣는다(최대 page_prefetch + 1 페이지가 동시에 진행).
+    # 페이지 로그 / 체크포인트 / seen_index 기록은 예전처럼 페이지 순서대로 한 페이지씩 남긴다.
+    window = setting["page_prefetch"] + 1
+    api_executor = ThreadPoolExecutor(max_workers=window)
+    page_executor = ThreadPoolExecutor(max_workers=window)
+    pager = QuerylyPager(keyword, setting)  # Queryly 는 max_batch_size 까지 한 번에 받는다(페이지 번호는 batch_size 기준)
+    api_futures = {}     # page -> Queryly 결과
+    in_flight = deque()  # 기사를 받고 있는 (page, 후보 info 목록, 결과) 를 페이지 순서대로
+    pending_ids = set()  # 증분 모드: 진행 중이라 아직 seen_index 에 없는 id
+
+    def fetch_articles(page, info_list):
+        with metrics.span("articles"):  # 페이지 하나의 기사 다운로드 + 파싱 + 저장 전체
+            article_done = None
+            if on_article:
+                def article_done(done, total):
+                    on_article(keyword, page, done, total)
+            return get_article_list(info_list, article_store, setting, parse_pipeline, executor,
+                                    show_progress_bar and window == 1, article_done)
+
+    def discard_prefetched():
+        # 진행 중인 뒤 페이지들은 끝날 때까지 기다렸다가 버린다(로그에 남기지 않으므로 다시 받는다).
+        for future in api_futures.values():
+            future.cancel()
+        api_futures.clear()
+        while in_flight:
+            in_flight.popleft()[2].result()
+        pending_ids.clear()
+
+    # 빈 페이지가 연속으로 나오면 차단으로 보고 속도를 줄인 뒤 빈 페이지들만 다시 받는다.
+    # (고정 대기 및 이미 받은 페이지 재다운로드 없음)
+    page = start_page  # 다음에 기사 다운로드를 시작할 페이지
+    stopping = False
+    empty_pages = []
+    page_retry_count = {}
+    try:
+        while True:
+            while not stopping and len(in_flight) < window and (target_page_num is None or page <= target_page_num):
+                if should_stop is not None and should_stop():
+                    print(f"Stop {keyword} at page {page}")
+                    stopping = True
+                    break
+                last_page = page + window - 1
+                if target_page_num is not None:
+                    last_page = min(last_page, target_page_num)
+                for next_page in range(page, last_page + 1):
+                    if next_page not in api_futures:
+                        api_futures[next_page] = api_executor.submit(
+                            get_article_page, keyword, next_page, setting, pager)
+                if incremental:
+                    try:
+                        unclear_new_article_info_list = api_futures.pop(page).result()
+                    except Exception as e:
+                        print(f"Stop at page {page}: {e}")
+                        stopping = True
+                        break
+                    unseen_ids = seen_index.filter_unseen(
+                        keyword, [info["id"] for info in unclear_new_article_info_list]) - pending_ids
+                    if not unseen_ids:
+                        print(f"Page {page} is fully seen. Stop incremental crawl of {keyword}.")
+                        stopping = True
+                        break
+                    unclear_new_article_info_list = [info for info in unclear_new_article_info_list
+                                                     if str(info["id"]) in unseen_ids]
+                    if all(info["datePublished"].split('T')[0] < target_date.strftime('%Y-%m-%d')
+                           for info in unclear_new_article_info_list):
+                        print(f"Page {page} is older than {target_date.strftime('%Y/%m/%d')}. Stop.")
+                        stopping = True
+                        break
+                    pending_ids.update(unseen_ids)
+                else:
+                    unclear_new_article_info_list = api_futures.pop(page).result()
+                in_flight.append((page, unclear_new_article_info_list,
+                                  page_executor.submit(fetch_articles, page, unclear_new_article_info_list)))
+                page += 1
+            if not in_flight:
+                break
+
+            # 가장 앞 페이지를 마무리한다.
+            done_page, unclear_new_article_info_list, future = in_flight.popleft()
+            new_article_info_list = future.result()
+            if seen_index is not None:
+                seen_index.add_page(
+                    keyword, unclear_new_article_info_list, new_article_info_list)
+                pending_ids.difference_update(str(info["id"]) for info in unclear_new_article_info_list)
+            if search_index is not None and new_article_info_list:
+                with metrics.span("index"):
+                    search_index.add_articles(keyword, new_article_info_list,
+                                              lambda id: read_article_text(id, article_store))
+            if len(new_article_info_list) == 0:
+                empty_pages.append(done_page)
+                if len(empty_pages) >= 3 and page_retry_count.get(empty_pages[0], 0) < setting["max_page_retries"]:
+                    print(f"Something went wrong. Slow down and retry pages {empty_pages}...")
+                    http_client.penalize(reason="empty_pages")
+                    for empty_page in empty_pages:
+                        page_retry_count[empty_page] = page_retry_count.get(
+                            empty_page, 0) + 1
+                    discard_prefetched()
+                    page = empty_pages[0]
+                    empty_pages = []
+                    continue
+            else:
+                empty_pages = []
+            print(
+                f"Get {len(new_article_info_list)} articles in page {done_page}\n")
+            # Save Array
+            page_log.append_page(done_page, new_article_info_list)
+            metrics.inc("cnbc_pages_total")
+            if on_page:
+                on_page(done_page, len(new_article_info_list))
+    finally:
+        for future in api_futures.values():
+            future.cancel()
+        page_executor.shutdown(wait=True)
+        api_executor.shutdown(wait=True)
+
+
+def crawl_shards(keyword: str, keyword_dir: str, setting: Dict[str, any], shard_ranges: List[Tuple[int, int]],
+                 article_store, parse_pipeline=None, executor=None,
+                 on_page: Optional[Callable[[int, int], None]] = None, seen_index=None,
+                 on_article: Optional[Callable[[str, int, int, int], None]] = None,
+                 should_stop: Optional[Callable[[], bool]] = None, search_index=None):
+    # 조각마다 스레드 하나로 crawl_page_range 를 돌린다. 조각은 자기 폴더에 페이지 로그와 체크포인트를 남기고,
+    # 기사 다운로드는 executor(concurrency) 를 같이 쓴다. 실패한 조각이 있으면 나머지가 끝난 뒤 예외를 낸다.
+    def crawl_shard(page_range):
+        shard_dir = keyword_shards.get_shard_dir(keyword_dir, page_range)
+        os.makedirs(shard_dir, exist_ok=True)
+        shard_start = keyword_shards.get_shard_start_page(shard_dir, page_range)
+        if shard_start > page_range[1]:
+            print(f"{keyword} pages {page_range[0]}-{page_range[1]} are already downloaded.")
+            return
+        journal = CheckpointJournal(shard_dir)
+        try:  # 페이지 로그를 먼저 닫아야 마지막 flush 기록이 체크포인트에 남는다.
+            with PageLogWriter(get_page_log_path(shard_dir, keyword), keep_page=shard_start - 1,
+                               flush_pages=setting["page_log_flush_pages"],
+                               flush_interval=setting["page_log_flush_interval"],
+                               on_flush=lambda page, array: journal.append_page(page, [info["id"] for info in array])
+                               ) as page_log:
+                with metrics.span("shard"):
+                    crawl_page_range(keyword, setting, shard_start, page_range[1], page_log, article_store,
+                                     parse_pipeline, executor, on_page, False, seen_index,
+                                     on_article=on_article, should_stop=should_stop, search_index=search_index)
+        finally:
+            journal.close()
+
+    print(f"Split {keyword} into {len(shard_ranges)} shards: {shard_ranges}")
+    with ThreadPoolExecutor(max_workers=len(shard_ranges)) as shard_executor:
+        futures = [shard_executor.submit(crawl_shard, page_range) for page_range in shard_ranges]
+    errors = [future.exception() for future in futures if future.exception() is not None]
+    if errors:
+        raise errors[0]
+
+
+def crawl_keyword(keyword: str, project_dir: str, setting: Dict[str, any], target_date: Optional[datetime],
+                  start_page: int = 1, target_page_num: Optional[int] = None,
+                  parse_pipeline=None, executor=None,
+                  on_progress: Optional[Callable[[str, int, int, int], None]] = None,
+                  show_progress_bar: bool = True, seen_index=None, incremental: bool = False,
+                  shared_store: Optional[SharedArticleStore] = None,
+                  on_article: Optional[Callable[[str, int, int, int], None]] = None,
+                  should_stop: Optional[Callable[[], bool]] = None, search_index=None,
+                  keyword_dir: Optional[str] = None) -> int:
+    # 키워드 하나를 start_page 부터 target_date 에 가장 가까운 페이지까지 받고 저장한 기사 수를 돌려준다.
+    # target_page_num 을 주면 target_date 없이 그 페이지까지 받는다.
+    # 작업 폴더(os.chdir)를 바꾸지 않고 project_dir 기준 절대 경로만 사용한다.
+    # incremental=True 이면 seen_index 에 없는 기사만 받고, 새 기사가 하나도 없는 페이지를 만나면 멈춘다.
+    # on_article(keyword, page, done, total) 은 기사마다, should_stop() 은 페이지마다 불린다.
+    # should_stop 이 True 를 돌려주면 그때까지 받은 페이지로 마무리한다.
+    # search_index 를 주면 페이지마다 저장한 기사를 전문 검색 인덱스에 넣는다.
+    # keyword_dir 을 주면 <project_dir>/<keyword> 대신 그 폴더에 저장한다(GUI 는 예전처럼 실행 폴더에 바로 저장한다).
+    if incremental and seen_index is None:
+        raise Exception("Incremental mode needs seen_index")
+    search_term = keyword
+    keyword_dir = os.path.abspath(keyword_dir or os.path.join(project_dir, search_term))
+    articles_dir = os.path.join(keyword_dir, "articles")
+    info_logs_dir = os.path.join(keyword_dir, "info_logs")
+    os.makedirs(info_logs_dir, exist_ok=True)
+    # article_store="packed" 이면 기사 본문을 articles/<id>.txt 대신 키워드별 압축 세그먼트에 저장한다.
+    # "shared" 이면 실행 폴더의 공용 저장소에 저장하고 키워드에는 참조만 남긴다(다른 키워드가 받은 기사는 다운로드 생략).
+    store = None
+    own_shared_store = False
+    if setting["article_store"] == "packed":
+        store = PackedArticleStore(keyword_dir, setting["article_compression"])
+    elif setting["article_store"] == "shared":
+        if shared_store is None:
+            shared_store = SharedArticleStore(project_dir, setting["article_compression"])
+            own_shared_store = True
+        store = shared_store.keyword_refs(keyword_dir)
+    else:
+        os.makedirs(articles_dir, exist_ok=True)
+
+    # 증분 모드는 페이지 탐색 없이 최신 페이지부터 본 기사가 나올 때까지만 내려간다.
+    if target_page_num is None and not incremental:
+        target_page_num = find_target_page(keyword, target_date, setting)
+
+    # keyword_shards > 1 이면 페이지 구간을 나눠 동시에 받는다. 이어받을 때는 저장해 둔 구간을 그대로 쓴다.
+    shard_ranges = None
+    if not incremental and target_page_num is not None:
+        shard_ranges = keyword_shards.load_plan(keyword_dir)
+        if shard_ranges is None and setting["keyword_shards"] > 1:
+            shard_ranges = keyword_shards.split_pages(start_page, target_page_num, setting["keyword_shards"])
+            if len(shard_ranges) > 1:
+                keyword_shards.save_plan(keyword_dir, shard_ranges)
+            else:
+                shard_ranges = None
+        if shard_ranges is not None:
+            start_page = shard_ranges[0][0]
+
+    # 체크포인트: 페이지 로그가 디스크에 flush 된 뒤에 그 페이지들의 완료 기록을 남긴다.
+    # 증분 모드는 seen_index 와 어긋나지 않도록 페이지마다 flush 한다.
+    journal = CheckpointJournal(keyword_dir)
+    page_log_path = get_page_log_path(info_logs_dir, search_term)
+    legacy_pages = []
+    if start_page > 1 and not os.path.exists(page_log_path):
+        legacy_pages = load_page_logs(search_term, info_logs_dir, start_page - 1)
+    page_log = PageLogWriter(
+        page_log_path, keep_page=start_page - 1,
+        flush_pages=1 if incremental else setting["page_log_flush_pages"],
+        flush_interval=setting["page_log_flush_interval"],
+        on_flush=lambda page, array: journal.append_page(page, [info["id"] for info in array]))
+    for legacy_page, page_info_list in legacy_pages:  # 예전 형식 로그는 새 로그로 옮긴다.
+        page_log.append_page(legacy_page, page_info_list)
+    article_count = count_page_log(page_log_path) if start_page > 1 else 0
+    article_store = articles_dir if store is None else store
+    own_executor = executor is None and parse_pipeline is None
+    if own_executor:  # 페이지마다 풀을 만들지 않고 키워드의 모든 페이지(조각)가 concurrency 한도 하나를 같이 쓴다.
+        executor = ThreadPoolExecutor(max_workers=setting["concurrency"])
+    progress_lock = threading.Lock()
+    done_pages = 0
+    if shard_ranges is not None:
+        shard_pages, shard_articles = keyword_shards.count_done(keyword_dir, search_term, shard_ranges)
+        done_pages += shard_pages
+        article_count += shard_articles
+
+    def on_page(page, count):
+        nonlocal article_count, done_pages
+        with progress_lock:
+            article_count += count
+            done_pages += 1
+            # 조각으로 나눠 받을 때는 끝난 페이지 수로 진행 상황을 알린다.
+            reported_page = page if shard_ranges is None else start_page - 1 + done_pages
+            if on_progress:
+                on_progress(keyword, reported_page, target_page_num, article_count)
+
+    try:
+        if shard_ranges is None:
+            crawl_page_range(keyword, setting, start_page, target_page_num, page_log, article_store,
+                             parse_pipeline, executor, on_page, show_progress_bar, seen_index, incremental,
+                             target_date, on_article, should_stop, search_index)
+        else:
+            crawl_shards(keyword, keyword_dir, setting, shard_ranges, article_store, parse_pipeline, executor,
+                         on_page, seen_index, on_article, should_stop, search_index)
+    finally:
+        try:
+            if own_executor:
+                executor.shutdown(wait=True)
+            page_log.close()
+        finally:
+            journal.close()
+    if shard_ranges is not None:
+        keyword_shards.append_shard_logs(keyword_dir, search_term, shard_ranges, page_log_path)
+
+    # Save Total Info: 페이지 로그를 스트리밍으로 읽어 만든다(전체 목록을 메모리에 모으지 않음).
+    with metrics.span("finalize"):
+        id_set = save_page_log(page_log_path, os.path.join(
+            keyword_dir, f"info_{search_term}"), get_save_format(setting), setting["parquet_dictionary_columns"])
+        if store is None:
+            remove_file_that_not_in_ids(id_set, articles_dir)
+        else:
+            print(f"Remove {store.compact(id_set)} articles that are not in info")
+            store.close()
+        if search_index is not None:
+            search_index.retain(keyword, id_set)
+    if own_shared_store:
+        shared_store.close()
+    print(f"Done {search_term}!\n")
+    shutil.rmtree(info_logs_dir)
+    journal.remove()
+    keyword_shards.remove_shards(keyword_dir)
+    return len(id_set)
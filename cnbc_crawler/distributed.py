@@ -0,0 +1,380 @@
+import argparse
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from cnbc_crawler import http_client, metrics
+from cnbc_crawler.config import CrawlConfig
+from cnbc_crawler.corpus_reader import find_info_path, load_info
+from cnbc_crawler.corpus_store import PackedArticleStore
+from cnbc_crawler.crawler import find_target_page, get_save_format
+from cnbc_crawler.fetch_engine import read_article_text, write_article_text
+from cnbc_crawler.page_log import PageLogWriter, get_page_log_path, save_page_log
+from cnbc_crawler.search_index import SearchIndex
+from cnbc_crawler.session import CrawlSession
+from cnbc_crawler.shared_store import SharedArticleStore
+from cnbc_crawler.work_queue import DEFAULT_LEASE_SECONDS, PageRange, Task, WorkQueue, split_tasks
+
+# 여러 컴퓨터(다른 IP)로 키워드들을 나눠 받는 coordinator / worker 모드.
+#   coordinator: 키워드마다 target_date 에 가장 가까운 페이지를 찾아 (keyword, 페이지 구간) 작업을 큐에 넣고,
+#                키워드의 작업이 모두 끝나면 조각들을 합쳐서 보통 실행 폴더와 같은 <output>/<keyword>/ 를 만든다.
+#   worker:      큐에서 작업을 가져가(임대) 자기 컴퓨터의 임시 폴더에 받은 뒤 <output>/<keyword>/parts/<first>_<last>/
+#                로 올린다. 임시 이름으로 복사한 뒤 rename 하므로 같은 작업을 두 번 올려도 먼저 올린 하나만 남는다.
+# 큐(SQLite)와 output 폴더는 모든 컴퓨터가 같이 보는 곳(NFS 등)에 둔다. 크롤링 설정은 coordinator 가 큐에 저장하고
+# 작업자는 그 설정에 자기 컴퓨터 설정(concurrency, http 캐시 등)만 덮어써서 쓴다.
+#   python -m cnbc_crawler.distributed coordinator --queue /shared/queue.sqlite --output /shared/cnbc_news \
+#       --keywords Amazon Apple --target-date 2014-04-01
+#   python -m cnbc_crawler.distributed worker --queue /shared/queue.sqlite     # 컴퓨터마다 하나 이상
+DEFAULT_PAGES_PER_TASK = 20
+DEFAULT_POLL_INTERVAL = 2
+PARTS_DIR_NAME = "parts"
+
+
+def get_parts_dir(keyword_dir: str) -> str:
+    return os.path.join(keyword_dir, PARTS_DIR_NAME)
+
+
+def get_part_dir(keyword_dir: str, page_range: PageRange) -> str:
+    return os.path.join(get_parts_dir(keyword_dir), f"{page_range[0]}_{page_range[1]}")
+
+
+def get_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def get_task_config(config: CrawlConfig, overrides: Optional[Dict[str, any]] = None) -> CrawlConfig:
+    # 작업 결과(조각)는 항상 json info + 압축 없는 packed 세그먼트로 남긴다(올릴 파일이 적고 합칠 때 그대로 읽는다).
+    # seen index / 검색 인덱스 / 지표 파일은 coordinator 가 합칠 때 만든다.
+    return config.replace(**{
+        "save_format": "json", "article_store": "packed", "article_compression": "none",
+        "seen_index_path": None, "search_index_path": None, "incremental": False,
+        "probe_cache_dir": None, "metrics_json_path": None, **(overrides or {})})
+
+
+def upload_part(task_dir: str, keyword_dir: str, page_range: PageRange, worker: str) -> bool:
+    # 작업 폴더를 조각 폴더로 올린다. 이미 올라간 조각이 있으면 False(다른 작업자가 먼저 끝냈다).
+    part_dir = get_part_dir(keyword_dir, page_range)
+    if os.path.exists(part_dir):
+        return False
+    os.makedirs(get_parts_dir(keyword_dir), exist_ok=True)
+    temp_dir = f"{part_dir}.tmp-{worker}"
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    with metrics.span("upload"):
+        shutil.copytree(task_dir, temp_dir)
+    try:
+        os.rename(temp_dir, part_dir)  # 이미 있는(비어 있지 않은) 폴더로는 rename 되지 않는다.
+    except OSError:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        return False
+    return True
+
+
+def count_part(keyword_dir: str, keyword: str, page_range: PageRange) -> int:
+    # 올라간 조각의 기사 수(info_<keyword>.json 항목 수). 조각이 이미 합쳐져서 없으면 0.
+    try:
+        with open(os.path.join(get_part_dir(keyword_dir, page_range), keyword, f"info_{keyword}.json"), 'r') as f:
+            return len(json.load(f))
+    except FileNotFoundError:  # 작업이 이미 done 이라 complete 가 기사 수를 바꾸지 않는다.
+        return 0
+
+
+def _has_article(article_store, id: str) -> bool:
+    if isinstance(article_store, str):
+        return os.path.exists(os.path.join(article_store, f"{id}.txt"))
+    return id in article_store
+
+
+def merge_keyword(output_dir: str, keyword: str, ranges: List[PageRange], setting: Dict[str, any],
+                  shared_store: Optional[SharedArticleStore] = None,
+                  search_index: Optional[SearchIndex] = None) -> int:
+    # 키워드의 조각들을 페이지 순서대로 합쳐서 info_<keyword> 와 기사 저장소(setting 의 article_store)를 만든다.
+    # info 를 마지막에 쓰므로 중간에 끊기면 다음 실행에서 처음부터 다시 합친다(이미 옮긴 기사는 건너뛴다).
+    keyword_dir = os.path.join(output_dir, keyword)
+    parts_dir = get_parts_dir(keyword_dir)
+    if find_info_path(keyword_dir) is not None:  # 이미 합쳤고 조각만 남아 있다.
+        shutil.rmtree(parts_dir, ignore_errors=True)
+        return len(load_info(keyword_dir))
+
+    store = None
+    if setting["article_store"] == "packed":
+        store = PackedArticleStore(keyword_dir, setting["article_compression"])
+    elif setting["article_store"] == "shared":
+        store = shared_store.keyword_refs(keyword_dir)
+    article_store = store
+    if store is None:
+        article_store = os.path.join(keyword_dir, "articles")
+        os.makedirs(article_store, exist_ok=True)
+
+    page_log_path = get_page_log_path(parts_dir, keyword)
+    with metrics.span("merge"):
+        with PageLogWriter(page_log_path, keep_page=0) as page_log:
+            for page_range in ranges:
+                part_keyword_dir = os.path.join(get_part_dir(keyword_dir, page_range), keyword)
+                with open(os.path.join(part_keyword_dir, f"info_{keyword}.json"), 'r') as f:
+                    info_list = json.load(f)
+                saved = []
+                with PackedArticleStore(part_keyword_dir, "none") as part_store:
+                    for info in info_list:
+                        id = str(info["id"])
+                        if id not in part_store:
+                            continue
+                        if not _has_article(article_store, id):
+                            write_article_text(part_store.get(id), id, article_store)
+                        saved.append(info)
+                page_log.append_page(page_range[0], saved)
+                if search_index is not None and saved:
+                    with metrics.span("index"):
+                        search_index.add_articles(keyword, saved, lambda id: read_article_text(id, article_store))
+        id_set = save_page_log(page_log_path, os.path.join(keyword_dir, f"info_{keyword}"), get_save_format(setting),
+                               setting["parquet_dictionary_columns"])
+        if store is not None:
+            store.close()
+        if search_index is not None:
+            search_index.retain(keyword, id_set)
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    return len(id_set)
+
+
+class LeaseKeeper:
+    # 작업을 받는 동안 heartbeat 로 임대를 늘린다. 임대를 잃으면(다른 작업자가 가져감) lost 가 켜진다.
+    def __init__(self, queue: WorkQueue, task: Task, worker: str, lease_seconds: float):
+        self.queue = queue
+        self.task = task
+        self.worker = worker
+        self.lease_seconds = lease_seconds
+        self.lost = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self.stopped.wait(self.lease_seconds / 3):
+            try:
+                alive = self.queue.heartbeat(self.task.id, self.worker, self.lease_seconds)
+            except Exception as e:  # 큐가 잠깐 잠겨 있으면 다음에 다시 한다.
+                print(f"Heartbeat failed: {e}")
+                continue
+            if not alive:
+                print(f"Lost the lease of task {self.task.id}. Stop.")
+                self.lost.set()
+                return
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stopped.set()
+        self.thread.join()
+
+
+def run_coordinator(config: CrawlConfig, keyword_list: List[str], target_date: datetime, queue_path: str,
+                    output_dir: str, pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+                    poll_interval: float = DEFAULT_POLL_INTERVAL) -> Dict[str, Dict[str, any]]:
+    # 작업을 넣고, 끝난 키워드를 합치면서 모든 키워드가 끝날 때까지 기다린다. 키워드별 상태를 돌려준다.
+    # 같은 큐로 다시 실행하면 이미 넣은 키워드는 건너뛰고 남은 작업을 기다린다.
+    if config.incremental:
+        raise Exception("Distributed mode does not support incremental crawls")
+    output_dir = os.path.abspath(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    setting = config.to_setting()
+    queue = WorkQueue(queue_path)
+    search_index = SearchIndex(config.search_index_path) if config.search_index_path else None
+    shared_store = SharedArticleStore(output_dir, config.article_compression) \
+        if config.article_store == "shared" else None
+    try:
+        queue.set_meta("config", setting)
+        queue.set_meta("output_dir", output_dir)
+        queue.set_meta("target_date", target_date.strftime('%Y-%m-%d'))
+
+        http_client.configure(setting)
+        planned = queue.get_keywords()
+        new_keywords = [keyword for keyword in keyword_list if keyword not in planned]
+
+        def plan(keyword):
+            try:
+                target_page = find_target_page(keyword, target_date, setting)
+            except Exception as e:
+                print(f"Cannot find the target page of {keyword}: {e}")
+                queue.set_keyword(keyword, "failed", error=str(e))
+                return
+            ranges = split_tasks(1, target_page, pages_per_task)
+            queue.add_keyword(keyword, target_page, ranges)
+            print(f"Queue {keyword}: pages 1-{target_page} in {len(ranges)} tasks")
+
+        # 페이지 탐색은 키워드마다 독립이라 keyword_workers 개씩 동시에 하고, 찾는 대로 작업자가 가져간다.
+        with ThreadPoolExecutor(max_workers=max(1, config.keyword_workers)) as executor:
+            list(executor.map(plan, new_keywords))
+        queue.set_meta("planned", True)
+
+        started = time.time()
+        last_report = 0
+        while True:
+            for keyword, error in queue.failed_keywords().items():
+                print(f"{keyword} failed: {error}")
+                queue.set_keyword(keyword, "failed", error=error)
+            for keyword in queue.finished_keywords():
+                article_count = merge_keyword(output_dir, keyword, queue.get_ranges(keyword), setting,
+                                              shared_store, search_index)
+                queue.set_keyword(keyword, "merged", article_count)
+                print(f"Done {keyword}: {article_count} articles\n")
+            keywords = queue.get_keywords()
+            if all(state["status"] != "planned" for state in keywords.values()):
+                break
+            if time.time() - last_report >= config.progress_interval:
+                last_report = time.time()
+                elapsed = last_report - started
+                print(f"[{elapsed:.0f}s] tasks {queue.counts()} / {queue.articles()} articles")
+            time.sleep(poll_interval)
+        return keywords
+    finally:
+        if shared_store is not None:
+            shared_store.close()
+        if search_index is not None:
+            search_index.close()
+        queue.close()
+
+
+def run_task(session: CrawlSession, queue: WorkQueue, task: Task, output_dir: str, worker: str,
+             lease_seconds: float) -> Optional[int]:
+    # 작업 하나를 받아서 올린다. 저장한 기사 수(임대를 잃어서 버렸으면 None)를 돌려준다.
+    task_dir = os.path.join(session.project_dir, f"task_{task.id}")
+    shutil.rmtree(task_dir, ignore_errors=True)
+    keyword_dir = os.path.join(output_dir, task.keyword)
+    page_range = (task.first_page, task.last_page)
+    print(f"Task {task.id}: {task.keyword} pages {task.first_page}-{task.last_page} (attempt {task.attempts})")
+    try:
+        if os.path.exists(get_part_dir(keyword_dir, page_range)):  # 임대가 끝난 뒤 다른 작업자가 이미 올렸다.
+            print(f"Task {task.id} is already uploaded.")
+            article_count = count_part(keyword_dir, task.keyword, page_range)
+        else:
+            with LeaseKeeper(queue, task, worker, lease_seconds) as lease:
+                with metrics.span("task"):
+                    article_count = session.crawl_pages(task.keyword, task.first_page, task.last_page,
+                                                        should_stop=lease.lost.is_set, project_dir=task_dir)
+            if lease.lost.is_set():  # 중간에 멈춘 결과는 올리지 않는다.
+                metrics.inc("cnbc_tasks_total", status="lost")
+                return None
+            if not upload_part(task_dir, keyword_dir, page_range, worker):  # 먼저 올린 조각의 기사 수를 쓴다.
+                article_count = count_part(keyword_dir, task.keyword, page_range)
+        queue.complete(task.id, worker, article_count)
+        metrics.inc("cnbc_tasks_total", status="done")
+        return article_count
+    finally:
+        shutil.rmtree(task_dir, ignore_errors=True)
+
+
+def run_worker(queue_path: str, output_dir: Optional[str] = None, work_dir: Optional[str] = None,
+               overrides: Optional[Dict[str, any]] = None, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+               poll_interval: float = DEFAULT_POLL_INTERVAL, max_tasks: Optional[int] = None) -> int:
+    # 큐가 빌 때까지(임대 중인 작업도 끝날 때까지) 작업을 가져가서 받는다. 끝낸 작업 수를 돌려준다.
+    # overrides 는 이 컴퓨터에만 적용할 CrawlConfig 값(concurrency, http_cache_dir 등).
+    worker = get_worker_id()
+    queue = WorkQueue(queue_path)
+    try:
+        while queue.get_meta("config") is None:  # coordinator 보다 먼저 시작했다.
+            time.sleep(poll_interval)
+        config = get_task_config(CrawlConfig.from_setting(queue.get_meta("config")), overrides)
+        output_dir = os.path.abspath(output_dir or queue.get_meta("output_dir"))
+        work_dir = work_dir or tempfile.mkdtemp(prefix="cnbc_worker_")
+        done_tasks = 0
+        print(f"Worker {worker}: queue {queue_path}, output {output_dir}")
+        with CrawlSession(config, work_dir) as session:
+            while max_tasks is None or done_tasks < max_tasks:
+                task = queue.claim(worker, lease_seconds)
+                if task is None:
+                    if queue.is_finished():
+                        break
+                    time.sleep(poll_interval)
+                    continue
+                try:
+                    if run_task(session, queue, task, output_dir, worker, lease_seconds) is not None:
+                        done_tasks += 1
+                except KeyboardInterrupt:
+                    queue.release(task.id, worker)
+                    raise
+                except Exception as e:
+                    print(f"Task {task.id} failed: {e}")
+                    queue.fail(task.id, worker, str(e))
+                    metrics.inc("cnbc_tasks_total", status="failed")
+            print(session.format_stats())
+        print(f"Worker {worker} done: {done_tasks} tasks")
+        return done_tasks
+    finally:
+        queue.close()
+
+
+def read_keywords(values: List[str], keywords_file: Optional[str]) -> List[str]:
+    keyword_list = list(values or [])
+    if keywords_file:
+        with open(keywords_file, 'r') as f:
+            keyword_list += [line.strip() for line in f if line.strip()]
+    return keyword_list
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distributed CNBC crawl: one coordinator, many workers")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    coordinator = subparsers.add_parser("coordinator", help="queue keyword page ranges and merge finished keywords")
+    coordinator.add_argument("--queue", required=True, help="work queue sqlite file (shared by all nodes)")
+    coordinator.add_argument("--output", required=True, help="output folder (shared by all nodes)")
+    coordinator.add_argument("--keywords", nargs="*", default=[])
+    coordinator.add_argument("--keywords-file", default=None, help="one keyword per line")
+    coordinator.add_argument("--target-date", required=True, help="YYYY-MM-DD")
+    coordinator.add_argument("--pages-per-task", type=int, default=DEFAULT_PAGES_PER_TASK)
+    coordinator.add_argument("--save-format", default="json")
+    coordinator.add_argument("--article-store", default="files")
+    coordinator.add_argument("--article-compression", default="zstd")
+    coordinator.add_argument("--parser-backend", default=None)
+    coordinator.add_argument("--concurrency", type=int, default=8, help="default download concurrency per worker")
+    coordinator.add_argument("--rate-limit", type=float, default=5, help="requests/sec per host per worker (0: off)")
+    coordinator.add_argument("--max-batch-size", type=int, default=100)
+    coordinator.add_argument("--keyword-workers", type=int, default=4, help="keywords searched at the same time")
+    coordinator.add_argument("--search-index", action="store_true", help="index merged articles in <output>/search_index.sqlite")
+
+    worker_parser = subparsers.add_parser("worker", help="claim and crawl tasks until the queue is empty")
+    worker_parser.add_argument("--queue", required=True)
+    worker_parser.add_argument("--output", default=None, help="output folder if it is mounted elsewhere on this node")
+    worker_parser.add_argument("--work-dir", default=None, help="local folder for tasks in progress")
+    worker_parser.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS, help="lease seconds")
+    worker_parser.add_argument("--max-tasks", type=int, default=None)
+    worker_parser.add_argument("--concurrency", type=int, default=None)
+    worker_parser.add_argument("--parse-workers", type=int, default=None)
+    worker_parser.add_argument("--rate-limit", type=float, default=None, help="0: off")
+    worker_parser.add_argument("--http-cache-dir", default=None)
+    worker_parser.add_argument("--metrics-port", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.command == "coordinator":
+        config = CrawlConfig(
+            save_format=args.save_format, article_store=args.article_store,
+            article_compression=args.article_compression, concurrency=args.concurrency,
+            pool_maxsize=max(args.concurrency, 10), rate_limit=args.rate_limit or None,
+            max_batch_size=args.max_batch_size, keyword_workers=args.keyword_workers,
+            search_index_path=os.path.join(args.output, "search_index.sqlite") if args.search_index else None,
+            **({"parser_backend": args.parser_backend} if args.parser_backend else {}))
+        result = run_coordinator(config, read_keywords(args.keywords, args.keywords_file),
+                                 datetime.strptime(args.target_date, '%Y-%m-%d'), args.queue, args.output,
+                                 args.pages_per_task)
+        for keyword, state in result.items():
+            print(f"{keyword}: {state['status']} ({state['articles'] or 0} articles)")
+    else:
+        overrides = {}
+        if args.concurrency is not None:
+            overrides.update(concurrency=args.concurrency, pool_maxsize=max(args.concurrency, 10))
+        if args.parse_workers is not None:
+            overrides["parse_workers"] = args.parse_workers
+        if args.rate_limit is not None:
+            overrides["rate_limit"] = args.rate_limit or None
+        if args.http_cache_dir is not None:
+            overrides["http_cache_dir"] = args.http_cache_dir
+        if args.metrics_port is not None:
+            overrides["metrics_port"] = args.metrics_port
+        run_worker(args.queue, args.output, args.work_dir, overrides, args.lease, max_tasks=args.max_tasks)
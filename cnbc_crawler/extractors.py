@@ -0,0 +1,113 @@
+from typing import Callable, Dict, List
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# 기사 본문 추출 방식. 모두 같은 규칙으로 텍스트를 만든다.
+#   div.ArticleBody-articleBody 안의 첫 번째 div.group 에 있는 모든 p 의 텍스트를 '\n' 으로 연결
+DEFAULT_BACKEND = "bs4"
+
+ARTICLE_BODY_CLASS = "ArticleBody-articleBody"
+GROUP_CLASS = "group"
+
+
+def _class_xpath(tag: str, class_name: str) -> str:
+    return f'{tag}[contains(concat(" ", normalize-space(@class), " "), " {class_name} ")]'
+
+
+def _join_paragraphs(paragraphs: List[str]) -> str:
+    return '\n'.join(paragraphs)
+
+
+def _extract_from_soup(soup: BeautifulSoup) -> str:
+    if not soup:
+        raise Exception("Soup is None")
+    # class가 ArticleBody-articleBody 인 div를 찾는다.
+    article_body = soup.find('div', class_=ARTICLE_BODY_CLASS)
+    if not article_body:
+        raise Exception("ArticleBody-articleBody not found")
+
+    # 그 뒤 클래스 이름이 group 인 첫 번째 div를 찾는다.
+    group = article_body.find('div', class_=GROUP_CLASS)
+    if not group:
+        raise Exception("group not found")
+
+    # group 안에 있는 모든 p 태그를 찾아 텍스트를 추출한다.
+    return _join_paragraphs([p.get_text() for p in group.find_all('p')])
+
+
+def extract_with_bs4(html: str) -> str:
+    return _extract_from_soup(BeautifulSoup(html, 'html.parser'))
+
+
+def extract_with_strainer(html: str) -> str:
+    # 본문 div 하위 트리만 만든다. 페이지 나머지(head, script, 메뉴 등)는 트리로 만들지 않는다.
+    only_body = SoupStrainer('div', class_=ARTICLE_BODY_CLASS)
+    return _extract_from_soup(BeautifulSoup(html, 'html.parser', parse_only=only_body))
+
+
+def extract_with_lxml(html: str) -> str:
+    import lxml.html
+
+    tree = lxml.html.fromstring(html)
+    article_body = tree.xpath(f'//{_class_xpath("div", ARTICLE_BODY_CLASS)}')
+    if not article_body:
+        raise Exception("ArticleBody-articleBody not found")
+    group = article_body[0].xpath(f'.//{_class_xpath("div", GROUP_CLASS)}')
+    if not group:
+        raise Exception("group not found")
+    return _join_paragraphs([p.text_content() for p in group[0].iter('p')])
+
+
+def extract_with_selectolax(html: str) -> str:
+    try:
+        from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    except ImportError:  # selectolax < 0.3.13
+        from selectolax.parser import HTMLParser
+
+    article_body = HTMLParser(html).css_first(f'div.{ARTICLE_BODY_CLASS}')
+    if article_body is None:
+        raise Exception("ArticleBody-articleBody not found")
+    group = article_body.css_first(f'div.{GROUP_CLASS}')
+    if group is None:
+        raise Exception("group not found")
+    return _join_paragraphs([p.text(deep=True) for p in group.css('p')])
+
+
+EXTRACTORS: Dict[str, Callable[[str], str]] = {
+    "bs4": extract_with_bs4,
+    "strainer": extract_with_strainer,
+    "lxml": extract_with_lxml,
+    "selectolax": extract_with_selectolax,
+}
+
+_REQUIRED_MODULES = {"lxml": ["lxml.html"],
+                     "selectolax": ["selectolax.lexbor", "selectolax.parser"]}
+
+
+def available_backends() -> List[str]:
+    backends = []
+    for name in EXTRACTORS:
+        for module in _REQUIRED_MODULES.get(name, [None]):
+            try:
+                if module:
+                    __import__(module)
+                backends.append(name)
+                break
+            except ImportError:
+                pass
+    return backends
+
+
+def get_extractor(backend: str = DEFAULT_BACKEND) -> Callable[[str], str]:
+    if backend not in EXTRACTORS:
+        raise Exception(
+            f"Unknown parser backend: {backend} (choose from {', '.join(EXTRACTORS)})")
+    return EXTRACTORS[backend]
+
+
+def extract_article_text(html: str, backend: str = DEFAULT_BACKEND) -> str:
+    return get_extractor(backend)(html)
+
+
+def is_empty_text(text: str) -> bool:
+    return not text or text.replace('\n', '').replace(' ', '') == ''
@@ -0,0 +1,143 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+
+from cnbc_crawler import http_cache, http_client, metrics
+from cnbc_crawler.extractors import (ARTICLE_BODY_CLASS, DEFAULT_BACKEND, GROUP_CLASS, extract_article_text,
+                                     is_empty_text)
+
+DEFAULT_CONCURRENCY = 8
+ARTICLE_FAILURES = "cnbc_article_failures_total"
+
+
+def get_parse_failure_reason(error: Exception) -> str:
+    # extractors 의 예외 메시지로 실패 이유를 나눈다.
+    message = str(error)
+    if ARTICLE_BODY_CLASS in message:
+        return "missing_article_body"
+    if GROUP_CLASS in message:
+        return "missing_group"
+    return "parse_error"
+
+
+def fetch_article_html(url: str) -> str:
+    # 캐시가 켜져 있으면 저장된 ETag / Last-Modified 로 조건부 요청을 보낸다(변경 없으면 304).
+    try:
+        with metrics.span("fetch"):
+            response = http_client.get(url, cache=http_cache.REVALIDATE)
+    except Exception:
+        metrics.inc(ARTICLE_FAILURES, reason="network")
+        raise
+    if response.status_code != 200:
+        metrics.inc(ARTICLE_FAILURES, reason=f"http_{response.status_code}")
+        raise Exception(
+            f"Response Error with status code {response.status_code}")
+    return response.text
+
+
+def extract_article_html(html: str, backend: str = DEFAULT_BACKEND) -> Optional[str]:
+    try:
+        # div.ArticleBody-articleBody > div.group > p 의 텍스트를 추출한다.
+        with metrics.span("parse"):
+            text = extract_article_text(html, backend)
+    except Exception as e:
+        # print(f"Error: {e}")
+        metrics.inc(ARTICLE_FAILURES, reason=get_parse_failure_reason(e))
+        return None
+    if is_empty_text(text):
+        metrics.inc(ARTICLE_FAILURES, reason="empty_text")
+        return None
+    return text
+
+
+def write_article_text(text: str, id: str, articles_dir='articles'):
+    # articles_dir 은 폴더 경로(articles/<id>.txt) 또는 corpus_store.PackedArticleStore
+    with metrics.span("write"):
+        if isinstance(articles_dir, str):
+            with open(os.path.join(articles_dir, f'{id}.txt'), 'w') as f:
+                f.write(text)
+        else:
+            articles_dir.put(id, text)
+
+
+def read_article_text(id: str, articles_dir='articles') -> str:
+    # write_article_text 로 저장한 본문을 다시 읽는다(search_index 색인용).
+    if isinstance(articles_dir, str):
+        with open(os.path.join(articles_dir, f'{id}.txt'), 'r') as f:
+            return f.read()
+    return articles_dir.get(id)
+
+
+def save_article_html(html: str, id: str, articles_dir='articles',
+                      backend: str = DEFAULT_BACKEND) -> bool:
+    text = extract_article_html(html, backend)
+    if text is None:
+        return False
+    try:
+        # 저장
+        write_article_text(text, id, articles_dir)
+        return True
+    except Exception as e:
+        # print(f"Error: {e}")
+        metrics.inc(ARTICLE_FAILURES, reason="write_error")
+        return False
+
+
+def link_article(id: str, articles_dir) -> bool:
+    # 공용 저장소(shared_store)에 다른 키워드가 이미 받은 기사가 있으면 참조만 추가한다.
+    link = getattr(articles_dir, "link", None)
+    return link is not None and link(id)
+
+
+def get_cbnc_article(url: str, id: str, articles_dir='articles',
+                     backend: str = DEFAULT_BACKEND) -> bool:
+    if link_article(id, articles_dir):
+        return True
+    try:
+        html = fetch_article_html(url)
+    except Exception as e:
+        # print(f"Error: {e}")
+        return False
+    return save_article_html(html, id, articles_dir, backend)
+
+
+def fetch_jobs(jobs: List[Tuple[List[Dict[str, any]], any]], concurrency: int = DEFAULT_CONCURRENCY,
+               on_done: Optional[Callable[[int, int, int], None]] = None,
+               backend: str = DEFAULT_BACKEND,
+               executor: Optional[ThreadPoolExecutor] = None) -> List[List[Dict[str, any]]]:
+    # jobs: (info_list, articles_dir) 목록. 여러 페이지/키워드를 하나의 동시성 한도 안에서 처리한다.
+    # articles_dir 은 폴더 경로 또는 PackedArticleStore 이다.
+    # 요청은 http_client(연결 풀 + 호스트별 속도 제한)로 막히는 방식이라 이벤트 루프 없이 스레드 풀에 바로 넣는다.
+    # 동시 요청 수는 executor 의 max_workers 로 제한되고, executor 를 넘기면 여러 호출(예: 동시에 도는 키워드들)이
+    # 같은 전역 한도를 공유한다. on_done(job_index, done, total) 은 호출한 스레드에서 불린다.
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+    try:
+        job_futures = [[executor.submit(get_cbnc_article, info["url"], info["id"], articles_dir, backend)
+                        for info in info_list] for info_list, articles_dir in jobs]
+        job_indexes = {future: job_index for job_index, futures in enumerate(job_futures) for future in futures}
+        done_counts = [0] * len(jobs)
+        for future in as_completed(job_indexes):
+            job_index = job_indexes[future]
+            done_counts[job_index] += 1
+            if on_done:
+                on_done(job_index, done_counts[job_index], len(job_futures[job_index]))
+        # 실패한 항목은 제외 (기존 get_article_list 와 동일한 결과)
+        return [[info for info, future in zip(info_list, futures) if future.result()]
+                for (info_list, articles_dir), futures in zip(jobs, job_futures)]
+    finally:
+        if own_executor:
+            executor.shutdown(wait=True)
+
+
+def fetch_article_list(info_list: List[Dict[str, any]], articles_dir='articles',
+                       concurrency: int = DEFAULT_CONCURRENCY,
+                       on_done: Optional[Callable[[int, int], None]] = None,
+                       backend: str = DEFAULT_BACKEND,
+                       executor: Optional[ThreadPoolExecutor] = None) -> List[Dict[str, any]]:
+    callback = None
+    if on_done:
+        def callback(job_index, done, total):
+            on_done(done, total)
+    return fetch_jobs([(info_list, articles_dir)], concurrency, callback, backend, executor)[0]
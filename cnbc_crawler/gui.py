@@ -0,0 +1,370 @@
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict
+
+from PyQt6.QtCore import QDate, QThread, pyqtSignal
+from PyQt6.QtGui import QFont, QIntValidator
+from PyQt6.QtWidgets import (
+    QApplication, QVBoxLayout, QWidget, QLineEdit, QPushButton, QLabel,
+    QSpinBox, QCheckBox, QFileDialog, QHBoxLayout, QMessageBox, QProgressBar
+)
+
+from cnbc_crawler.config import CrawlConfig
+from cnbc_crawler.crawler import get_page_date
+from cnbc_crawler.queryly import DEFAULT_ADDITIONALINDEXES, DEFAULT_QUERYLY_KEY
+from cnbc_crawler.session import CrawlSession
+
+# PyQt GUI. app.py 와 app/app.py(pyinstaller 용)는 main() 만 부른다.
+# 크롤링은 main.py 와 같은 CrawlSession / crawl_keyword 로 하고, 결과는 예전처럼 <저장 위치>/<키워드>_<시각>/ 에
+# 바로 저장한다(articles/, info_<키워드>).
+PROGRESS_INTERVAL = 0.1  # 진행 상황 시그널을 보내는 최소 간격(초). 기사마다 보내면 UI 이벤트 큐가 밀린다.
+
+
+class PageDateWorker(QThread):
+    # 페이지 날짜 확인: Queryly 요청을 UI 스레드 밖에서 보내고 결과(날짜 또는 "NaN")만 돌려준다.
+    result_signal = pyqtSignal(str)
+
+    def __init__(self, search_term: str, page: int, setting: Dict[str, any], parent=None):
+        super(PageDateWorker, self).__init__(parent)
+        self.search_term = search_term
+        self.page = page
+        self.setting = setting
+
+    def run(self):
+        self.result_signal.emit(get_page_date(self.search_term, self.page, self.setting))
+
+
+class Worker(QThread):
+    update_progress_signal = pyqtSignal(int, int, int, int)
+    finished_signal = pyqtSignal()
+
+    def __init__(self, setting: Dict[str, any], parent=None):
+        super(Worker, self).__init__(parent)
+        # search_term / start_page / end_page / full_path 외의 키는 CrawlConfig 로 넘긴다.
+        self.DEFAULT_SETTING = {
+            "search_term": "",
+            "start_page": 1,
+            "end_page": 3,
+            "save_as_json": True,
+            "save_location": os.getcwd(),
+            "batch_size": 10,
+            "concurrency": 8,
+            "parser_backend": "bs4",
+            "queryly_key": DEFAULT_QUERYLY_KEY,
+            "additionalindexes": DEFAULT_ADDITIONALINDEXES
+        }
+        self.setting = {**self.DEFAULT_SETTING, **setting}
+        self.last_emit = 0.0
+        self.emit_lock = threading.Lock()  # emit_progress 는 여러 다운로드 스레드에서 불린다.
+
+    def update_setting(self, setting):
+        self.setting = {**self.DEFAULT_SETTING, **setting}
+
+    def emit_progress(self, current_page, total_pages, done, total, force=False):
+        # PROGRESS_INTERVAL 안에 여러 기사가 끝나면 마지막 값만 보낸다. 페이지의 마지막 기사와 페이지 완료는 항상 보낸다.
+        now = time.monotonic()
+        with self.emit_lock:
+            if not force and done < total and now - self.last_emit < PROGRESS_INTERVAL:
+                return
+            self.last_emit = now
+        self.update_progress_signal.emit(current_page, total_pages, done, total)
+
+    def run(self):
+        try:
+            print("Crawling Start\n")
+            start_page = self.setting['start_page']
+            end_page = self.setting['end_page']
+            total_pages = end_page - start_page + 1
+            # 페이지 진행은 끝난 페이지 수로 센다. page_prefetch 로 여러 페이지의 기사가 같이 받아지므로
+            # 기사가 속한 페이지 번호를 쓰면 막대가 앞뒤로 움직인다.
+            progress = {"pages": 0, "done": 0, "total": 0}
+
+            def on_article(keyword, page, done, total):
+                progress["done"], progress["total"] = done, total
+                self.emit_progress(progress["pages"], total_pages, done, total)
+
+            def on_progress(keyword, page, target_page_num, article_count):  # 페이지가 끝날 때마다(순서대로) 불린다.
+                progress["pages"] += 1
+                self.emit_progress(progress["pages"], total_pages, progress["done"], progress["total"], force=True)
+
+            with CrawlSession(CrawlConfig.from_setting(self.setting), self.setting['full_path']) as session:
+                session.crawl_pages(self.setting['search_term'], start_page, end_page,
+                                    on_progress=on_progress, on_article=on_article,
+                                    should_stop=self.isInterruptionRequested, keyword_dir=self.setting['full_path'])
+                print(f"Crawling Finished!\n{session.format_stats()}")
+            self.finished_signal.emit()
+        except Exception as e:
+            print(f"Exception in worker thread: {str(e)}")
+            self.finished_signal.emit()
+
+    def stop(self):
+        self.requestInterruption()
+
+
+class NewsCrawlerApp(QWidget):
+    def __init__(self):
+        super().__init__()
+
+        self.setWindowTitle("News Crawler")
+        self.setGeometry(100, 100, 420, 600)
+        layout = QVBoxLayout()
+
+        # 제목 설정
+        main_title = QLabel("메인 설정")
+        main_title.setFont(QFont('Arial', 14, QFont.Weight.Bold))
+        layout.addWidget(main_title)
+
+        # 검색 키워드
+        search_layout = QHBoxLayout()
+        search_layout.addWidget(QLabel("검색 키워드"))
+        self.search_term_edit = QLineEdit()
+        self.search_term_edit.setPlaceholderText("검색 키워드를 입력하세요")
+        self.search_term_edit.setStyleSheet(
+            "border-radius: 5px; padding: 2px;")
+        search_layout.addWidget(self.search_term_edit)
+        layout.addLayout(search_layout)
+
+        # 시작 페이지
+        start_page_layout = QHBoxLayout()
+        start_page_layout.addWidget(QLabel("시작 페이지"))
+        self.start_page_edit = QLineEdit()
+        self.start_page_edit.setValidator(
+            QIntValidator(1, 10000, self))
+        self.start_page_edit.setText("1")  # 기본 값 설정
+        self.start_page_edit.setStyleSheet(
+            "border-radius: 5px; padding: 2px;")
+        start_page_layout.addWidget(self.start_page_edit)
+        self.start_date_btn = QPushButton("페이지 날짜 확인")
+        self.start_date_label = QLabel("0000-00-00")
+        self.start_date_btn.clicked.connect(
+            lambda: self.get_page_date(self.start_date_label, True))
+        start_page_layout.addWidget(self.start_date_btn)
+        start_page_layout.addWidget(self.start_date_label)
+        layout.addLayout(start_page_layout)
+
+        # 끝 페이지
+        end_page_layout = QHBoxLayout()
+        end_page_layout.addWidget(QLabel("끝 페이지"))
+        self.end_page_edit = QLineEdit()
+        self.end_page_edit.setValidator(
+            QIntValidator(1, 10000, self))  # 예시 범위는 1에서 10000까지
+        self.end_page_edit.setText("3")  # 기본 값 설정
+        self.end_page_edit.setStyleSheet(
+            "border-radius: 5px; padding: 2px;")
+        end_page_layout.addWidget(self.end_page_edit)
+        self.end_date_btn = QPushButton("페이지 날짜 확인")
+        self.end_date_label = QLabel("0000-00-00")
+        self.end_date_btn.clicked.connect(
+            lambda: self.get_page_date(self.end_date_label, False))
+        end_page_layout.addWidget(self.end_date_btn)
+        end_page_layout.addWidget(self.end_date_label)
+        layout.addLayout(end_page_layout)
+
+        # 저장 위치
+        save_layout = QHBoxLayout()
+        self.save_location_edit = QLineEdit()
+        self.save_location_edit.setPlaceholderText("저장 위치를 선택하세요")
+        self.save_location_edit.setStyleSheet(
+            "border-radius: 5px; padding: 2px;")
+        save_layout.addWidget(QLabel("저장 위치"))
+        self.save_button = QPushButton("저장 위치 선택")
+        self.save_button.clicked.connect(self.set_save_location)
+        save_layout.addWidget(self.save_location_edit)
+        save_layout.addWidget(self.save_button)
+        layout.addLayout(save_layout)
+
+        # Json/Excel 저장
+        self.save_as_json_check = QCheckBox("Json/Excel로 저장")
+        self.save_as_json_check.setChecked(True)
+        layout.addWidget(self.save_as_json_check)
+
+        # 부가 설정 제목
+        extra_settings_title = QLabel("부과 설정 - 되도록이면 수정하지 말 것")
+        extra_settings_title.setFont(QFont('Arial', 14, QFont.Weight.Bold))
+        layout.addWidget(extra_settings_title)
+
+        # 배치 크기
+        batch_size_layout = QHBoxLayout()
+        batch_size_layout.addWidget(QLabel("배치 크기"))
+        self.batch_size_edit = QSpinBox()
+        self.batch_size_edit.setValue(10)
+        self.batch_size_edit.setStyleSheet(
+            "QSpinBox { border-radius: 2px; padding: 2px; min-width: 100px; }")
+        batch_size_layout.addWidget(self.batch_size_edit)
+        layout.addLayout(batch_size_layout)
+
+        # Queryly Key
+        queryly_key_layout = QHBoxLayout()
+        queryly_key_layout.addWidget(QLabel("queryly_key"))
+        self.queryly_key_edit = QLineEdit("queryly_key")
+        self.queryly_key_edit.setPlaceholderText("Queryly 키를 입력하세요")
+        self.queryly_key_edit.setText(DEFAULT_QUERYLY_KEY)
+        self.queryly_key_edit.setStyleSheet(
+            "border-radius: 5px; padding: 2px;")
+        queryly_key_layout.addWidget(self.queryly_key_edit)
+        layout.addLayout(queryly_key_layout)
+
+        # 추가 인덱스
+        additionalindexes_layout = QHBoxLayout()
+        additionalindexes_layout.addWidget(QLabel("additionalindexes"))
+        self.additionalindexes_edit = QLineEdit("additionalindexes")
+        self.additionalindexes_edit.setPlaceholderText("추가 인덱스를 입력하세요")
+        self.additionalindexes_edit.setText(DEFAULT_ADDITIONALINDEXES)
+        self.additionalindexes_edit.setStyleSheet(
+            "border-radius: 5px; padding: 2px;")
+        additionalindexes_layout.addWidget(self.additionalindexes_edit)
+        layout.addLayout(additionalindexes_layout)
+
+        # 뉴스 가져오기 버튼 설정 및 시그널 연결
+        self.get_news_button = QPushButton("뉴스 가져오기")
+        self.get_news_button.setStyleSheet(
+            "QPushButton { background-color: #4C8BF5; color: white; font-size: 14px; padding: 4px; border-radius: 5px;}")
+        self.get_news_button.clicked.connect(self.toggle_crawling)
+        layout.addWidget(self.get_news_button)
+
+        # 페이지 및 뉴스 항목 진행 상태를 나타내는 프로그래스 바와 레이블
+        self.setup_progress_bars(layout)
+
+        self.setLayout(layout)
+        self.is_crawling = False
+        self.date_workers = []  # 실행 중인 PageDateWorker 참조(끝나기 전에 GC 되지 않게)
+
+    def get_page_date(self, label, is_start: bool):
+        search_term = self.search_term_edit.text()
+        if not self.search_term_edit.text():
+            QMessageBox.warning(self, "입력 필드 오류", "검색 키워드를 채워주세요")
+            return
+
+        page = int(self.start_page_edit.text()) if is_start else int(
+            self.end_page_edit.text())
+        setting = CrawlConfig(batch_size=int(self.batch_size_edit.value()),
+                              queryly_key=self.queryly_key_edit.text(),
+                              additionalindexes=self.additionalindexes_edit.text()).to_setting()
+        # 요청은 별도 스레드에서 보내고, 끝나면 시그널로 레이블만 바꾼다(창이 멈추지 않음).
+        button = self.start_date_btn if is_start else self.end_date_btn
+        button.setEnabled(False)
+        label.setText("...")
+        worker = PageDateWorker(search_term, page, setting, self)
+        worker.result_signal.connect(label.setText)
+        worker.finished.connect(lambda: button.setEnabled(True))
+        worker.finished.connect(lambda: self.date_workers.remove(worker))
+        self.date_workers.append(worker)
+        worker.start()
+
+    def set_save_location(self):
+        location = QFileDialog.getExistingDirectory(self, "Select Directory")
+        if location:
+            self.save_location_edit.setText(location)
+
+    def set_random_date(self, label):
+        current_year = QDate.currentDate().year()
+        random_date = QDate(
+            current_year - 1, random.randint(1, 12), random.randint(1, 28))
+        label.setText(random_date.toString("yyyy-MM-dd"))
+
+    def setup_progress_bars(self, layout):
+        page_progress_layout = QHBoxLayout()
+        self.page_progress = QProgressBar(self)
+        self.page_progress_label = QLabel("0/0")
+        page_progress_layout.addWidget(self.page_progress)
+        page_progress_layout.addWidget(self.page_progress_label)
+        layout.addLayout(page_progress_layout)
+
+        news_progress_layout = QHBoxLayout()
+        self.news_progress = QProgressBar(self)
+        self.news_progress_label = QLabel("0/0")
+        news_progress_layout.addWidget(self.news_progress)
+        news_progress_layout.addWidget(self.news_progress_label)
+        layout.addLayout(news_progress_layout)
+
+    def toggle_crawling(self):
+        if not self.is_crawling:
+            # 시작 전 설정 확인
+            if not self.validate_input():
+                return
+
+            # Set stop button
+            self.is_crawling = True
+            self.get_news_button.setText("중지")
+            self.get_news_button.setStyleSheet(
+                "QPushButton { background-color: grey; color: white; font-size: 14px; padding: 4px; border-radius: 5px;}")
+
+            # OS setup
+            save_location = self.save_location_edit.text()
+            search_term = self.search_term_edit.text()
+            full_path = self.os_setup(save_location, search_term)
+
+            # 입력 값 가져오기
+            setting = {
+                'search_term': search_term,
+                'start_page': int(self.start_page_edit.text()),
+                'end_page': int(self.end_page_edit.text()),
+                'save_as_json': self.save_as_json_check.isChecked(),
+                'save_location': save_location,
+                'full_path': full_path,
+                'batch_size': int(self.batch_size_edit.value()),
+                'queryly_key': self.queryly_key_edit.text(),
+                'additionalindexes': self.additionalindexes_edit.text()
+            }
+
+            # Set new thread
+            self.worker = Worker(setting, self)
+            self.worker.update_progress_signal.connect(self.update_progress)
+            self.worker.finished_signal.connect(self.crawling_finished)
+            self.worker.start()
+        else:
+            self.stop_crawling()
+
+    def stop_crawling(self):
+        self.worker.stop()
+        self.reset_ui_after_crawling()
+
+    def crawling_finished(self):
+        self.reset_ui_after_crawling()
+
+    def reset_ui_after_crawling(self):
+        self.is_crawling = False
+        self.get_news_button.setText("뉴스 가져오기")
+        self.get_news_button.setStyleSheet(
+            "QPushButton { background-color: #4C8BF5; color: white; font-size: 14px; padding: 4px; border-radius: 5px;}")
+
+    def os_setup(self, save_location: str, search_term: str):
+        # OS 디렉토리 설정
+        project_dir_name = f"{search_term}_"\
+            f"{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        full_path = os.path.join(save_location, project_dir_name)
+        self.full_path = full_path
+        # articles / info_logs 폴더는 crawl_keyword 가 full_path 아래에 만든다.
+        os.makedirs(full_path, exist_ok=True)
+        return full_path
+
+    def validate_input(self):
+        if not self.search_term_edit.text():
+            QMessageBox.warning(self, "입력 필드 오류", "검색 키워드를 채워주세요")
+            return False
+        if not self.save_location_edit.text():
+            QMessageBox.warning(self, "입력 필드 오류", "저장 위치를 채워주세요")
+            return False
+        if int(self.start_page_edit.text()) > int(self.end_page_edit.text()):
+            QMessageBox.warning(self, "입력 필드 오류", "시작 페이지가 끝 페이지보다 큽니다")
+            return False
+        return True
+
+    def update_progress(self, current_page, total_pages, current_news, news_count):
+        self.page_progress.setMaximum(total_pages)
+        self.page_progress.setValue(current_page)
+        self.page_progress_label.setText(f"{current_page}/{total_pages}")
+        self.news_progress.setMaximum(news_count)
+        self.news_progress.setValue(current_news)
+        self.news_progress_label.setText(f"{current_news}/{news_count}")
+
+
+def main():
+    app = QApplication(sys.argv)
+    ex = NewsCrawlerApp()
+    ex.show()
+    sys.exit(app.exec())
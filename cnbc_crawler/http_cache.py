@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Callable, Dict, Optional
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3  # 압축된 본문 기준 캐시 최대 크기
+DEFAULT_FRESH_FOR = 0              # 이 시간(초) 안에 저장한 응답은 다시 묻지 않고 그대로 쓴다(0 이면 매번 조건부 요청)
+EVICT_TARGET_RATIO = 0.9           # 크기를 넘으면 이 비율까지 오래 안 쓴 항목부터 지운다
+
+# 캐시 정책 (http_client.get(url, cache=...))
+REVALIDATE = "revalidate"  # 기사 페이지: 저장된 응답이 있으면 If-None-Match / If-Modified-Since 로 조건부 요청
+RECORD = "record"          # Queryly API: 항상 새로 요청하고 응답만 저장(offline 모드에서 다시 쓰기 위해)
+
+# 캐시 모드
+MODE_NORMAL = "normal"
+MODE_OFFLINE = "offline"   # 네트워크를 쓰지 않고 저장된 응답만 돌려준다. 없으면 예외
+
+
+class CachedResponse:
+    # requests.Response 에서 크롤러가 쓰는 부분(status_code, headers, content, text, json())만 흉내 낸다.
+    def __init__(self, status_code: int, headers: Dict[str, str], content: bytes,
+                 encoding: Optional[str] = None, from_cache: bool = True):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or "utf-8"
+        self.from_cache = from_cache
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class HttpCache:
+    # 디스크 HTTP 캐시. 메타데이터(ETag, Last-Modified, 마지막 사용 시각)는 SQLite, 본문은 zlib 압축 파일.
+    # 전체 크기가 max_bytes 를 넘으면 마지막으로 쓴 시각이 오래된 항목부터 지운다(LRU).
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES, mode: str = MODE_NORMAL,
+                 fresh_for: float = DEFAULT_FRESH_FOR):
+        if mode not in (MODE_NORMAL, MODE_OFFLINE):
+            raise Exception(f"Unknown http cache mode: {mode} (normal / offline)")
+        self.cache_dir = cache_dir
+        self.bodies_dir = os.path.join(cache_dir, "bodies")
+        self.max_bytes = max_bytes
+        self.mode = mode
+        self.fresh_for = fresh_for
+        os.makedirs(self.bodies_dir, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(cache_dir, "cache.sqlite"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT,
+                encoding TEXT,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+        self.conn.commit()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        self.stats = {"fresh_hits": 0, "not_modified": 0, "misses": 0, "stored": 0,
+                      "evicted": 0, "offline_hits": 0, "offline_misses": 0}
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha1(url.encode()).hexdigest()
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.bodies_dir, key[:2], f"{key}.z")
+
+    def _count(self, name: str):
+        with self.lock:
+            self.stats[name] += 1
+
+    def _lookup(self, key: str) -> Optional[Dict[str, any]]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT status, etag, last_modified, content_type, encoding, stored_at FROM entries WHERE key = ?",
+                (key,)).fetchone()
+        if row is None:
+            return None
+        status, etag, last_modified, content_type, encoding, stored_at = row
+        return {"status": status, "etag": etag, "last_modified": last_modified,
+                "content_type": content_type, "encoding": encoding, "stored_at": stored_at}
+
+    def _load(self, key: str, entry: Dict[str, any], refresh: bool = False) -> Optional[CachedResponse]:
+        try:
+            with open(self._body_path(key), 'rb') as f:
+                content = zlib.decompress(f.read())
+        except Exception:  # 본문 파일이 없거나 깨졌으면 없는 것으로 본다.
+            return None
+        now = time.time()
+        with self.lock:
+            if refresh:  # 304: 다시 확인했으므로 신선도 기준 시각도 갱신한다.
+                self.conn.execute("UPDATE entries SET accessed_at = ?, stored_at = ? WHERE key = ?", (now, now, key))
+            else:
+                self.conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+        headers = {}
+        if entry["etag"]:
+            headers["ETag"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["Last-Modified"] = entry["last_modified"]
+        if entry["content_type"]:
+            headers["Content-Type"] = entry["content_type"]
+        return CachedResponse(entry["status"], headers, content, entry["encoding"])
+
+    def store(self, url: str, response):
+        key = self._key(url)
+        data = zlib.compress(response.content)
+        body_path = self._body_path(key)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        temp_path = f"{body_path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, body_path)
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self.conn.execute("""
+                INSERT OR REPLACE INTO entries
+                    (key, url, status, etag, last_modified, content_type, encoding, size, stored_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (key, url, response.status_code, response.headers.get("ETag"),
+                 response.headers.get("Last-Modified"), response.headers.get("Content-Type"),
+                 getattr(response, "encoding", None), len(data), now, now))
+            self.conn.commit()
+            self.total_bytes += len(data) - (row[0] if row else 0)
+            self.stats["stored"] += 1
+        self._evict()
+
+    def _evict(self):
+        with self.lock:
+            if self.total_bytes <= self.max_bytes:
+                return
+            target = self.max_bytes * EVICT_TARGET_RATIO
+            removed = []
+            for key, size in self.conn.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+                if self.total_bytes <= target:
+                    break
+                removed.append(key)
+                self.total_bytes -= size
+            self.conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in removed])
+            self.conn.commit()
+            self.stats["evicted"] += len(removed)
+        for key in removed:
+            try:
+                os.remove(self._body_path(key))
+            except FileNotFoundError:
+                pass
+
+    def get(self, url: str, fetch: Callable[..., any], policy: str = REVALIDATE):
+        # fetch(url, headers=...) 는 실제 요청 함수(http_client.HttpClient._get).
+        key = self._key(url)
+        entry = self._lookup(key)
+        if self.mode == MODE_OFFLINE:
+            cached = self._load(key, entry) if entry else None
+            if cached is None:
+                self._count("offline_misses")
+                raise Exception(f"Offline cache miss: {url}")
+            self._count("offline_hits")
+            return cached
+
+        headers = {}
+        if policy == REVALIDATE and entry is not None:
+            if time.time() - entry["stored_at"] < self.fresh_for:
+                cached = self._load(key, entry)
+                if cached is not None:
+                    self._count("fresh_hits")
+                    return cached
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = fetch(url, headers=headers) if headers else fetch(url)
+        if response.status_code == 304 and entry is not None:
+            cached = self._load(key, entry, refresh=True)
+            if cached is not None:
+                self._count("not_modified")
+                return cached
+            response = fetch(url)  # 본문 파일을 잃어버렸으면 조건 없이 다시 받는다.
+        self._count("misses")
+        if response.status_code == 200:
+            self.store(url, response)
+        return response
+
+    def get_stats(self) -> Dict[str, any]:
+        with self.lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            return dict(self.stats, entries=entries, bytes=self.total_bytes)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def format_stats(stats: Dict[str, any]) -> str:
+    return f"entries: {stats['entries']} ({stats['bytes'] / 1024 ** 2:.1f} MiB), "\
+        f"fresh hits: {stats['fresh_hits']}, 304: {stats['not_modified']}, "\
+        f"misses: {stats['misses']}, evicted: {stats['evicted']}, "\
+        f"offline hits/misses: {stats['offline_hits']}/{stats['offline_misses']}"
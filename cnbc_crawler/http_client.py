@@ -0,0 +1,297 @@
+import contextlib
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from cnbc_crawler import http_cache, metrics, rate_limiter
+
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 30
+DEFAULT_POOL_CONNECTIONS = 10  # 호스트별 커넥션 풀 개수
+DEFAULT_POOL_MAXSIZE = 16      # 호스트 하나당 유지할 keep-alive 연결 수
+DEFAULT_MAX_RETRIES = 3        # 403/429/5xx 응답을 백오프 후 다시 요청하는 횟수
+RETRY_BACKOFF = 0.5            # scheduler 가 없을 때 연결 실패 후 다시 요청하기 전 대기 시간(초), 실패마다 2배
+
+
+class ConnectionStats:
+    # 요청 수와 새로 연 연결 수를 호스트별로 센다. 재사용 수 = 요청 수 - 새 연결 수
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hosts: Dict[str, Dict[str, int]] = {}
+
+    def _host(self, host: str) -> Dict[str, int]:
+        if host not in self.hosts:
+            self.hosts[host] = {"requests": 0, "opened": 0}
+        return self.hosts[host]
+
+    def add_request(self, host: str):
+        with self.lock:
+            self._host(host)["requests"] += 1
+
+    def add_connection(self, host: str):
+        with self.lock:
+            self._host(host)["opened"] += 1
+
+    def as_dict(self) -> Dict[str, any]:
+        with self.lock:
+            hosts = {}
+            for host, count in self.hosts.items():
+                hosts[host] = {
+                    "requests": count["requests"],
+                    "connections_opened": count["opened"],
+                    "connections_reused": max(0, count["requests"] - count["opened"]),
+                }
+        return {
+            "requests": sum(h["requests"] for h in hosts.values()),
+            "connections_opened": sum(h["connections_opened"] for h in hosts.values()),
+            "connections_reused": sum(h["connections_reused"] for h in hosts.values()),
+            "hosts": hosts,
+        }
+
+
+def _counting_pool_classes(stats: ConnectionStats) -> Dict[str, type]:
+    # urllib3 가 TCP(+TLS) 연결을 새로 맺을 때마다 connect() 가 호출된다.
+    def connect(self):
+        stats.add_connection(self.host)
+        return super(type(self), self).connect()
+
+    http_conn = type("CountingHTTPConnection",
+                     (HTTPConnection,), {"connect": connect})
+    https_conn = type("CountingHTTPSConnection",
+                      (HTTPSConnection,), {"connect": connect})
+    return {
+        "http": type("CountingHTTPConnectionPool", (HTTPConnectionPool,), {"ConnectionCls": http_conn}),
+        "https": type("CountingHTTPSConnectionPool", (HTTPSConnectionPool,), {"ConnectionCls": https_conn}),
+    }
+
+
+class CountingAdapter(HTTPAdapter):
+    def __init__(self, stats: ConnectionStats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _counting_pool_classes(
+            self.stats)
+
+    def send(self, request, **kwargs):
+        self.stats.add_request(urlsplit(request.url).hostname or "")
+        return super().send(request, **kwargs)
+
+
+class HttpClient:
+    # 모든 Queryly / CNBC 요청이 공유하는 keep-alive 세션.
+    # http2=True 이고 httpx[http2] 가 설치되어 있으면 httpx 를 사용한다.
+    def __init__(self, connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT,
+                 pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 http2: bool = False,
+                 scheduler: Optional[rate_limiter.RateScheduler] = None,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 max_per_host: Optional[int] = None,
+                 cache: Optional[http_cache.HttpCache] = None):
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.scheduler = scheduler
+        self.max_retries = max_retries
+        # 호스트별 동시 요청 수 제한(None 이면 제한 없음)
+        self.max_per_host = max_per_host
+        self.cache = cache
+        self.host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self.host_lock = threading.Lock()
+        self.stats = ConnectionStats()
+        self.http2 = False
+        self._httpx_client = None
+        self._session = None
+
+        if http2:
+            try:
+                import httpx
+                self._httpx_client = httpx.Client(
+                    http2=True,
+                    follow_redirects=True,
+                    timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                    limits=httpx.Limits(max_connections=pool_connections * pool_maxsize,
+                                        max_keepalive_connections=pool_maxsize))
+                self.http2 = True
+            except ImportError:
+                print("Warning: httpx[http2] is not installed. Fall back to HTTP/1.1")
+
+        if self._httpx_client is None:
+            self._session = requests.Session()
+            adapter = CountingAdapter(self.stats, pool_connections=pool_connections,
+                                      pool_maxsize=pool_maxsize)
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
+
+    def get(self, url: str, cache: Optional[str] = None, **kwargs):
+        # cache: None 이면 캐시를 쓰지 않고, http_cache.REVALIDATE / RECORD 이면 디스크 캐시를 거친다.
+        # 캐시가 offline 모드이면 네트워크 없이 캐시에 저장된 응답만 돌려준다.
+        if self.cache is not None and cache is not None:
+            return self.cache.get(url, lambda url, **headers: self._get(url, **headers, **kwargs), cache)
+        return self._get(url, **kwargs)
+
+    def _get(self, url: str, **kwargs):
+        # scheduler 가 있으면 호스트별 토큰을 받은 뒤 요청하고, 응답 코드와 지연 시간을 알려준다.
+        # 차단 응답(403/429/5xx)이나 연결 실패는 백오프가 끝난 뒤 max_retries 번까지 다시 요청한다.
+        host = urlsplit(url).hostname or ""
+        for attempt in range(self.max_retries + 1):
+            if self.scheduler is not None:
+                self.scheduler.acquire(host)
+            started = time.monotonic()
+            try:
+                with self._host_slot(host):
+                    response = self._send(url, host, **kwargs)
+            except Exception:
+                metrics.inc("cnbc_http_requests_total", host=host, status="error")
+                if self.scheduler is not None:
+                    self.scheduler.report(host, 0, time.monotonic() - started)
+                if attempt == self.max_retries:
+                    raise
+                if self.scheduler is None:  # 백오프를 해 줄 scheduler 가 없으면 직접 잠깐 쉰다(equal jitter).
+                    delay = RETRY_BACKOFF * 2 ** attempt
+                    time.sleep(delay / 2 + random.uniform(0, delay / 2))
+                continue
+
+            metrics.inc("cnbc_http_requests_total", host=host, status=response.status_code)
+            metrics.observe("cnbc_http_request_seconds", time.monotonic() - started, host=host)
+            if self.scheduler is not None:
+                self.scheduler.report(
+                    host, response.status_code, time.monotonic() - started,
+                    rate_limiter.parse_retry_after(response.headers.get("Retry-After")))
+            if self.scheduler is None or attempt == self.max_retries \
+                    or not rate_limiter.is_throttle_status(response.status_code):
+                return response
+
+    def _host_slot(self, host: str):
+        if self.max_per_host is None:
+            return contextlib.nullcontext()
+        with self.host_lock:
+            if host not in self.host_semaphores:
+                self.host_semaphores[host] = threading.BoundedSemaphore(
+                    self.max_per_host)
+            return self.host_semaphores[host]
+
+    def _send(self, url: str, host: str, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        if self._session is not None:
+            return self._session.get(url, **kwargs)
+
+        self.stats.add_request(host)
+
+        def trace(event_name, info):
+            if event_name == "connection.connect_tcp.complete":
+                self.stats.add_connection(host)
+        timeout = kwargs.pop("timeout")
+        if isinstance(timeout, tuple):
+            import httpx
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        return self._httpx_client.get(url, timeout=timeout,
+                                      extensions={"trace": trace}, **kwargs)
+
+    def get_stats(self) -> Dict[str, any]:
+        return self.stats.as_dict()
+
+    def get_rate_stats(self) -> Dict[str, Dict[str, any]]:
+        return self.scheduler.get_stats() if self.scheduler is not None else {}
+
+    def get_cache_stats(self) -> Optional[Dict[str, any]]:
+        return None if self.cache is None else self.cache.get_stats()
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+        if self._httpx_client is not None:
+            self._httpx_client.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def _make_cache(setting: Dict[str, any]) -> Optional[http_cache.HttpCache]:
+    # http_cache_dir 가 없으면 캐시를 쓰지 않는다.
+    if not setting.get("http_cache_dir"):
+        return None
+    return http_cache.HttpCache(
+        setting["http_cache_dir"],
+        max_bytes=setting.get("http_cache_max_bytes", http_cache.DEFAULT_MAX_BYTES),
+        mode=setting.get("http_cache_mode", http_cache.MODE_NORMAL),
+        fresh_for=setting.get("http_cache_fresh_for", http_cache.DEFAULT_FRESH_FOR))
+
+
+def configure(setting: Optional[Dict[str, any]] = None) -> HttpClient:
+    # setting 의 connect_timeout / read_timeout / pool_maxsize / http2 / rate_limit 키로
+    # 공유 클라이언트를 다시 만든다. rate_limit 가 None 이면 속도 제한을 하지 않는다.
+    # http_cache_dir / http_cache_max_bytes / http_cache_mode / http_cache_fresh_for 로 디스크 캐시를 켠다.
+    global _client
+    setting = setting or {}
+    scheduler = None
+    if setting.get("rate_limit", rate_limiter.DEFAULT_RATE) is not None:
+        scheduler = rate_limiter.RateScheduler(
+            rate=setting.get("rate_limit", rate_limiter.DEFAULT_RATE),
+            min_rate=setting.get("min_rate", rate_limiter.DEFAULT_MIN_RATE),
+            max_rate=setting.get("max_rate", rate_limiter.DEFAULT_MAX_RATE),
+            burst=setting.get("burst", rate_limiter.DEFAULT_BURST))
+    client = HttpClient(
+        connect_timeout=setting.get("connect_timeout", DEFAULT_CONNECT_TIMEOUT),
+        read_timeout=setting.get("read_timeout", DEFAULT_READ_TIMEOUT),
+        pool_connections=setting.get("pool_connections", DEFAULT_POOL_CONNECTIONS),
+        pool_maxsize=setting.get("pool_maxsize", DEFAULT_POOL_MAXSIZE),
+        http2=setting.get("http2", False),
+        scheduler=scheduler,
+        max_retries=setting.get("max_retries", DEFAULT_MAX_RETRIES),
+        max_per_host=setting.get("max_per_host"),
+        cache=_make_cache(setting))
+    with _client_lock:
+        old_client, _client = _client, client
+    if old_client is not None:
+        old_client.close()
+    return client
+
+
+def get_client() -> HttpClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient(scheduler=rate_limiter.RateScheduler())
+        return _client
+
+
+def get(url: str, cache: Optional[str] = None, **kwargs):
+    return get_client().get(url, cache, **kwargs)
+
+
+def get_stats() -> Dict[str, any]:
+    return get_client().get_stats()
+
+
+def get_rate_stats() -> Dict[str, Dict[str, any]]:
+    return get_client().get_rate_stats()
+
+
+def get_cache_stats() -> Optional[Dict[str, any]]:
+    return get_client().get_cache_stats()
+
+
+def penalize(host: Optional[str] = None, reason: str = "manual"):
+    # 정상 응답이지만 결과가 비정상(빈 페이지 연속 등)일 때 호출해서 속도를 줄인다.
+    scheduler = get_client().scheduler
+    if scheduler is not None:
+        scheduler.penalize(host, reason)
+
+
+def format_stats(stats: Dict[str, any]) -> str:
+    return f"requests: {stats['requests']}, "\
+        f"connections opened: {stats['connections_opened']}, "\
+        f"reused: {stats['connections_reused']}"
@@ -0,0 +1,173 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from cnbc_crawler import metrics, shared_store
+from cnbc_crawler.config import (DEFAULT_KEYWORD_WORKERS, DEFAULT_LARGE_PAGE_THRESHOLD, DEFAULT_MAX_LARGE_KEYWORDS,
+                                 DEFAULT_PROGRESS_INTERVAL)
+from cnbc_crawler.crawler import crawl_keyword, find_target_page, get_resume_start_page
+
+
+class KeywordScheduler:
+    # 여러 키워드를 동시에 크롤링한다.
+    # - 키워드마다 한 번에 한 페이지씩만 진행하고, 기사 다운로드는 전역 스레드 풀(concurrency) 하나를 공유한다.
+    #   풀은 FIFO 라서 동시에 도는 키워드들의 페이지가 번갈아 처리된다.
+    # - 호스트별 동시 요청 수는 http_client 의 max_per_host 로 제한한다.
+    # - 큰 키워드는 동시에 max_large_keywords 개까지만 돌고, 나머지 자리는 작은 키워드들이 계속 돌려 쓴다.
+    # executor 를 주면(CrawlSession) 그 풀을 쓰고 닫지 않는다. 없으면 run() 동안 concurrency 크기의 풀을 만든다.
+    def __init__(self, keyword_list: List[str], project_dir: str, setting: Dict[str, any], target_date: datetime,
+                 start_page: int = 1, resume: bool = False, parse_pipeline=None, seen_index=None,
+                 search_index=None, executor: Optional[ThreadPoolExecutor] = None):
+        self.project_dir = project_dir
+        self.executor = executor
+        self.seen_index = seen_index
+        self.search_index = search_index
+        self.incremental = setting.get("incremental", False)
+        self.setting = setting
+        self.target_date = target_date
+        self.start_page = start_page
+        self.resume = resume
+        self.parse_pipeline = parse_pipeline
+        self.shared_store = None  # article_store="shared" 일 때 run() 동안 모든 키워드가 같이 쓴다.
+        self.keyword_workers = setting.get("keyword_workers", DEFAULT_KEYWORD_WORKERS)
+        self.large_page_threshold = setting.get(
+            "large_page_threshold", DEFAULT_LARGE_PAGE_THRESHOLD)
+        self.max_large_keywords = setting.get(
+            "max_large_keywords", DEFAULT_MAX_LARGE_KEYWORDS)
+        self.progress_interval = setting.get(
+            "progress_interval", DEFAULT_PROGRESS_INTERVAL)
+
+        self.lock = threading.Lock()
+        self.pending = deque(keyword_list)
+        self.deferred_large = deque()
+        self.large_active = 0
+        self.progress: Dict[str, Dict[str, any]] = {
+            keyword: {"status": "waiting", "page": 0, "target_page": None, "articles": 0}
+            for keyword in keyword_list}
+        self.finished = threading.Event()
+
+    def _next_job(self):
+        # (keyword, start_page, target_page, is_large) 또는 None
+        with self.lock:
+            if self.deferred_large and self.large_active < self.max_large_keywords:
+                self.large_active += 1
+                return (*self.deferred_large.popleft(), True)
+            if self.pending:
+                return (self.pending.popleft(), None, None, False)
+            return None
+
+    def _update(self, keyword: str, **values):
+        with self.lock:
+            self.progress[keyword].update(values)
+
+    def _on_progress(self, keyword: str, page: int, target_page: int, article_count: int):
+        self._update(keyword, page=page, target_page=target_page,
+                     articles=article_count)
+
+    def _prepare(self, keyword: str):
+        # 시작 페이지와 목표 페이지를 구한다. 이미 끝난 키워드면 None
+        start_page = self.start_page
+        if self.resume:
+            start_page = get_resume_start_page(keyword, self.project_dir)
+            if start_page is None:
+                return None
+        if self.incremental:  # 증분 모드는 페이지 수를 미리 알 필요가 없다.
+            return start_page, None
+        target_page = find_target_page(keyword, self.target_date, self.setting)
+        return start_page, target_page
+
+    def _worker(self, executor: ThreadPoolExecutor):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            keyword, start_page, target_page, is_large = job
+            try:
+                if target_page is None:
+                    self._update(keyword, status="probing")
+                    prepared = self._prepare(keyword)
+                    if prepared is None:
+                        self._update(keyword, status="skipped")
+                        continue
+                    start_page, target_page = prepared
+                    if target_page is not None and target_page - start_page + 1 >= self.large_page_threshold:
+                        with self.lock:
+                            if self.large_active >= self.max_large_keywords:
+                                # 큰 키워드 자리가 없으면 뒤로 미루고 작은 키워드를 먼저 처리한다.
+                                self.deferred_large.append(
+                                    (keyword, start_page, target_page))
+                                self.progress[keyword]["status"] = "deferred"
+                                continue
+                            self.large_active += 1
+                        is_large = True
+
+                self._update(keyword, status="running", page=start_page - 1,
+                             target_page=target_page)
+                with metrics.span("keyword"):
+                    crawl_keyword(keyword, self.project_dir, self.setting, self.target_date,
+                                  start_page, target_page, self.parse_pipeline, executor,
+                                  self._on_progress, show_progress_bar=self.keyword_workers == 1,
+                                  seen_index=self.seen_index, incremental=self.incremental,
+                                  shared_store=self.shared_store, search_index=self.search_index)
+                self._update(keyword, status="done")
+                metrics.inc("cnbc_keywords_total", status="done")
+            except Exception as e:
+                print(f"Error: {keyword} failed ({e})")
+                self._update(keyword, status="failed")
+                metrics.inc("cnbc_keywords_total", status="failed")
+            finally:
+                if is_large:
+                    with self.lock:
+                        self.large_active -= 1
+
+    def get_progress(self) -> Dict[str, Dict[str, any]]:
+        with self.lock:
+            return {keyword: dict(p) for keyword, p in self.progress.items()}
+
+    def format_progress(self) -> str:
+        progress = self.get_progress()
+        counts = {}
+        for p in progress.values():
+            counts[p["status"]] = counts.get(p["status"], 0) + 1
+        running = [f"{keyword} {p['page']}/{p['target_page']} ({p['articles']} articles)"
+                   for keyword, p in progress.items() if p["status"] == "running"]
+        summary = ", ".join(f"{status}: {count}" for status, count in counts.items())
+        return f"[{summary}] " + " | ".join(running)
+
+    def _report(self):
+        while not self.finished.wait(self.progress_interval):
+            print(f"\nProgress {self.format_progress()}\n")
+
+    def run(self) -> Dict[str, Dict[str, any]]:
+        self.finished.clear()
+        if self.setting.get("article_store") == "shared":
+            self.shared_store = shared_store.SharedArticleStore(
+                self.project_dir, self.setting.get("article_compression", "zstd"))
+        reporter = None
+        if self.keyword_workers > 1:
+            reporter = threading.Thread(target=self._report, daemon=True)
+            reporter.start()
+        executor = self.executor
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max(1, self.setting["concurrency"]))
+        try:
+            workers = [threading.Thread(target=self._worker, args=(executor,))
+                       for _ in range(max(1, self.keyword_workers))]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        finally:
+            if self.executor is None:
+                executor.shutdown(wait=True)
+        self.finished.set()
+        if reporter is not None:
+            reporter.join()
+        print(f"All keywords finished {self.format_progress()}")
+        if self.shared_store is not None:
+            print(f"Shared store: {shared_store.format_stats(self.shared_store.get_stats())}")
+            self.shared_store.close()
+            self.shared_store = None
+        return self.get_progress()
@@ -0,0 +1,94 @@
+import json
+import os
+import shutil
+from typing import List, Optional, Tuple
+
+from cnbc_crawler.checkpoint import CheckpointJournal
+from cnbc_crawler.page_log import count_page_log, get_page_log_path
+
+# 큰 키워드 하나의 페이지 구간을 여러 조각(shard)으로 나눠 동시에 받는다(keyword_shards).
+# 페이지는 최신순이라 페이지 구간이 곧 날짜 구간이다(get_closest_page 로 찾은 target_page 까지를 나눈다).
+#   <keyword>/shards/plan.json                 : [[첫 페이지, 마지막 페이지], ...] (이어받을 때 같은 구간을 다시 쓴다)
+#   <keyword>/shards/<first>_<last>/<keyword>.ndjson, checkpoint.journal : 조각마다 페이지 로그와 체크포인트
+# 모든 조각이 끝나면 페이지 순서대로 키워드 페이지 로그 뒤에 이어 붙이고, info_<keyword> 를 만들 때 id 중복을 없앤다.
+SHARDS_DIR_NAME = "shards"
+PLAN_FILE_NAME = "plan.json"
+MIN_SHARD_PAGES = 20  # 조각 하나의 최소 페이지 수
+
+PageRange = Tuple[int, int]
+
+
+def get_shards_dir(keyword_dir: str) -> str:
+    return os.path.join(keyword_dir, SHARDS_DIR_NAME)
+
+
+def get_shard_dir(keyword_dir: str, page_range: PageRange) -> str:
+    return os.path.join(get_shards_dir(keyword_dir), f"{page_range[0]}_{page_range[1]}")
+
+
+def split_pages(start_page: int, end_page: int, shards: int) -> List[PageRange]:
+    # start_page ~ end_page 를 거의 같은 크기의 연속 구간으로 나눈다. 조각이 MIN_SHARD_PAGES 보다 작아지지 않게 개수를 줄인다.
+    pages = end_page - start_page + 1
+    shards = max(1, min(shards, pages // MIN_SHARD_PAGES))
+    size, extra = divmod(pages, shards)
+    ranges = []
+    first = start_page
+    for index in range(shards):
+        last = first + size - 1 + (1 if index < extra else 0)
+        ranges.append((first, last))
+        first = last + 1
+    return ranges
+
+
+def load_plan(keyword_dir: str) -> Optional[List[PageRange]]:
+    path = os.path.join(get_shards_dir(keyword_dir), PLAN_FILE_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return [tuple(page_range) for page_range in json.load(f)]
+
+
+def save_plan(keyword_dir: str, ranges: List[PageRange]):
+    shards_dir = get_shards_dir(keyword_dir)
+    os.makedirs(shards_dir, exist_ok=True)
+    path = os.path.join(shards_dir, PLAN_FILE_NAME)
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump([list(page_range) for page_range in ranges], f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{path}.tmp", path)
+
+
+def get_shard_start_page(shard_dir: str, page_range: PageRange) -> int:
+    # 조각의 체크포인트 다음 페이지(처음이면 구간의 첫 페이지). 마지막 페이지보다 크면 끝난 조각이다.
+    journal = CheckpointJournal(shard_dir)
+    if journal.exists():
+        return max(page_range[0], journal.last_completed_page() + 1)
+    return page_range[0]
+
+
+def count_done(keyword_dir: str, keyword: str, ranges: List[PageRange]) -> Tuple[int, int]:
+    # 이어받을 때 진행 상황 표시용: 이미 끝난 (페이지 수, 기사 수)
+    pages = articles = 0
+    for page_range in ranges:
+        shard_dir = get_shard_dir(keyword_dir, page_range)
+        pages += get_shard_start_page(shard_dir, page_range) - page_range[0]
+        articles += count_page_log(get_page_log_path(shard_dir, keyword))
+    return pages, articles
+
+
+def append_shard_logs(keyword_dir: str, keyword: str, ranges: List[PageRange], page_log_path: str):
+    # 조각 페이지 로그를 페이지 순서대로 키워드 페이지 로그 뒤에 붙인다.
+    # 붙이다가 끊기면 다음 실행에서 키워드 로그가 keep_page 이후를 잘라내고 다시 붙인다.
+    with open(page_log_path, 'ab') as out:
+        for page_range in ranges:
+            shard_log_path = get_page_log_path(get_shard_dir(keyword_dir, page_range), keyword)
+            if os.path.exists(shard_log_path):
+                with open(shard_log_path, 'rb') as f:
+                    shutil.copyfileobj(f, out)
+        out.flush()
+        os.fsync(out.fileno())
+
+
+def remove_shards(keyword_dir: str):
+    shutil.rmtree(get_shards_dir(keyword_dir), ignore_errors=True)
@@ -0,0 +1,308 @@
+import bisect
+import contextlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 크롤링 전체에서 쓰는 카운터 / 히스토그램. 프로세스마다 레지스트리 하나를 쓰고,
+# 파싱 프로세스는 drain() 한 값을 결과와 함께 보내서 부모 프로세스가 merge() 한다.
+#   metrics.inc("cnbc_article_failures_total", reason="empty_text")
+#   with metrics.span("fetch"):  # cnbc_stage_seconds{stage="fetch"} 히스토그램 + span hook
+#       ...
+# 내보내기: MetricsExporter 가 Prometheus 텍스트(/metrics, /metrics.json)를 열거나 JSON 파일을 주기적으로 덮어쓴다.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+DEFAULT_JSON_INTERVAL = 60  # 초
+STAGE_SECONDS = "cnbc_stage_seconds"
+
+Labels = Tuple[Tuple[str, str], ...]
+SpanHook = Callable[[str, Dict[str, str], float, float, bool], None]
+
+
+def _labels(labels: Dict[str, any]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    labels = labels + extra
+    if not labels:
+        return ""
+    values = ",".join('{}="{}"'.format(name, value.replace("\\", "\\\\").replace('"', '\\"'))
+                      for name, value in labels)
+    return "{" + values + "}"
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def add(self, counts: List[int], sum: float, count: int):
+        for index, value in enumerate(counts):
+            self.counts[index] += value
+        self.sum += sum
+        self.count += count
+
+    def quantile(self, ratio: float) -> float:
+        # 버킷 경계로 어림한 값(해당 순위가 들어간 버킷의 상한)
+        if self.count == 0:
+            return 0.0
+        rank = ratio * self.count
+        seen = 0
+        for index, value in enumerate(self.counts):
+            seen += value
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self.span_hooks: List[SpanHook] = []
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, _labels(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, _labels(labels))
+        with self.lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(value)
+
+    @contextlib.contextmanager
+    def span(self, stage: str, **labels):
+        # 구간 시간을 cnbc_stage_seconds{stage=...} 에 기록하고 span hook 에 (stage, labels, 시작 시각, 걸린 시간, 실패 여부)를 알린다.
+        started_at = time.time()
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.observe(STAGE_SECONDS, elapsed, stage=stage, **labels)
+            for hook in self.span_hooks:
+                try:
+                    hook(stage, labels, started_at, elapsed, failed)
+                except Exception as e:
+                    print(f"Span hook error: {e}")
+
+    def add_span_hook(self, hook: SpanHook):
+        with self.lock:
+            self.span_hooks = self.span_hooks + [hook]
+
+    def remove_span_hook(self, hook: SpanHook):
+        with self.lock:
+            self.span_hooks = [h for h in self.span_hooks if h is not hook]
+
+    def drain(self) -> Dict[str, list]:
+        # 지금까지 모은 값을 돌려주고 비운다(파싱 프로세스 -> 부모 프로세스 전달용).
+        with self.lock:
+            counters, self.counters = self.counters, {}
+            histograms, self.histograms = self.histograms, {}
+        return {"counters": [(name, labels, value) for (name, labels), value in counters.items()],
+                "histograms": [(name, labels, h.counts, h.sum, h.count) for (name, labels), h in histograms.items()]}
+
+    def merge(self, drained: Dict[str, list]):
+        with self.lock:
+            for name, labels, value in drained["counters"]:
+                key = (name, tuple(map(tuple, labels)))
+                self.counters[key] = self.counters.get(key, 0) + value
+            for name, labels, counts, sum, count in drained["histograms"]:
+                key = (name, tuple(map(tuple, labels)))
+                if key not in self.histograms:
+                    self.histograms[key] = Histogram()
+                self.histograms[key].add(counts, sum, count)
+
+    def reset(self):
+        with self.lock:
+            self.counters = {}
+            self.histograms = {}
+
+    def get_snapshot(self) -> Dict[str, any]:
+        # JSON 으로 저장할 수 있는 형태. 히스토그램은 count / sum / 평균 / 버킷으로 어림한 p50, p99
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, (list(h.counts), h.sum, h.count, h.quantile(0.5), h.quantile(0.99)))
+                                for key, h in self.histograms.items())
+        snapshot = {"time": datetime.now(timezone.utc).isoformat(), "counters": {}, "histograms": {}}
+        for (name, labels), value in counters:
+            snapshot["counters"].setdefault(name, {})[_format_labels(labels)] = value
+        for (name, labels), (counts, sum, count, p50, p99) in histograms:
+            snapshot["histograms"].setdefault(name, {})[_format_labels(labels)] = {
+                "count": count, "sum": sum, "avg": sum / count if count else 0.0,
+                "p50": p50, "p99": p99, "buckets": counts}
+        return snapshot
+
+    def format_prometheus(self) -> str:
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, (h.buckets, list(h.counts), h.sum, h.count))
+                                for key, h in self.histograms.items())
+        lines = []
+        last_name = None
+        for (name, labels), value in counters:
+            if name != last_name:
+                lines.append(f"# TYPE {name} counter")
+                last_name = name
+            lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        for (name, labels), (buckets, counts, sum, count) in histograms:
+            if name != last_name:
+                lines.append(f"# TYPE {name} histogram")
+                last_name = name
+            cumulative = 0
+            for bound, value in zip(list(buckets) + ["+Inf"], counts):
+                cumulative += value
+                lines.append(f"{name}_bucket{_format_labels(labels, (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {sum:g}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    return _registry
+
+
+def inc(name: str, value: float = 1, **labels):
+    _registry.inc(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    _registry.observe(name, value, **labels)
+
+
+def span(stage: str, **labels):
+    return _registry.span(stage, **labels)
+
+
+def add_span_hook(hook: SpanHook):
+    _registry.add_span_hook(hook)
+
+
+def remove_span_hook(hook: SpanHook):
+    _registry.remove_span_hook(hook)
+
+
+def get_snapshot() -> Dict[str, any]:
+    return _registry.get_snapshot()
+
+
+def format_prometheus() -> str:
+    return _registry.format_prometheus()
+
+
+def write_json(path: str, snapshot: Optional[Dict[str, any]] = None):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(snapshot or get_snapshot(), f, indent=4)
+    os.replace(temp_path, path)
+
+
+class MetricsExporter:
+    # port 가 있으면 http://host:port/metrics (Prometheus 텍스트) 와 /metrics.json 을 연다.
+    # json_path 가 있으면 json_interval 초마다 스냅숏을 덮어쓰고, close() 때 마지막으로 한 번 더 쓴다.
+    def __init__(self, port: Optional[int] = None, json_path: Optional[str] = None,
+                 json_interval: float = DEFAULT_JSON_INTERVAL, host: str = "127.0.0.1",
+                 registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or _registry
+        self.json_path = json_path
+        self.json_interval = json_interval
+        self.server = None
+        self.threads = []
+        self.stopped = threading.Event()
+        if port is not None:
+            self.server = ThreadingHTTPServer((host, port), self._handler_class())
+            self.server.daemon_threads = True
+            self.threads.append(threading.Thread(target=self.server.serve_forever, daemon=True))
+            print(f"Metrics: http://{host}:{self.server.server_port}/metrics")
+        if json_path is not None:
+            self.threads.append(threading.Thread(target=self._dump, daemon=True))
+        for thread in self.threads:
+            thread.start()
+
+    def _handler_class(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body = registry.format_prometheus().encode()
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                elif self.path == "/metrics.json":
+                    body = json.dumps(registry.get_snapshot()).encode()
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def _dump(self):
+        while not self.stopped.wait(self.json_interval):
+            try:
+                write_json(self.json_path, self.registry.get_snapshot())
+            except Exception as e:
+                print(f"Metrics dump error: {e}")
+
+    def close(self):
+        self.stopped.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        if self.json_path is not None:
+            write_json(self.json_path, self.registry.get_snapshot())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def start_exporter(setting: Dict[str, any]) -> Optional[MetricsExporter]:
+    # setting 의 metrics_port / metrics_json_path / metrics_json_interval. 둘 다 없으면 None
+    if setting.get("metrics_port") is None and not setting.get("metrics_json_path"):
+        return None
+    return MetricsExporter(setting.get("metrics_port"), setting.get("metrics_json_path") or None,
+                           setting.get("metrics_json_interval", DEFAULT_JSON_INTERVAL))
+
+
+def format_stats(snapshot: Dict[str, any]) -> str:
+    # 실행 끝에 출력하는 요약: 단계별 총 시간 / 평균, 실패 이유별 개수
+    stages = []
+    for labels, h in snapshot["histograms"].get(STAGE_SECONDS, {}).items():
+        stages.append(f"{labels.strip('{}')} n={h['count']} total={h['sum']:.1f}s avg={h['avg'] * 1000:.1f}ms")
+    failures = [f"{labels.strip('{}')}: {value:g}"
+                for labels, value in snapshot["counters"].get("cnbc_article_failures_total", {}).items()]
+    skipped = [f"{labels.strip('{}')}: {value:g}"
+               for labels, value in snapshot["counters"].get("cnbc_articles_skipped_total", {}).items()]
+    return f"stages: [{'; '.join(stages)}], failures: [{', '.join(failures)}], skipped: [{', '.join(skipped)}]"
@@ -0,0 +1,176 @@
+import json
+import os
+import textwrap
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from cnbc_crawler.parquet_store import DEFAULT_DICTIONARY_COLUMNS, save_pages_parquet
+
+DEFAULT_FLUSH_PAGES = 10
+DEFAULT_FLUSH_INTERVAL = 30  # seconds
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+
+def get_page_log_path(info_logs_dir: str, keyword: str) -> str:
+    return os.path.join(info_logs_dir, f"{keyword}.ndjson")
+
+
+def _scan_valid_end(path: str, keep_page: Optional[int] = None) -> int:
+    # 처음부터 한 줄씩 읽어 유효한 마지막 줄의 끝 위치를 찾는다.
+    # 줄바꿈이 없는 조각, 읽을 수 없는 줄, keep_page 보다 뒤 페이지의 줄에서 멈춘다.
+    valid_end = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                page = json.loads(line)["page"]
+            except Exception:
+                break
+            if keep_page is not None and page > keep_page:
+                break
+            valid_end += len(line)
+    return valid_end
+
+
+def iter_page_log(path: str) -> Iterator[Tuple[int, Dict[str, any]]]:
+    # (page, info) 를 한 줄씩 읽는다. 파일 전체를 메모리에 올리지 않는다.
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                return
+            try:
+                record = json.loads(line)
+            except Exception:
+                return
+            yield record["page"], record["info"]
+
+
+def iter_page_log_pages(path: str) -> Iterator[Tuple[int, List[Dict[str, any]]]]:
+    # 연속된 같은 page 의 줄을 묶어 (page, info 목록) 으로 돌려준다. 메모리에는 한 페이지만 있다.
+    current_page = None
+    current = []
+    for page, info in iter_page_log(path):
+        if page != current_page and current:
+            yield current_page, current
+            current = []
+        current_page = page
+        current.append(info)
+    if current:
+        yield current_page, current
+
+
+def iter_unique_info(path: str, id_set: Optional[Set[str]] = None) -> Iterator[Dict[str, any]]:
+    # id 가 처음 나온 info 만 순서대로 돌려준다. 메모리에는 id 집합만 남는다.
+    id_set = set() if id_set is None else id_set
+    for page, info in iter_page_log(path):
+        if str(info['id']) not in id_set:
+            id_set.add(str(info['id']))
+            yield info
+
+
+def read_page_log(file_path: str) -> pd.DataFrame:
+    # 페이지 로그 / info 파일(json/xlsx/parquet)을 읽는다. id 는 파일 이름과 비교할 수 있도록 문자열로 읽는다.
+    if file_path.endswith('.json'):
+        log_df = pd.read_json(file_path, dtype={'id': str})
+    elif file_path.endswith('.parquet'):
+        log_df = pd.read_parquet(file_path)
+        if 'datePublished' in log_df.columns:  # json/excel 과 같은 문자열 형식으로 되돌린다.
+            log_df['datePublished'] = log_df['datePublished'].dt.strftime('%Y-%m-%dT%H:%M:%S+0000')
+    else:
+        log_df = pd.read_excel(file_path, dtype={'id': str})
+    if 'id' in log_df.columns:
+        log_df['id'] = log_df['id'].astype(str)
+    return log_df
+
+
+def count_page_log(path: str) -> int:
+    return sum(1 for _ in iter_page_log(path))
+
+
+class PageLogWriter:
+    # 키워드별 NDJSON 페이지 로그. 한 줄 = {"page": page, "info": {...}}.
+    # 페이지는 버퍼에 쌓았다가 flush_pages 페이지마다 또는 flush_interval 초마다 fsync 하고,
+    # 디스크에 남은 페이지만 on_flush(page, info 목록) 로 알려준다(체크포인트 저널 기록용).
+    # 다시 열 때는 keep_page 이후 페이지와 쓰다가 끊긴 마지막 줄을 잘라낸다.
+    def __init__(self, path: str, keep_page: Optional[int] = None,
+                 flush_pages: int = DEFAULT_FLUSH_PAGES, flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 on_flush: Optional[Callable[[int, List[Dict[str, any]]], None]] = None,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.path = path
+        self.flush_pages = max(1, flush_pages)
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        if os.path.exists(path):
+            valid_end = _scan_valid_end(path, keep_page)
+            if valid_end != os.path.getsize(path):
+                with open(path, 'r+b') as f:
+                    f.truncate(valid_end)
+        self.file = open(path, 'ab', buffering=buffer_size)
+        self.pending = []
+        self.last_flush = time.monotonic()
+
+    def append_page(self, page: int, array: List[Dict[str, any]]):
+        for info in array:
+            self.file.write(json.dumps({"page": page, "info": info}).encode() + b"\n")
+        self.pending.append((page, array))
+        if len(self.pending) >= self.flush_pages or \
+                time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.last_flush = time.monotonic()
+        pending, self.pending = self.pending, []
+        if self.on_flush:
+            for page, array in pending:
+                self.on_flush(page, array)
+
+    def close(self):
+        if self.file is None:
+            return
+        self.flush()
+        self.file.close()
+        self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _write_json_array(infos: Iterator[Dict[str, any]], path: str) -> int:
+    # json.dumps(array, indent=4) 와 같은 모양으로 한 항목씩 써 내려간다.
+    count = 0
+    with open(path, 'w') as f:
+        for info in infos:
+            f.write("[\n" if count == 0 else ",\n")
+            f.write(textwrap.indent(json.dumps(info, indent=4), "    "))
+            count += 1
+        f.write("\n]" if count else "[]")
+    return count
+
+
+def save_page_log(path: str, file_name: str, save_format: str,
+                  dictionary_columns: Iterable[str] = DEFAULT_DICTIONARY_COLUMNS) -> Set[str]:
+    # 페이지 로그를 스트리밍으로 읽어 info_<keyword>.<ext> 를 만들고 남은 id 집합을 돌려준다.
+    # dictionary_columns: parquet 에서 dictionary 인코딩할 열
+    id_set = set()
+    if save_format == "parquet":
+        save_pages_parquet((array for page, array in iter_page_log_pages(path)),
+                           f'{file_name}.parquet', dictionary_columns, id_set=id_set)
+        print(f"Save page info as parquet: {file_name}.parquet\n")
+    elif save_format == "json":
+        _write_json_array(iter_unique_info(path, id_set), f'{file_name}.json')
+        print(f"Save page info as json: {file_name}.json\n")
+    else:  # 엑셀은 한 번에 써야 하므로 이 경우만 목록을 메모리에 만든다.
+        pd.DataFrame(list(iter_unique_info(path, id_set))).to_excel(
+            f'{file_name}.xlsx', index=False)
+        print(f"Save page info as excel: {file_name}.xlsx\n")
+    return id_set
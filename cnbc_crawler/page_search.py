@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from cnbc_crawler import http_cache, http_client, metrics
+from cnbc_crawler import queryly
+from cnbc_crawler.queryly import get_api_url
+
+DEFAULT_PROBE_CACHE_TTL = 60 * 60 * 24  # 새 기사가 올라오면 페이지가 밀리므로 하루 지난 기록은 버린다(초)
+
+
+def get_source_id(setting: Dict[str, any]) -> str:
+    # 같은 키워드라도 API 주소(CNBC_QUERYLY_API_URL) / 키 / 인덱스가 다르면 결과가 다르다.
+    source = "\n".join([queryly.QUERYLY_API_URL, setting['queryly_key'], setting['additionalindexes']])
+    return hashlib.sha1(source.encode()).hexdigest()[:12]
+
+
+class PageProbeCache:
+    # 키워드별 page -> 날짜 기록과 totalpage 를 디스크에 저장한다.
+    # 파일 이름에 batch_size 와 source(get_source_id)를 넣어서 배치 크기나 API 가 다른 기록과 섞이지 않게 한다.
+    def __init__(self, cache_dir: Optional[str], keyword: str, batch_size: int,
+                 ttl: float = DEFAULT_PROBE_CACHE_TTL, source: str = ""):
+        self.lock = threading.Lock()
+        self.ttl = ttl
+        self.path = None
+        self.data = {"totalpage": None, "pages": {}}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            file_name = keyword.replace(os.sep, '_').replace(' ', '_')
+            suffix = f"_{source}" if source else ""
+            self.path = os.path.join(cache_dir, f"{file_name}_{batch_size}{suffix}.json")
+            self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Ignore broken probe cache: {self.path}")
+            return
+        now = time.time()
+        if data.get("totalpage") and now - data["totalpage"]["time"] < self.ttl:
+            self.data["totalpage"] = data["totalpage"]
+        self.data["pages"] = {page: entry for page, entry in data.get("pages", {}).items()
+                              if now - entry["time"] < self.ttl}
+
+    def _save(self):
+        if self.path is None:
+            return
+        # 같은 키워드를 여러 스레드 / 프로세스가 같이 저장할 수 있으므로 임시 파일 이름을 따로 만든다.
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(self.path), suffix=".tmp",
+                                        dir=os.path.dirname(self.path))
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.data, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def get_total_page(self) -> Optional[int]:
+        with self.lock:
+            entry = self.data["totalpage"]
+            return entry["value"] if entry else None
+
+    def get_page_date(self, page: int) -> Optional[str]:
+        with self.lock:
+            entry = self.data["pages"].get(str(page))
+            return entry["date"] if entry else None
+
+    def get_pages(self) -> Dict[int, str]:
+        with self.lock:
+            return {int(page): entry["date"] for page, entry in self.data["pages"].items()}
+
+    def put(self, page: int, date: Optional[str], total_page: Optional[int]):
+        with self.lock:
+            now = time.time()
+            if date is not None:
+                self.data["pages"][str(page)] = {"date": date, "time": now}
+            if total_page is not None:
+                self.data["totalpage"] = {"value": total_page, "time": now}
+            self._save()
+
+
+def probe_page(search_term: str, page: int, setting: Dict[str, any]) -> Tuple[Optional[str], Optional[int]]:
+    # Queryly 요청 한 번으로 페이지 가운데 기사의 날짜와 totalpage 를 같이 얻는다.
+    try:
+        batch_size = setting['batch_size']
+        response = http_client.get(get_api_url(
+            search_term, (page - 1) * batch_size, batch_size,
+            setting['queryly_key'], setting['additionalindexes']), cache=http_cache.RECORD)
+        if response.status_code != 200:
+            raise Exception(
+                f"Response Error with status code {response.status_code}")
+
+        data = response.json()
+        meta = data.get("metadata")
+        total_page = int(meta['totalpage']) if meta else None
+        article_info_list = data["results"]
+        if not article_info_list:
+            return None, total_page
+        return article_info_list[len(article_info_list) // 2]['datePublished'].split('T')[0], total_page
+    except Exception as e:
+        # print(f"Error: {e}")
+        metrics.inc("cnbc_api_failures_total", stage="probe")
+        return None, None
+
+
+def _to_ordinal(date: str) -> int:
+    return datetime.strptime(date, '%Y-%m-%d').toordinal()
+
+
+def get_closest_page(keyword: str, target_date: datetime, setting: Dict[str, any],
+                     cache: Optional[PageProbeCache] = None) -> int:
+    # target_date 이하의 날짜가 처음 나오는 페이지를 찾는다(없으면 마지막 페이지).
+    # 페이지는 최신순이므로 날짜가 페이지 번호에 따라 줄어든다. 이진 탐색 대신 날짜로 보간해서
+    # 다음 페이지를 고르고, 보간이 구간을 절반 이상 줄이지 못하면 한 번은 이분법을 쓴다.
+    # 캐시에 남아 있는 페이지 날짜는 요청 없이 탐색 구간을 줄이는 데 사용한다.
+    if cache is None:
+        cache = PageProbeCache(setting.get('probe_cache_dir'), keyword, setting['batch_size'],
+                               setting.get('probe_cache_ttl', DEFAULT_PROBE_CACHE_TTL), get_source_id(setting))
+    target = target_date.toordinal()
+
+    def get_date(page: int) -> Optional[str]:
+        date = cache.get_page_date(page)
+        if date is None:
+            with metrics.span("probe"):
+                date, total_page = probe_page(keyword, page, setting)
+            cache.put(page, date, total_page)
+            print(f"Searching[ page: {page}, date: {date} ]")
+        return date
+
+    # 첫 페이지 응답으로 totalpage 까지 얻는다(get_total_page 요청 불필요).
+    first_date = get_date(1)
+    total_page = cache.get_total_page()
+    if first_date is None or total_page is None:
+        print("Error: page_date is None")
+        return 1
+    if total_page <= 1 or _to_ordinal(first_date) <= target:
+        return 1
+
+    # lo: 날짜 > target 인 페이지, hi: 날짜 <= target 이거나 마지막 페이지
+    lo, lo_date = 1, _to_ordinal(first_date)
+    hi, hi_date = total_page, None
+    for page, date in cache.get_pages().items():
+        if page > total_page:
+            continue
+        date = _to_ordinal(date)
+        if date > target and page > lo:
+            lo, lo_date = page, date
+        elif date <= target and page <= hi:
+            hi, hi_date = page, date
+    if hi <= lo:  # 오래된 캐시끼리 순서가 맞지 않으면 캐시 구간은 쓰지 않는다.
+        lo, lo_date = 1, _to_ordinal(first_date)
+        hi, hi_date = total_page, None
+
+    if hi == total_page and hi_date is None and hi - lo > 1:
+        last_date = get_date(total_page)
+        if last_date is None:
+            return lo + 1
+        hi_date = _to_ordinal(last_date)
+        if hi_date > target:
+            return total_page
+
+    bisect_next = False
+    while hi - lo > 1:
+        if bisect_next or hi_date is None or lo_date <= hi_date:
+            mid = (lo + hi) // 2
+        else:
+            ratio = (lo_date - target) / (lo_date - hi_date)
+            mid = min(hi - 1, max(lo + 1, lo + round(ratio * (hi - lo))))
+
+        page_date = get_date(mid)
+        if page_date is None:
+            print("Error: page_date is None")
+            return lo + 1
+        try:
+            date = _to_ordinal(page_date)
+        except ValueError:
+            print(
+                f"Error: page_date is not valid datetime format: {page_date}")
+            return lo + 1
+
+        width = hi - lo
+        if date > target:
+            lo, lo_date = mid, date
+        else:
+            hi, hi_date = mid, date
+        bisect_next = (hi - lo) * 2 > width
+    return hi
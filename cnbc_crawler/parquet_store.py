@@ -0,0 +1,169 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+# info 목록을 타입이 있는 Parquet(Arrow)로 저장한다. pyarrow 는 parquet 저장을 쓸 때만 필요하다.
+#   datePublished -> timestamp(ms, UTC), id/_id -> int64, 나머지 -> string
+#   author 는 값 종류가 적어서 dictionary 인코딩을 쓴다(CrawlConfig.parquet_dictionary_columns 로 바꿀 수 있다).
+#   id / datePublished 로 바꿀 수 없는 값은 비워 두고 close() 때 개수와 예시를 출력한다.
+INFO_COLUMNS = ["title", "keyword", "description", "url", "_id", "id",
+                "datePublished", "author", "summary"]
+DEFAULT_DICTIONARY_COLUMNS = ("author",)
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise Exception("pyarrow is required for parquet output: pip install pyarrow")
+    return pyarrow, pyarrow.parquet
+
+
+def get_schema(columns: Iterable[str], dictionary_columns: Iterable[str] = DEFAULT_DICTIONARY_COLUMNS):
+    pa, _ = _import_pyarrow()
+    dictionary_columns = set(dictionary_columns)
+    fields = []
+    for column in columns:
+        if column in ("id", "_id"):
+            fields.append(pa.field(column, pa.int64()))
+        elif column == "datePublished":
+            fields.append(pa.field(column, pa.timestamp("ms", tz="UTC")))
+        elif column in dictionary_columns:
+            fields.append(pa.field(column, pa.dictionary(pa.int32(), pa.string())))
+        else:
+            fields.append(pa.field(column, pa.string()))
+    return pa.schema(fields)
+
+
+def _is_missing(value) -> bool:
+    return value is None or value == "" or (isinstance(value, float) and value != value)  # None, "", NaN
+
+
+def _to_int(value) -> Optional[int]:
+    if _is_missing(value):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_datetime(value) -> Optional[datetime]:
+    if _is_missing(value):
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.strptime(str(value), '%Y-%m-%dT%H:%M:%S%z')
+    except ValueError:
+        return None
+
+
+def _to_string(value) -> Optional[str]:
+    if value is None or (isinstance(value, float) and value != value):  # None, NaN
+        return None
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(v) for v in value)
+    return str(value)
+
+
+def get_columns(array: List[Dict[str, any]]) -> List[str]:
+    present = set()
+    for info in array:
+        present.update(info.keys())
+    return [column for column in INFO_COLUMNS if column in present] + \
+        sorted(present - set(INFO_COLUMNS))
+
+
+def _convert(array: List[Dict[str, any]], name: str, convert, invalid: Optional[Dict[str, List[any]]]) -> List[any]:
+    values = []
+    for info in array:
+        value = info.get(name)
+        converted = convert(value)
+        if converted is None and not _is_missing(value) and invalid is not None:
+            invalid.setdefault(name, []).append(value)
+        values.append(converted)
+    return values
+
+
+def to_table(array: List[Dict[str, any]], schema, invalid: Optional[Dict[str, List[any]]] = None):
+    # invalid 를 넘기면 타입을 바꾸지 못해 비운 값이 열 이름별로 쌓인다.
+    pa, _ = _import_pyarrow()
+    columns = {}
+    for field in schema:
+        name = field.name
+        if name in ("id", "_id"):
+            values = _convert(array, name, _to_int, invalid)
+        elif name == "datePublished":
+            values = _convert(array, name, _to_datetime, invalid)
+        else:
+            values = [_to_string(info.get(name)) for info in array]
+        columns[name] = pa.array(values, type=field.type) if not pa.types.is_dictionary(field.type) \
+            else pa.array(values, type=pa.string()).dictionary_encode()
+    return pa.Table.from_pydict(columns, schema=schema)
+
+
+class ParquetPageWriter:
+    # 페이지마다 row group 하나씩 이어 붙이는 writer. close() 해야 파일이 완성된다.
+    def __init__(self, path: str, columns: Optional[List[str]] = None,
+                 dictionary_columns: Iterable[str] = DEFAULT_DICTIONARY_COLUMNS):
+        self.path = path
+        self.columns = columns
+        self.dictionary_columns = tuple(dictionary_columns)
+        self.schema = None
+        self.writer = None
+        self.row_count = 0
+        self.invalid: Dict[str, List[any]] = {}
+
+    def write_page(self, array: List[Dict[str, any]]):
+        if not array:
+            return
+        _, pq = _import_pyarrow()
+        if self.writer is None:
+            self.schema = get_schema(self.columns or get_columns(array), self.dictionary_columns)
+            self.writer = pq.ParquetWriter(self.path, self.schema, compression="zstd")
+        self.writer.write_table(to_table(array, self.schema, self.invalid))
+        self.row_count += len(array)
+
+    def close(self):
+        for name, values in self.invalid.items():
+            print(f"Warning: {len(values)} {name} values are not valid and saved as null in {self.path} "
+                  f"(e.g. {values[0]!r})")
+        self.invalid = {}
+        if self.writer is None:
+            # 빈 결과도 스키마만 있는 파일로 남긴다.
+            _, pq = _import_pyarrow()
+            schema = get_schema(self.columns or INFO_COLUMNS, self.dictionary_columns)
+            pq.write_table(schema.empty_table(), self.path, compression="zstd")
+            return
+        self.writer.close()
+        self.writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def save_parquet(array: List[Dict[str, any]], path: str,
+                 dictionary_columns: Iterable[str] = DEFAULT_DICTIONARY_COLUMNS):
+    with ParquetPageWriter(path, dictionary_columns=dictionary_columns) as writer:
+        writer.write_page(array)
+
+
+def save_pages_parquet(pages: Iterable[List[Dict[str, any]]], path: str,
+                       dictionary_columns: Iterable[str] = DEFAULT_DICTIONARY_COLUMNS,
+                       id_set: Optional[Set[str]] = None) -> int:
+    # 페이지별 info 목록을 row group 으로 저장한다. 앞 페이지에서 나온 id 는 건너뛴다(중복 제거).
+    # id_set 을 넘기면 저장된 id 가 거기에 채워진다.
+    id_set = set() if id_set is None else id_set
+    with ParquetPageWriter(path, dictionary_columns=dictionary_columns) as writer:
+        for array in pages:
+            page_array = []
+            for info in array:
+                if str(info['id']) not in id_set:
+                    id_set.add(str(info['id']))
+                    page_array.append(info)
+            writer.write_page(page_array)
+    return len(id_set)
@@ -0,0 +1,184 @@
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from cnbc_crawler import http_client, metrics, rate_limiter
+from cnbc_crawler.extractors import DEFAULT_BACKEND
+from cnbc_crawler.fetch_engine import (ARTICLE_FAILURES, DEFAULT_CONCURRENCY, extract_article_html,
+                                       fetch_article_html, link_article, save_article_html, write_article_text)
+
+DEFAULT_QUEUE_SIZE = 64
+PARSE_TIMEOUT = 60 * 2  # 받은 HTML 의 파싱 결과를 기다리는 여유 시간(초)
+
+
+def get_result_timeout() -> float:
+    # 이 시간 동안 다운로드도 파싱 결과도 하나도 없으면 남은 기사는 실패로 처리한다(초).
+    # 기사 요청 하나는 차단 응답(429/503)마다 최대 MAX_BACKOFF 를 쉬고 max_retries 번까지 다시 요청하므로
+    # 정상적인 백오프 중에 실패로 처리하지 않도록 그 최악의 경우보다 길게 기다린다.
+    client = http_client.get_client()
+    attempts = client.max_retries + 1
+    return (rate_limiter.MAX_BACKOFF + sum(client.timeout)) * attempts + PARSE_TIMEOUT
+
+
+def _parse_worker(html_queue, result_queue, backend: str):
+    # 파싱 프로세스: 원본 HTML 을 받아 본문 추출, 빈 텍스트 확인 후 articles/<id>.txt 로 저장한다.
+    # articles_dir 이 None 이면(packed store) 저장하지 않고 본문을 돌려보내 부모 프로세스가 저장한다.
+    # fork 로 복사된 부모의 metrics 값과 span hook 은 버리고, 이 프로세스에서 모은 값은 결과와 함께 보낸다.
+    registry = metrics.get_registry()
+    registry.reset()
+    registry.span_hooks = []
+    while True:
+        item = html_queue.get()
+        if item is None:
+            break
+        batch_id, index, id, html, articles_dir = item
+        if articles_dir is None:
+            text = extract_article_html(html, backend)
+            result_queue.put((batch_id, index, False if text is None else text, registry.drain()))
+            continue
+        sucess = save_article_html(html, id, articles_dir, backend)
+        result_queue.put((batch_id, index, sucess, registry.drain()))
+
+
+def _get_context():
+    # main.py 는 __main__ 가드 없이 실행되는 스크립트라 spawn 방식이면 자식 프로세스가 크롤링을 다시 시작한다.
+    # fork 가 가능한 OS(Linux, macOS)에서는 fork 를 사용한다.
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+class ParsePipeline:
+    # 네트워크(스레드)와 파싱(프로세스)을 분리한 파이프라인.
+    # fetcher 스레드가 원본 HTML 을 크기가 제한된 큐에 넣고, 파싱 프로세스들이 큐를 비운다.
+    # 큐가 가득 차면 fetcher 가 put 에서 멈추므로 파싱이 밀릴 때 다운로드도 자연스럽게 느려진다.
+    def __init__(self, workers: Optional[int] = None, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 concurrency: int = DEFAULT_CONCURRENCY, backend: str = DEFAULT_BACKEND):
+        self.workers = workers or os.cpu_count() or 1
+        self.concurrency = concurrency
+        self.backend = backend
+        self.context = _get_context()
+        self.html_queue = self.context.Queue(maxsize=queue_size)
+        self.result_queue = self.context.Queue()
+        self.processes = []
+        self.batches: Dict[int, queue.Queue] = {}
+        self.batch_ids = itertools.count()
+        self.lock = threading.Lock()
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.dispatcher: Optional[threading.Thread] = None
+
+    def start(self):
+        for _ in range(self.workers):
+            process = self.context.Process(
+                target=_parse_worker, args=(self.html_queue, self.result_queue, self.backend), daemon=True)
+            process.start()
+            self.processes.append(process)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, self.concurrency))
+        self.dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self.dispatcher.start()
+        return self
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+        for _ in self.processes:
+            self.html_queue.put(None)
+        for process in self.processes:
+            process.join()
+        self.result_queue.put(None)
+        if self.dispatcher is not None:
+            self.dispatcher.join()
+        self.processes = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _dispatch(self):
+        # 파싱 결과를 요청한 호출(batch)별 큐로 나눠 주고, 파싱 프로세스의 metrics 를 합친다.
+        while True:
+            item = self.result_queue.get()
+            if item is None:
+                break
+            batch_id, index, sucess, drained = item
+            if drained is not None:
+                metrics.get_registry().merge(drained)
+            with self.lock:
+                batch = self.batches.get(batch_id)
+            if batch is not None:  # 없으면 시간 제한으로 이미 실패 처리한 기사라 늦게 온 결과는 버린다.
+                batch.put((index, sucess))
+
+    def _notify(self, batch_id: int, index: int):
+        # 다운로드가 끝났다고 알려서 기다리는 쪽의 시간 제한을 다시 시작하게 한다(결과는 파싱 뒤에 따로 온다).
+        with self.lock:
+            batch = self.batches.get(batch_id)
+        if batch is not None:
+            batch.put((index, None))
+        return batch is not None
+
+    def _fetch(self, batch_id: int, index: int, info: Dict[str, any], articles_dir: Optional[str], store=None):
+        if link_article(info["id"], store):
+            self.result_queue.put((batch_id, index, True, None))
+            return
+        try:
+            html = fetch_article_html(info["url"])
+        except Exception as e:
+            # print(f"Error: {e}")
+            self.result_queue.put((batch_id, index, False, None))
+            return
+        if not self._notify(batch_id, index):  # 이미 시간 제한으로 실패 처리한 페이지: 파싱하지 않고 버린다.
+            return
+        # 큐가 가득 차 있으면 여기서 기다린다(backpressure).
+        self.html_queue.put((batch_id, index, info["id"], html, articles_dir))
+
+    def fetch_article_list(self, info_list: List[Dict[str, any]], articles_dir='articles',
+                           on_done: Optional[Callable[[int, int], None]] = None) -> List[Dict[str, any]]:
+        # fetch_engine.fetch_article_list 와 같은 결과: 실패한 항목을 제외한 info 목록
+        # 파싱 프로세스는 작업 폴더가 다를 수 있으므로 절대 경로로 넘긴다.
+        # PackedArticleStore 는 프로세스 사이에 공유할 수 없으므로 이 스레드에서 저장한다.
+        store = None if isinstance(articles_dir, str) else articles_dir
+        worker_dir = os.path.abspath(articles_dir) if store is None else None
+        batch = queue.Queue()
+        with self.lock:
+            batch_id = next(self.batch_ids)
+            self.batches[batch_id] = batch
+
+        for index, info in enumerate(info_list):
+            self.executor.submit(self._fetch, batch_id, index, info, worker_dir, store)
+
+        results = [False] * len(info_list)
+        result_timeout = get_result_timeout()
+        done = 0
+        try:
+            while done < len(info_list):
+                try:
+                    index, sucess = batch.get(timeout=result_timeout)
+                except queue.Empty:
+                    print(f"Parse result timeout. {len(info_list) - done} articles are marked as failed")
+                    metrics.inc(ARTICLE_FAILURES, len(info_list) - done, reason="timeout")
+                    break
+                if sucess is None:  # 다운로드 진행 알림
+                    continue
+                done += 1
+                if isinstance(sucess, str):
+                    try:
+                        write_article_text(sucess, info_list[index]["id"], store)
+                        sucess = True
+                    except Exception as e:
+                        # print(f"Error: {e}")
+                        metrics.inc(ARTICLE_FAILURES, reason="write_error")
+                        sucess = False
+                results[index] = sucess
+                if on_done:
+                    on_done(done, len(info_list))
+        finally:
+            with self.lock:
+                del self.batches[batch_id]
+
+        return [info for info, sucess in zip(info_list, results) if sucess]
@@ -0,0 +1,18 @@
+import os
+
+# CNBC_QUERYLY_API_URL 환경 변수로 바꿀 수 있다(benchmarks/mock_server.py 같은 로컬 서버로 돌릴 때).
+QUERYLY_API_URL = os.environ.get(
+    "CNBC_QUERYLY_API_URL", "https://api.queryly.com/cnbc/json.aspx")
+# cnbc.com 검색 페이지가 쓰는 공개 키
+DEFAULT_QUERYLY_KEY = "31a35d40a9a64ab3"
+DEFAULT_ADDITIONALINDEXES = "4cd6f71fbf22424d, 937d600b0d0d4e23, 3bfbe40caee7443e, 626fdfcd96444f28"
+
+
+def get_api_url(search_term: str, endindex: int, batch_size: int,
+                queryly_key: str, additionalindexes: str) -> str:
+    return f"{QUERYLY_API_URL}?"\
+        f"queryly_key={queryly_key}&"\
+        f"query={search_term}&"\
+        f"endindex={endindex}&"\
+        f"batchsize={batch_size}&callback=&showfaceted=false&timezoneoffset=-540&facetedfields=formats&facetedkey=formats%7C&facetedvalue=!Press%20Release%7C&"\
+        f"additionalindexes={additionalindexes}"
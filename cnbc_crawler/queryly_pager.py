@@ -0,0 +1,172 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+from cnbc_crawler import http_cache, http_client, metrics, queryly
+
+# Queryly 결과를 사용자 페이지(batch_size 개, 보통 10) 단위로 돌려주면서 실제 요청은 batch_size * factor 개씩 한 번에 받는다.
+# 페이지 번호는 계속 batch_size 기준이므로 페이지 로그 / resume / get_closest_page 는 실제 배치 크기와 무관하다.
+#   - factor 는 처음에 max_batch_size // batch_size 로 시작해서 첫 응답으로 정한다(probe).
+#     API 가 더 적게 돌려주면 돌려준 만큼으로 줄이고, 첫 페이지를 batch_size 로 한 번 더 받아 순서가 같은지 확인한다.
+#     확인한 값은 프로세스 안의 다른 키워드도 같이 쓴다.
+#   - 응답이 잘리면(metadata.total 보다 적게 오면) factor 를 받은 만큼으로, 요청이 실패하면 절반으로 줄여서 다시 받는다.
+#     factor 1 에서도 실패하면 예전처럼 예외를 낸다.
+DEFAULT_MAX_BATCH_SIZE = 100
+MAX_CACHED_CHUNKS = 8
+BATCH_FALLBACKS = "cnbc_queryly_batch_fallbacks_total"
+
+_factor_lock = threading.Lock()
+_factors: Dict[Tuple[str, int, int], int] = {}  # (API 주소, batch_size, max_batch_size) -> 확인한 factor
+
+
+def request_results(search_term: str, endindex: int, batch_size: int,
+                    setting: Dict[str, any]) -> Tuple[List[Dict[str, any]], Dict[str, any]]:
+    # Queryly 요청 한 번: (results, metadata)
+    url = queryly.get_api_url(search_term, endindex, batch_size, setting['private_key']['queryly_key'],
+                              setting['private_key']['additionalindexes'])
+    with metrics.span("api"):
+        response = http_client.get(url, cache=http_cache.RECORD)
+    if response.status_code != 200:
+        metrics.inc("cnbc_api_failures_total", stage="page")
+        raise Exception(
+            f"Response Error with status code {response.status_code}")
+    data = response.json()
+    return data["results"], data.get("metadata") or {}
+
+
+def get_max_factor(setting: Dict[str, any]) -> int:
+    max_batch_size = setting.get("max_batch_size") or 0
+    return max(1, max_batch_size // setting['batch_size'])
+
+
+def _factor_key(setting: Dict[str, any]) -> Tuple[str, int, int]:
+    return (queryly.QUERYLY_API_URL, setting['batch_size'], setting.get("max_batch_size") or 0)
+
+
+def reset_factors():
+    with _factor_lock:
+        _factors.clear()
+
+
+class QuerylyPager:
+    # 키워드 하나에 하나. 여러 스레드(페이지 미리 받기)가 같은 묶음의 페이지를 요청하면 요청은 한 번만 보낸다.
+    def __init__(self, search_term: str, setting: Dict[str, any]):
+        self.search_term = search_term
+        self.setting = setting
+        self.batch_size = setting['batch_size']
+        self.max_factor = get_max_factor(setting)
+        with _factor_lock:
+            self.factor = _factors.get(_factor_key(setting))
+        self.probing = self.factor is None
+        if self.factor is None:
+            self.factor = self.max_factor
+        self.lock = threading.Lock()
+        # 첫 페이지 -> [페이지 수, Future(results)]. Future 결과가 None 이면 배치를 줄였으니 다시 요청하라는 뜻.
+        self.chunks: "OrderedDict[int, list]" = OrderedDict()
+
+    def _find(self, page: int) -> Optional[Tuple[int, list]]:
+        for first, chunk in self.chunks.items():
+            if first <= page < first + chunk[0]:
+                return first, chunk
+        return None
+
+    def _evict(self):
+        for first in list(self.chunks):
+            if len(self.chunks) <= MAX_CACHED_CHUNKS:
+                break
+            if self.chunks[first][1].done():
+                del self.chunks[first]
+
+    def get_results(self, page: int) -> List[Dict[str, any]]:
+        # 사용자 페이지 page(1부터)의 Queryly results
+        while True:
+            with self.lock:
+                found = self._find(page)
+                owner = found is None
+                if owner:
+                    chunk = [self.factor, Future()]
+                    self.chunks[page] = chunk
+                    self._evict()
+                    first = page
+                else:
+                    first, chunk = found
+            if owner:
+                self._fetch(first, chunk)
+            results = chunk[1].result()
+            if results is None:
+                continue
+            with self.lock:
+                count = chunk[0]
+            if page >= first + count:  # 잘린 응답이라 이 페이지까지 오지 않았다.
+                continue
+            offset = (page - first) * self.batch_size
+            return results[offset:offset + self.batch_size]
+
+    def _fetch(self, first: int, chunk: list):
+        count, future = chunk
+        try:
+            results, metadata = request_results(
+                self.search_term, (first - 1) * self.batch_size, count * self.batch_size, self.setting)
+        except Exception as e:
+            with self.lock:
+                del self.chunks[first]
+                if count == 1:
+                    future.set_exception(e)
+                    return
+                self.factor = min(self.factor, max(1, count // 2))
+            print(f"Queryly batch {count * self.batch_size} failed ({e}). Retry with {self.factor * self.batch_size}")
+            metrics.inc(BATCH_FALLBACKS, reason="error")
+            future.set_result(None)
+            return
+
+        expected = count * self.batch_size
+        total = metadata.get("total")
+        if total is not None:
+            expected = min(expected, max(0, int(total) - (first - 1) * self.batch_size))
+        pages = count
+        if len(results) < expected and count > 1:
+            # 잘린 응답: 꽉 찬 페이지만 쓰고 이후로는 받은 만큼씩 요청한다.
+            # factor 1 에서 모자라게 온 응답은 예전처럼 그대로 쓴다(total 은 추정값이라 마지막 페이지가 모자랄 수 있다).
+            pages = len(results) // self.batch_size
+            with self.lock:
+                self.factor = min(self.factor, max(1, pages))
+            print(f"Queryly returned {len(results)} of {expected} results. Use batch {self.factor * self.batch_size}")
+            metrics.inc(BATCH_FALLBACKS, reason="truncated")
+            if self.probing:
+                self._remember(self.factor)
+            if pages == 0:
+                with self.lock:
+                    del self.chunks[first]
+                future.set_result(None)
+                return
+        elif self.probing and count > 1 and len(results) >= count * self.batch_size:
+            small = self._check_order(first, results)
+            self._remember(self.factor)
+            if small is not None:
+                pages, results = 1, small
+
+        with self.lock:
+            chunk[0] = pages
+        future.set_result(results[:pages * self.batch_size])
+
+    def _check_order(self, first: int, results: List[Dict[str, any]]) -> Optional[List[Dict[str, any]]]:
+        # 큰 배치의 첫 batch_size 개가 batch_size 요청과 같은 기사들인지(같은 순서로 나뉘는지) 확인한다.
+        # 다르면 factor 를 1 로 돌리고 batch_size 요청 결과를 돌려준다.
+        try:
+            small, _ = request_results(self.search_term, (first - 1) * self.batch_size, self.batch_size, self.setting)
+        except Exception as e:
+            print(f"Queryly batch check failed ({e})")
+            return None
+        if [info.get("@id") for info in small] == [info.get("@id") for info in results[:len(small)]]:
+            return None
+        print(f"Queryly batch {len(results)} is not consistent with batch {self.batch_size}. Use batch {self.batch_size}")
+        metrics.inc(BATCH_FALLBACKS, reason="inconsistent")
+        with self.lock:
+            self.factor = 1
+        return small
+
+    def _remember(self, factor: int):
+        self.probing = False
+        with _factor_lock:
+            _factors[_factor_key(self.setting)] = factor
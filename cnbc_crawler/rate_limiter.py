@@ -0,0 +1,209 @@
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+DEFAULT_RATE = 5.0        # 호스트당 초기 초당 요청 수
+DEFAULT_MIN_RATE = 0.2
+DEFAULT_MAX_RATE = 20.0
+DEFAULT_BURST = 5
+BASE_BACKOFF = 2.0        # 첫 차단 시 대기 시간(초), 연속 차단마다 2배
+ERROR_BACKOFF = 0.5       # 연결 실패 / 5xx 때 대기 시간(초), 연속 오류마다 2배(속도는 줄이지 않는다)
+MAX_BACKOFF = 60.0 * 5
+MIN_SLOW_LATENCY = 0.5    # 이보다 빠른 응답은 지연이 늘어도 속도를 줄이지 않는다(초)
+
+THROTTLE_STATUS = {403, 429}
+
+
+def is_throttle_status(status_code: int) -> bool:
+    # 다시 요청할 응답. 0 은 연결 실패/타임아웃
+    return status_code in THROTTLE_STATUS or status_code >= 500 or status_code == 0
+
+
+class HostLimiter:
+    # 호스트 하나에 대한 토큰 버킷.
+    # 성공하면 조금씩 속도를 올리고(additive increase), 차단 응답이면 속도를 절반으로 줄이고
+    # 지수 백오프 + jitter 만큼 쉰다(multiplicative decrease).
+    # 응답 지연이 기준치보다 크게 늘어나면 차단되기 전에 미리 속도를 줄인다.
+    # 동시에 보낸 요청들이 한꺼번에 차단되면 한 번으로 센다: 백오프 중에 온 응답이나 마지막 백오프 전에 보낸
+    # 요청의 응답은 속도를 다시 줄이지 않는다. 연결 실패 / 5xx 는 속도는 그대로 두고 짧게만 쉰다.
+    def __init__(self, rate: float = DEFAULT_RATE, min_rate: float = DEFAULT_MIN_RATE,
+                 max_rate: float = DEFAULT_MAX_RATE, burst: int = DEFAULT_BURST,
+                 increase_step: float = 0.1, decrease_factor: float = 0.5,
+                 latency_slowdown: float = 2.0):
+        self.lock = threading.Lock()
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_slowdown = latency_slowdown
+
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self.backoff_until = 0.0
+        self.last_backoff = 0.0  # 마지막으로 백오프를 시작한 시각
+        self.consecutive_throttles = 0
+        self.consecutive_errors = 0
+        self.latency_ewma: Optional[float] = None
+        self.latency_baseline: Optional[float] = None
+
+        self.started_at = time.monotonic()
+        self.requests = 0
+        self.successes = 0
+        self.wait_time = 0.0
+        self.throttle_events: Dict[str, int] = {}
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens +
+                          (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def acquire(self) -> float:
+        # 토큰이 생길 때까지(그리고 백오프가 끝날 때까지) 기다린다. 기다린 시간을 반환.
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.backoff_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    self.requests += 1
+                    self.wait_time += waited
+                    return waited
+                if now < self.backoff_until:
+                    delay = self.backoff_until - now
+                else:
+                    delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def _add_event(self, reason: str):
+        self.throttle_events[reason] = self.throttle_events.get(reason, 0) + 1
+
+    def _start_backoff(self, delay: float, retry_after: Optional[float]):
+        # equal jitter: 여러 워커가 동시에 다시 몰려드는 것을 막는다.
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        if retry_after:
+            delay = max(delay, retry_after)
+        now = time.monotonic()
+        self.last_backoff = now
+        self.backoff_until = max(self.backoff_until, now + delay)
+        self.tokens = 0
+
+    def _backoff(self, retry_after: Optional[float]):
+        self.consecutive_throttles += 1
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        self._start_backoff(min(MAX_BACKOFF, BASE_BACKOFF * 2 ** (self.consecutive_throttles - 1)), retry_after)
+
+    def _error_backoff(self):
+        self.consecutive_errors += 1
+        self._start_backoff(min(MAX_BACKOFF, ERROR_BACKOFF * 2 ** (self.consecutive_errors - 1)), None)
+
+    def report(self, status_code: int, latency: float, retry_after: Optional[float] = None):
+        with self.lock:
+            now = time.monotonic()
+            # 마지막 백오프 전에 보낸 요청이면 그 백오프가 이미 반영된 응답이다.
+            stale = now - latency < self.last_backoff
+            if is_throttle_status(status_code):
+                self._add_event(str(status_code) if status_code else "error")
+                if stale or now < self.backoff_until:
+                    if retry_after:
+                        self.backoff_until = max(self.backoff_until, now + retry_after)
+                    return
+                # 403/429 나 Retry-After 가 붙은 5xx(503 등)는 속도를 줄이라는 뜻이다.
+                if status_code in THROTTLE_STATUS or (status_code >= 500 and retry_after):
+                    self._backoff(retry_after)
+                else:
+                    self._error_backoff()
+                return
+
+            self.successes += 1
+            if not stale:
+                self.consecutive_throttles = 0
+                self.consecutive_errors = 0
+            if self.latency_ewma is None:
+                self.latency_ewma = latency
+                self.latency_baseline = latency
+            else:
+                self.latency_ewma = 0.8 * self.latency_ewma + 0.2 * latency
+                # 기준 지연은 천천히 따라가서 일시적인 튐에 흔들리지 않게 한다.
+                self.latency_baseline = min(self.latency_ewma,
+                                            0.99 * self.latency_baseline + 0.01 * self.latency_ewma)
+
+            if self.latency_ewma > MIN_SLOW_LATENCY and \
+                    self.latency_ewma > self.latency_baseline * self.latency_slowdown:
+                self._add_event("latency")
+                self.rate = max(self.min_rate, self.rate * 0.9)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def penalize(self, reason: str = "manual"):
+        with self.lock:
+            self._add_event(reason)
+            self._backoff(None)
+
+    def get_stats(self) -> Dict[str, any]:
+        with self.lock:
+            elapsed = max(time.monotonic() - self.started_at, 1e-9)
+            return {
+                "rate": round(self.rate, 3),
+                "requests": self.requests,
+                "successes": self.successes,
+                "throughput": round(self.successes / elapsed, 3),
+                "wait_time": round(self.wait_time, 3),
+                "latency_ewma": round(self.latency_ewma, 4) if self.latency_ewma is not None else None,
+                "throttle_events": dict(self.throttle_events),
+                "backoff_remaining": round(max(0.0, self.backoff_until - time.monotonic()), 3),
+            }
+
+
+class RateScheduler:
+    def __init__(self, rate: float = DEFAULT_RATE, min_rate: float = DEFAULT_MIN_RATE,
+                 max_rate: float = DEFAULT_MAX_RATE, burst: int = DEFAULT_BURST):
+        self.lock = threading.Lock()
+        self.options = {"rate": rate, "min_rate": min_rate,
+                        "max_rate": max_rate, "burst": burst}
+        self.hosts: Dict[str, HostLimiter] = {}
+
+    def get_limiter(self, host: str) -> HostLimiter:
+        with self.lock:
+            if host not in self.hosts:
+                self.hosts[host] = HostLimiter(**self.options)
+            return self.hosts[host]
+
+    def acquire(self, host: str) -> float:
+        return self.get_limiter(host).acquire()
+
+    def report(self, host: str, status_code: int, latency: float, retry_after: Optional[float] = None):
+        self.get_limiter(host).report(status_code, latency, retry_after)
+
+    def penalize(self, host: Optional[str] = None, reason: str = "manual"):
+        with self.lock:
+            limiters = list(self.hosts.values()) if host is None else []
+        if host is not None:
+            limiters = [self.get_limiter(host)]
+        for limiter in limiters:
+            limiter.penalize(reason)
+
+    def get_stats(self) -> Dict[str, Dict[str, any]]:
+        with self.lock:
+            hosts = dict(self.hosts)
+        return {host: limiter.get_stats() for host, limiter in hosts.items()}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def format_stats(stats: Dict[str, Dict[str, any]]) -> str:
+    return "  ".join(
+        f"[{host}] rate: {s['rate']}/s, throughput: {s['throughput']}/s, "
+        f"throttled: {sum(s['throttle_events'].values())}"
+        for host, s in stats.items())
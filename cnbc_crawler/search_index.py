@@ -0,0 +1,284 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Union
+
+# 다운로드한 기사의 전문 검색 인덱스(SQLite FTS5).
+#   docs          : 기사 하나당 한 줄(id 기준). 제목 / 설명 / 요약 / 작성자 / 본문 / url / datePublished
+#   doc_keywords  : (keyword, id). 같은 기사가 여러 키워드에 나오면 줄이 여러 개다(키워드 필터).
+#   docs_fts      : docs 를 content 테이블로 쓰는 FTS5 인덱스. 트리거로 docs 와 같이 바뀐다.
+# 크롤링 중에는 crawl_keyword 가 페이지마다 저장한 기사를 add_articles() 로 넣고,
+# 이미 받은 실행 폴더는 build_index() 로 한 번에 넣는다.
+#   python -m cnbc_crawler.search_index build cnbc_news_20240521235445
+#   python -m cnbc_crawler.search_index query "interest rates" --db cnbc_news_20240521235445/search_index.sqlite \
+#       --start 2024-01-01 --end 2024-06-01 --keyword Amazon --facets
+# 검색어는 기본적으로 단어마다 따옴표로 감싸서(모든 단어 포함) 찾는다. raw=True 이면 FTS5 문법(OR, NEAR, "구절", 접두어*)을 그대로 쓴다.
+DEFAULT_DB_NAME = "search_index.sqlite"
+DEFAULT_LIMIT = 20
+FIELDS = ("title", "description", "summary", "author", "text")
+FIELD_WEIGHTS = (10.0, 4.0, 4.0, 2.0, 1.0)  # bm25 가중치(FIELDS 순서)
+DateLike = Union[str, datetime, None]
+
+
+class SearchHit(NamedTuple):
+    id: str
+    title: str
+    date_published: str
+    url: str
+    keywords: List[str]
+    score: float  # bm25 (작을수록 관련도가 높다)
+    snippet: str
+
+
+def _text(value) -> str:
+    # info 값은 None 이나 NaN(parquet / excel)일 수 있다.
+    if isinstance(value, str):
+        return value
+    if value is None or value != value:
+        return ""
+    return str(value)
+
+
+def _format_date(value: DateLike) -> Optional[str]:
+    # datePublished('%Y-%m-%dT%H:%M:%S+0000')와 문자열로 비교한다. '2024-01-01' 처럼 날짜만 줘도 된다.
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%dT%H:%M:%S')
+    return str(value)
+
+
+def to_match_query(query: str) -> str:
+    # 일반 검색어 -> FTS5 MATCH 식. 단어마다 따옴표로 감싸서 특수문자(S&P, AT&T 등)가 문법으로 읽히지 않게 한다.
+    terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+    if not terms:
+        raise Exception("Empty search query")
+    return " ".join(terms)
+
+
+class SearchIndex:
+    # 여러 키워드 스레드가 같이 쓴다(seen_index 와 같은 방식). 페이지 하나를 트랜잭션 하나로 넣는다.
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS docs (
+                rowid INTEGER PRIMARY KEY,
+                id TEXT NOT NULL UNIQUE,
+                title TEXT, description TEXT, summary TEXT, author TEXT, text TEXT,
+                url TEXT,
+                date_published TEXT
+            );
+            CREATE INDEX IF NOT EXISTS docs_date ON docs (date_published);
+            CREATE TABLE IF NOT EXISTS doc_keywords (
+                keyword TEXT NOT NULL COLLATE NOCASE,
+                id TEXT NOT NULL,
+                PRIMARY KEY (keyword, id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS doc_keywords_id ON doc_keywords (id);
+            CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+                {', '.join(FIELDS)}, content='docs', content_rowid='rowid', tokenize='porter unicode61');
+            CREATE TRIGGER IF NOT EXISTS docs_ai AFTER INSERT ON docs BEGIN
+                INSERT INTO docs_fts (rowid, {', '.join(FIELDS)})
+                VALUES (new.rowid, {', '.join('new.' + field for field in FIELDS)});
+            END;
+            CREATE TRIGGER IF NOT EXISTS docs_ad AFTER DELETE ON docs BEGIN
+                INSERT INTO docs_fts (docs_fts, rowid, {', '.join(FIELDS)})
+                VALUES ('delete', old.rowid, {', '.join('old.' + field for field in FIELDS)});
+            END;
+            CREATE TRIGGER IF NOT EXISTS docs_au AFTER UPDATE ON docs BEGIN
+                INSERT INTO docs_fts (docs_fts, rowid, {', '.join(FIELDS)})
+                VALUES ('delete', old.rowid, {', '.join('old.' + field for field in FIELDS)});
+                INSERT INTO docs_fts (rowid, {', '.join(FIELDS)})
+                VALUES (new.rowid, {', '.join('new.' + field for field in FIELDS)});
+            END;""")
+        self.conn.commit()
+
+    def add_articles(self, keyword: str, info_list: List[Dict[str, any]], get_text: Callable[[str], str]) -> int:
+        # 저장에 성공한 기사들을 넣는다. get_text(id) 로 저장소에서 본문을 읽고, 읽지 못한 기사는 건너뛴다.
+        # 같은 id 가 이미 있으면 내용이 바뀐 경우에만 다시 색인한다. 넣은 기사 수를 돌려준다.
+        rows = []
+        for info in info_list:
+            id = str(info["id"])
+            try:
+                text = get_text(id)
+            except Exception as e:
+                print(f"Search index: cannot read article {id}: {e}")
+                continue
+            rows.append((id, _text(info.get("title")), _text(info.get("description")), _text(info.get("summary")),
+                         _text(info.get("author")), text, _text(info.get("url")), _text(info.get("datePublished"))))
+        if not rows:
+            return 0
+        changed = " OR ".join(f"docs.{name} IS NOT excluded.{name}" for name in FIELDS + ("url", "date_published"))
+        with self.lock:
+            with self.conn:
+                self.conn.executemany(f"""
+                    INSERT INTO docs (id, {', '.join(FIELDS)}, url, date_published)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (id) DO UPDATE SET
+                        {', '.join(f'{name} = excluded.{name}' for name in FIELDS + ('url', 'date_published'))}
+                    WHERE {changed}""", rows)
+                self.conn.executemany("INSERT OR IGNORE INTO doc_keywords (keyword, id) VALUES (?, ?)",
+                                      [(keyword, row[0]) for row in rows])
+        return len(rows)
+
+    def retain(self, keyword: str, ids: Iterable[str]) -> int:
+        # 키워드 info 에 남은 id 만 남긴다(crawl_keyword 마무리 때 저장소 정리와 같이). 지운 참조 수를 돌려준다.
+        # 어느 키워드에도 남지 않은 기사는 docs / docs_fts 에서도 지운다.
+        with self.lock:
+            with self.conn:
+                self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep_ids (id TEXT PRIMARY KEY)")
+                self.conn.execute("DELETE FROM keep_ids")
+                self.conn.executemany("INSERT OR IGNORE INTO keep_ids VALUES (?)", [(str(id),) for id in ids])
+                removed = self.conn.execute(
+                    "DELETE FROM doc_keywords WHERE keyword = ? AND id NOT IN (SELECT id FROM keep_ids)",
+                    (keyword,)).rowcount
+                if removed:
+                    self.conn.execute("DELETE FROM docs WHERE id NOT IN (SELECT id FROM doc_keywords)")
+                self.conn.execute("DELETE FROM keep_ids")
+        return removed
+
+    def _where(self, query: str, start_date: DateLike, end_date: DateLike,
+               keywords: Optional[Iterable[str]], raw: bool):
+        conditions = ["docs_fts MATCH ?"]
+        params = [query if raw else to_match_query(query)]
+        if start_date is not None:
+            conditions.append("d.date_published >= ?")
+            params.append(_format_date(start_date))
+        if end_date is not None:
+            conditions.append("d.date_published < ?")
+            params.append(_format_date(end_date))
+        keywords = list(keywords or [])
+        if keywords:
+            conditions.append("EXISTS (SELECT 1 FROM doc_keywords k WHERE k.id = d.id "
+                              f"AND k.keyword IN ({','.join('?' * len(keywords))}))")
+            params.extend(keywords)
+        return " AND ".join(conditions), params
+
+    def search(self, query: str, start_date: DateLike = None, end_date: DateLike = None,
+               keywords: Optional[Iterable[str]] = None, limit: int = DEFAULT_LIMIT,
+               raw: bool = False) -> List[SearchHit]:
+        # bm25 순위(제목 > 설명 / 요약 > 작성자 > 본문 가중치)로 limit 개를 돌려준다.
+        # start_date <= datePublished < end_date, keywords 중 하나로 받은 기사만 남긴다.
+        where, params = self._where(query, start_date, end_date, keywords, raw)
+        with self.lock:
+            rows = self.conn.execute(f"""
+                SELECT d.id, d.title, d.date_published, d.url,
+                       (SELECT group_concat(k.keyword, '\t') FROM doc_keywords k WHERE k.id = d.id),
+                       bm25(docs_fts, {', '.join(map(str, FIELD_WEIGHTS))}) AS score,
+                       snippet(docs_fts, -1, '[', ']', '...', 16)
+                FROM docs_fts JOIN docs d ON d.rowid = docs_fts.rowid
+                WHERE {where}
+                ORDER BY score
+                LIMIT ?""", [*params, limit]).fetchall()
+        return [SearchHit(id, title, date_published, url, sorted(keywords.split("\t")) if keywords else [],
+                          score, snippet)
+                for id, title, date_published, url, keywords, score, snippet in rows]
+
+    def facets(self, query: str, start_date: DateLike = None, end_date: DateLike = None,
+               keywords: Optional[Iterable[str]] = None, raw: bool = False) -> Dict[str, Dict[str, int]]:
+        # 검색 결과 전체의 키워드별 / 월별 기사 수
+        where, params = self._where(query, start_date, end_date, keywords, raw)
+        matched = f"SELECT d.id, d.date_published FROM docs_fts JOIN docs d ON d.rowid = docs_fts.rowid WHERE {where}"
+        with self.lock:
+            by_keyword = self.conn.execute(f"""
+                SELECT k.keyword, COUNT(*) FROM ({matched}) m JOIN doc_keywords k ON k.id = m.id
+                GROUP BY k.keyword ORDER BY COUNT(*) DESC""", params).fetchall()
+            by_month = self.conn.execute(f"""
+                SELECT substr(m.date_published, 1, 7) AS month, COUNT(*) FROM ({matched}) m
+                GROUP BY month ORDER BY month""", params).fetchall()
+        return {"keyword": dict(by_keyword), "month": dict(by_month)}
+
+    def count(self, keyword: Optional[str] = None) -> int:
+        with self.lock:
+            if keyword is None:
+                return self.conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM doc_keywords WHERE keyword = ?", (keyword,)).fetchone()[0]
+
+    def optimize(self):
+        # FTS5 세그먼트를 하나로 합친다(대량 색인 뒤 검색 속도).
+        with self.lock:
+            with self.conn:
+                self.conn.execute("INSERT INTO docs_fts (docs_fts) VALUES ('optimize')")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def build_index(path: str, db_path: Optional[str] = None, batch_size: int = 500) -> int:
+    # 키워드 폴더 또는 cnbc_news_* 폴더의 (끝난) 키워드를 모두 색인한다. 다시 돌려도 바뀐 기사만 다시 색인한다.
+    from cnbc_crawler.corpus_reader import CorpusReader  # pandas 를 쓰므로 필요할 때만 불러온다.
+
+    db_path = db_path or os.path.join(path, DEFAULT_DB_NAME)
+    total = 0
+    with SearchIndex(db_path) as index, CorpusReader(path, decode=True) as reader:
+        for keyword_dir in reader.keyword_dirs:
+            keyword = os.path.basename(os.path.normpath(keyword_dir))
+            ids = []
+            batch = {}
+            for article in reader.iter_keyword(keyword_dir):
+                ids.append(article.id)
+                batch[article.id] = article
+                if len(batch) >= batch_size:
+                    total += index.add_articles(keyword, [a.info for a in batch.values()], lambda id: batch[id].text)
+                    batch = {}
+            total += index.add_articles(keyword, [a.info for a in batch.values()], lambda id: batch[id].text)
+            removed = index.retain(keyword, ids)
+            print(f"Index {len(ids)} articles of {keyword}" + (f" (remove {removed})" if removed else ""))
+        index.optimize()
+    return total
+
+
+def print_hits(hits: List[SearchHit], elapsed: float):
+    for rank, hit in enumerate(hits, 1):
+        print(f"{rank:>3}. [{hit.date_published[:10]}] {hit.title}  ({', '.join(hit.keywords)}, {hit.score:.2f})")
+        print(f"     {hit.url}")
+        print(f"     {hit.snippet}")
+    print(f"{len(hits)} hits in {elapsed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Full-text search index over downloaded CNBC articles")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="index a keyword folder or cnbc_news_* folder")
+    build_parser.add_argument("path")
+    build_parser.add_argument("--db", default=None, help=f"index file (default: <path>/{DEFAULT_DB_NAME})")
+    query_parser = commands.add_parser("query", help="search the index")
+    query_parser.add_argument("query")
+    query_parser.add_argument("--db", default=DEFAULT_DB_NAME)
+    query_parser.add_argument("--start", default=None, help="datePublished >= start (e.g. 2024-01-01)")
+    query_parser.add_argument("--end", default=None, help="datePublished < end")
+    query_parser.add_argument("--keyword", action="append", default=None, help="repeat for several keywords")
+    query_parser.add_argument("-n", "--limit", type=int, default=DEFAULT_LIMIT)
+    query_parser.add_argument("--raw", action="store_true", help="use FTS5 query syntax as is")
+    query_parser.add_argument("--facets", action="store_true", help="print hit counts per keyword / month")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        started = time.perf_counter()
+        count = build_index(args.path, args.db)
+        print(f"Index {count} articles in {time.perf_counter() - started:.1f}s")
+    else:
+        if not os.path.exists(args.db):
+            raise Exception(f"Search index not found: {args.db}")
+        with SearchIndex(args.db) as index:
+            started = time.perf_counter()
+            hits = index.search(args.query, args.start, args.end, args.keyword, args.limit, args.raw)
+            print_hits(hits, time.perf_counter() - started)
+            if args.facets:
+                facets = index.facets(args.query, args.start, args.end, args.keyword, args.raw)
+                print(f"keywords: {facets['keyword']}")
+                print(f"months: {facets['month']}")
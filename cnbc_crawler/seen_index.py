@@ -0,0 +1,72 @@
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+MAX_FAILED_ATTEMPTS = 3  # 이 횟수만큼 실패한 기사는 증분 모드에서 더 이상 다시 받지 않는다
+
+
+class SeenIndex:
+    # 키워드별로 한 번이라도 처리한 기사 id(@id)와 _id, datePublished 를 기록하는 SQLite 인덱스.
+    # 실행 폴더(cnbc_news_<timestamp>)와 무관하게 유지되어 다음 실행에서 새 기사만 받을 수 있다.
+    def __init__(self, db_path: str):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS seen (
+                keyword TEXT NOT NULL,
+                id TEXT NOT NULL,
+                _id TEXT,
+                date_published TEXT,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 1,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (keyword, id)
+            )""")
+        self.conn.commit()
+
+    def filter_unseen(self, keyword: str, ids: Iterable[str]) -> Set[str]:
+        # 아직 저장하지 못한 id 들(처음 보는 기사 + 실패 횟수가 적은 기사)
+        ids = [str(id) for id in ids]
+        if not ids:
+            return set()
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT id, status, attempts FROM seen WHERE keyword = ? AND id IN ({','.join('?' * len(ids))})",
+                [keyword, *ids]).fetchall()
+        seen = {id for id, status, attempts in rows
+                if status == "saved" or attempts >= MAX_FAILED_ATTEMPTS}
+        return set(ids) - seen
+
+    def add_page(self, keyword: str, candidates: List[Dict[str, any]], saved: List[Dict[str, any]]):
+        # 한 페이지에서 시도한 기사들을 기록한다. 저장에 성공한 기사는 saved, 나머지는 failed.
+        saved_ids = {str(info["id"]) for info in saved}
+        now = time.time()
+        rows = [(keyword, str(info["id"]), str(info.get("_id")), info.get("datePublished"),
+                 "saved" if str(info["id"]) in saved_ids else "failed", now)
+                for info in candidates]
+        with self.lock:
+            self.conn.executemany("""
+                INSERT INTO seen (keyword, id, _id, date_published, status, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (keyword, id) DO UPDATE SET
+                    status = CASE WHEN seen.status = 'saved' THEN 'saved' ELSE excluded.status END,
+                    attempts = CASE WHEN excluded.status = 'failed' THEN seen.attempts + 1 ELSE seen.attempts END,
+                    date_published = excluded.date_published,
+                    updated_at = excluded.updated_at""", rows)
+            self.conn.commit()
+
+    def count(self, keyword: str) -> int:
+        with self.lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM seen WHERE keyword = ? AND status = 'saved'", (keyword,)).fetchone()[0]
+
+    def latest_date(self, keyword: str) -> Optional[str]:
+        with self.lock:
+            return self.conn.execute(
+                "SELECT MAX(date_published) FROM seen WHERE keyword = ? AND status = 'saved'", (keyword,)).fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,100 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from cnbc_crawler import http_cache, http_client, metrics, rate_limiter
+from cnbc_crawler.config import CrawlConfig
+from cnbc_crawler.crawler import crawl_keyword
+from cnbc_crawler.keyword_scheduler import KeywordScheduler
+from cnbc_crawler.parse_pipeline import ParsePipeline
+from cnbc_crawler.search_index import SearchIndex
+from cnbc_crawler.seen_index import SeenIndex
+
+
+class CrawlSession:
+    # 한 번의 실행에 필요한 공용 자원(HTTP 클라이언트와 캐시, 파싱 프로세스, seen index, 검색 인덱스, 다운로드 스레드, 지표)을 열고 닫는다.
+    # main.py(CLI), cnbc_crawler.gui(PyQt), 노트북이 모두 이 클래스로 크롤링한다.
+    #   with CrawlSession(CrawlConfig(article_store="packed"), project_dir) as session:
+    #       session.crawl(["Apple", "Amazon"], datetime(2024, 1, 1))  # target_date 까지(키워드 여러 개)
+    #       session.crawl_pages("Tesla", 1, 5)                         # 페이지 범위(키워드 하나)
+    def __init__(self, config: CrawlConfig, project_dir: str):
+        self.config = config
+        self.setting = config.to_setting()
+        self.project_dir = os.path.abspath(project_dir)
+        self.parse_pipeline: Optional[ParsePipeline] = None
+        self.seen_index: Optional[SeenIndex] = None
+        self.search_index: Optional[SearchIndex] = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.metrics_exporter: Optional[metrics.MetricsExporter] = None
+
+    def start(self):
+        os.makedirs(self.project_dir, exist_ok=True)
+        http_client.configure(self.setting)
+        # 파싱 프로세스는 다른 스레드가 시작되기 전에 만든다(fork).
+        if self.config.parse_workers > 0:
+            self.parse_pipeline = ParsePipeline(
+                self.config.parse_workers, self.config.parse_queue_size,
+                self.config.concurrency, self.config.parser_backend).start()
+        if self.config.seen_index_path is not None:
+            self.seen_index = SeenIndex(self.config.seen_index_path)
+        if self.config.search_index_path is not None:
+            self.search_index = SearchIndex(self.config.search_index_path)
+        self.executor = ThreadPoolExecutor(max_workers=self.config.concurrency)
+        self.metrics_exporter = metrics.start_exporter(self.setting)
+        return self
+
+    def crawl(self, keyword_list: List[str], target_date: datetime, start_page: int = 1,
+              resume: bool = False) -> Dict[str, Dict[str, any]]:
+        # 키워드마다 target_date 에 가장 가까운 페이지를 찾아서 받는다. 키워드별 진행 상황을 돌려준다.
+        scheduler = KeywordScheduler(keyword_list, self.project_dir, self.setting, target_date,
+                                     start_page, resume=resume, parse_pipeline=self.parse_pipeline,
+                                     seen_index=self.seen_index, search_index=self.search_index,
+                                     executor=self.executor)
+        return scheduler.run()
+
+    def crawl_pages(self, keyword: str, start_page: int, end_page: int,
+                    on_progress: Optional[Callable[[str, int, int, int], None]] = None,
+                    on_article: Optional[Callable[[str, int, int, int], None]] = None,
+                    should_stop: Optional[Callable[[], bool]] = None, project_dir: Optional[str] = None,
+                    keyword_dir: Optional[str] = None) -> int:
+        # 키워드 하나를 start_page ~ end_page 만 받는다(페이지 탐색 없음). 저장한 기사 수를 돌려준다.
+        # project_dir 을 주면 세션 폴더 대신 그 폴더에 저장한다(distributed 작업자는 작업마다 폴더를 따로 쓴다).
+        # keyword_dir 을 주면 <project_dir>/<keyword> 대신 그 폴더에 바로 저장한다.
+        with metrics.span("keyword"):
+            return crawl_keyword(keyword, project_dir or self.project_dir, self.setting, None, start_page, end_page,
+                                 self.parse_pipeline, self.executor, on_progress,
+                                 seen_index=self.seen_index, on_article=on_article, should_stop=should_stop,
+                                 search_index=self.search_index, keyword_dir=keyword_dir)
+
+    def format_stats(self) -> str:
+        lines = [f"HTTP: {http_client.format_stats(http_client.get_stats())}",
+                 f"Rate limiter: {rate_limiter.format_stats(http_client.get_rate_stats())}"]
+        if http_client.get_cache_stats() is not None:
+            lines.append(f"HTTP cache: {http_cache.format_stats(http_client.get_cache_stats())}")
+        lines.append(f"Metrics: {metrics.format_stats(metrics.get_snapshot())}")
+        return "\n".join(lines)
+
+    def close(self):
+        # 파싱 프로세스를 먼저 닫아서 그 지표까지 합친 뒤 지표를 마지막으로 저장한다.
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        if self.parse_pipeline is not None:
+            self.parse_pipeline.close()
+            self.parse_pipeline = None
+        if self.seen_index is not None:
+            self.seen_index.close()
+            self.seen_index = None
+        if self.search_index is not None:
+            self.search_index.close()
+            self.search_index = None
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.close()
+            self.metrics_exporter = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
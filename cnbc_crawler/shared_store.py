@@ -0,0 +1,190 @@
+import hashlib
+import os
+import threading
+from typing import Dict, Iterable, Optional
+
+from cnbc_crawler.corpus_store import DEFAULT_COMPRESSION, PackedArticleStore
+
+# 실행(cnbc_news_*) 하나에서 여러 키워드가 같이 쓰는 기사 저장소 (article_store="shared").
+#   <project_dir>/_shared/articles.seg|idx : 본문의 sha256 을 키로 하는 packed store (같은 본문은 한 번만 저장)
+#   <project_dir>/_shared/ids.tsv          : "<id>\t<sha256>\n" append-only (CNBC @id -> 본문)
+#   <keyword>/articles.refs                : 키워드가 가진 기사 "<id>\t<sha256>\n" (본문 없이 참조만)
+# 다른 키워드가 이미 받은 id 는 HTTP 요청 없이 참조만 추가한다(link).
+SHARED_DIR_NAME = "_shared"
+IDS_FILE_NAME = "ids.tsv"
+REFS_FILE_NAME = "articles.refs"
+
+
+def get_content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _read_refs(path: str, truncate: bool = True) -> Dict[str, str]:
+    # "<id>\t<hash>\n" 줄을 읽는다. 끊긴 마지막 줄은 버리고 truncate=True 이면 파일에서도 잘라낸다.
+    refs = {}
+    if not os.path.exists(path):
+        return refs
+    valid_end = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            parts = line.decode(errors="replace").rstrip("\n").split("\t")
+            if not line.endswith(b"\n") or len(parts) != 2:
+                break
+            refs[parts[0]] = parts[1]
+            valid_end += len(line)
+    if truncate and valid_end != os.path.getsize(path):
+        with open(path, 'r+b') as f:
+            f.truncate(valid_end)
+    return refs
+
+
+def exists(keyword_dir: str) -> bool:
+    return os.path.exists(os.path.join(keyword_dir, REFS_FILE_NAME))
+
+
+def get_shared_dir(keyword_dir: str) -> str:
+    return os.path.join(os.path.dirname(os.path.normpath(keyword_dir)), SHARED_DIR_NAME)
+
+
+def read_keyword_refs(keyword_dir: str) -> Dict[str, str]:
+    # 읽기 전용(corpus_reader 등)
+    return _read_refs(os.path.join(keyword_dir, REFS_FILE_NAME), truncate=False)
+
+
+class SharedArticleStore:
+    # 여러 키워드(스레드)가 같이 쓴다. 키워드마다 keyword_refs() 로 받은 객체를 articles_dir 대신 넘긴다.
+    def __init__(self, project_dir: str, compression: str = DEFAULT_COMPRESSION):
+        self.shared_dir = os.path.join(project_dir, SHARED_DIR_NAME)
+        self.blobs = PackedArticleStore(self.shared_dir, compression)
+        self.ids_path = os.path.join(self.shared_dir, IDS_FILE_NAME)
+        self.ids = _read_refs(self.ids_path)
+        self.ids_file = open(self.ids_path, 'ab')
+        self.lock = threading.Lock()
+        self.stats = {"stored": 0, "same_content": 0, "linked": 0}
+
+    def lookup(self, id: str) -> Optional[str]:
+        return self.ids.get(str(id))
+
+    def put(self, id: str, text: str) -> str:
+        id = str(id)
+        content_hash = get_content_hash(text)
+        with self.lock:
+            if content_hash in self.blobs:
+                self.stats["same_content"] += 1
+            else:
+                self.blobs.put(content_hash, text)
+                self.stats["stored"] += 1
+            if self.ids.get(id) != content_hash:
+                self.ids_file.write(f"{id}\t{content_hash}\n".encode())
+                self.ids_file.flush()
+                self.ids[id] = content_hash
+        return content_hash
+
+    def get(self, id: str) -> str:
+        return self.blobs.get(self.ids[str(id)])
+
+    def keyword_refs(self, keyword_dir: str) -> "KeywordArticleRefs":
+        return KeywordArticleRefs(self, keyword_dir)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.stats, articles=len(self.ids), contents=len(self.blobs))
+
+    def close(self):
+        with self.lock:
+            if self.ids_file.closed:
+                return
+            self.ids_file.flush()
+            os.fsync(self.ids_file.fileno())
+            self.ids_file.close()
+            self.blobs.close()
+
+
+class KeywordArticleRefs:
+    # 키워드 하나의 참조 목록. fetch_engine / ParsePipeline 에 articles_dir 대신 넘긴다.
+    #   link(id): 공용 저장소에 이미 있으면 참조만 추가하고 True (다운로드 생략)
+    #   put(id, text): 공용 저장소에 저장하고 참조를 추가
+    def __init__(self, shared: SharedArticleStore, keyword_dir: str):
+        self.shared = shared
+        self.path = os.path.join(keyword_dir, REFS_FILE_NAME)
+        self.refs = _read_refs(self.path)
+        self.file = open(self.path, 'ab')
+        self.lock = threading.Lock()
+
+    def _add(self, id: str, content_hash: str):
+        with self.lock:
+            if self.refs.get(id) == content_hash:
+                return
+            self.file.write(f"{id}\t{content_hash}\n".encode())
+            self.file.flush()
+            self.refs[id] = content_hash
+
+    def link(self, id: str) -> bool:
+        content_hash = self.shared.lookup(id)
+        if content_hash is None:
+            return False
+        with self.shared.lock:
+            self.shared.stats["linked"] += 1
+        self._add(str(id), content_hash)
+        return True
+
+    def put(self, id: str, text: str):
+        self._add(str(id), self.shared.put(id, text))
+
+    def get(self, id: str) -> str:
+        return self.shared.blobs.get(self.refs[str(id)])
+
+    def __contains__(self, id) -> bool:
+        return str(id) in self.refs
+
+    def __len__(self) -> int:
+        return len(self.refs)
+
+    def ids(self) -> Iterable[str]:
+        return list(self.refs)
+
+    def compact(self, keep_ids: Optional[Iterable[str]] = None) -> int:
+        # keep_ids 에 없는 참조를 지운다. 공용 본문은 다른 키워드가 쓸 수 있으므로 남긴다.
+        keep_ids = None if keep_ids is None else {str(id) for id in keep_ids}
+        with self.lock:
+            new_refs = {id: content_hash for id, content_hash in self.refs.items()
+                        if keep_ids is None or id in keep_ids}
+            temp_path = self.path + ".tmp"
+            with open(temp_path, 'w') as f:
+                for id, content_hash in new_refs.items():
+                    f.write(f"{id}\t{content_hash}\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.file.close()
+            os.replace(temp_path, self.path)
+            self.file = open(self.path, 'ab')
+            removed = len(self.refs) - len(new_refs)
+            self.refs = new_refs
+        return removed
+
+    def export_txt(self, articles_dir: str) -> int:
+        os.makedirs(articles_dir, exist_ok=True)
+        for id in self.ids():
+            with open(os.path.join(articles_dir, f'{id}.txt'), 'w') as f:
+                f.write(self.get(id))
+        return len(self.refs)
+
+    def close(self):
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def format_stats(stats: Dict[str, int]) -> str:
+    return (f"{stats['articles']} articles / {stats['contents']} contents, "
+            f"stored {stats['stored']}, same content {stats['same_content']}, "
+            f"linked without download {stats['linked']}")
@@ -0,0 +1,218 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# 여러 프로세스 / 컴퓨터가 같이 쓰는 (keyword, 페이지 구간) 작업 큐(distributed 모드).
+# SQLite 파일 하나에 둔다. 여러 컴퓨터가 쓸 때는 잠금이 되는 공유 파일 시스템에 둬야 한다.
+#   - 작업은 pending -> leased(작업자, lease_until) -> done / failed 로 바뀐다.
+#   - 작업자는 lease_seconds 보다 자주 heartbeat 로 임대를 늘린다. 임대가 끝난 작업은 다른 작업자가 다시 가져간다.
+#   - 가져간 횟수(attempts)가 max_attempts 가 되면 더 이상 나눠 주지 않고 failed 로 남긴다.
+DEFAULT_LEASE_SECONDS = 60
+DEFAULT_MAX_ATTEMPTS = 3
+
+PageRange = Tuple[int, int]
+
+
+class Task(NamedTuple):
+    id: int
+    keyword: str
+    first_page: int
+    last_page: int
+    attempts: int
+
+
+def split_tasks(start_page: int, end_page: int, pages_per_task: int) -> List[PageRange]:
+    # start_page ~ end_page 를 pages_per_task 페이지씩 자른다(마지막 구간은 더 짧을 수 있다).
+    return [(first, min(first + pages_per_task - 1, end_page))
+            for first in range(start_page, end_page + 1, pages_per_task)]
+
+
+class WorkQueue:
+    def __init__(self, db_path: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()  # heartbeat 스레드와 연결을 같이 쓴다.
+        # isolation_level=None: 트랜잭션은 직접 연다(작업을 가져갈 때 BEGIN IMMEDIATE 로 쓰기 잠금을 먼저 잡는다).
+        self.conn = sqlite3.connect(db_path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (
+                name TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS keywords (
+                keyword TEXT PRIMARY KEY,
+                target_page INTEGER,
+                status TEXT NOT NULL,
+                articles INTEGER,
+                error TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY,
+                keyword TEXT NOT NULL,
+                first_page INTEGER NOT NULL,
+                last_page INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                articles INTEGER,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                UNIQUE (keyword, first_page, last_page)
+            );
+            CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_until);""")
+
+    def set_meta(self, name: str, value: any):
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, json.dumps(value)))
+
+    def get_meta(self, name: str, default: any = None) -> any:
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def add_keyword(self, keyword: str, target_page: int, ranges: List[PageRange]):
+        # 키워드와 작업들을 한 번에 넣는다. 이미 있는 작업은 그대로 둔다(coordinator 를 다시 실행해도 된다).
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute("""
+                    INSERT OR IGNORE INTO keywords (keyword, target_page, status, updated_at)
+                    VALUES (?, ?, 'planned', ?)""", (keyword, target_page, now))
+                self.conn.executemany("""
+                    INSERT OR IGNORE INTO tasks (keyword, first_page, last_page, updated_at)
+                    VALUES (?, ?, ?, ?)""", [(keyword, first, last, now) for first, last in ranges])
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def set_keyword(self, keyword: str, status: str, articles: Optional[int] = None, error: Optional[str] = None):
+        # status: planned / merged / failed
+        with self.lock:
+            self.conn.execute("""
+                INSERT INTO keywords (keyword, status, articles, error, updated_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (keyword) DO UPDATE SET
+                    status = excluded.status, articles = excluded.articles,
+                    error = excluded.error, updated_at = excluded.updated_at""",
+                              (keyword, status, articles, error, time.time()))
+
+    def get_keywords(self) -> Dict[str, Dict[str, any]]:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT keyword, target_page, status, articles, error FROM keywords ORDER BY rowid").fetchall()
+        return {keyword: {"target_page": target_page, "status": status, "articles": articles, "error": error}
+                for keyword, target_page, status, articles, error in rows}
+
+    def get_ranges(self, keyword: str) -> List[PageRange]:
+        with self.lock:
+            return [tuple(row) for row in self.conn.execute(
+                "SELECT first_page, last_page FROM tasks WHERE keyword = ? ORDER BY first_page", (keyword,))]
+
+    def finished_keywords(self) -> List[str]:
+        # 모든 작업이 done 인데 아직 합치지 않은 키워드
+        with self.lock:
+            return [row[0] for row in self.conn.execute("""
+                SELECT keyword FROM keywords WHERE status = 'planned' AND NOT EXISTS (
+                    SELECT 1 FROM tasks WHERE tasks.keyword = keywords.keyword AND tasks.status != 'done')
+                ORDER BY rowid""")]
+
+    def failed_keywords(self) -> Dict[str, str]:
+        # 실패한 작업이 있는 키워드 -> 마지막 오류
+        with self.lock:
+            return dict(self.conn.execute("""
+                SELECT tasks.keyword, tasks.error FROM tasks JOIN keywords ON keywords.keyword = tasks.keyword
+                WHERE tasks.status = 'failed' AND keywords.status = 'planned'
+                GROUP BY tasks.keyword"""))
+
+    def claim(self, worker: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[Task]:
+        # 대기 중이거나 임대가 끝난 작업 하나를 가져간다. 없으면 None.
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute("""
+                    UPDATE tasks SET status = 'failed', worker = NULL, lease_until = NULL,
+                        error = COALESCE(error, 'lease expired'), updated_at = ?
+                    WHERE status = 'leased' AND lease_until < ? AND attempts >= ?""",
+                                  (now, now, self.max_attempts))
+                row = self.conn.execute("""
+                    SELECT id, keyword, first_page, last_page, attempts FROM tasks
+                    WHERE status = 'pending' OR (status = 'leased' AND lease_until < ?)
+                    ORDER BY id LIMIT 1""", (now,)).fetchone()
+                if row is not None:
+                    self.conn.execute("""
+                        UPDATE tasks SET status = 'leased', worker = ?, lease_until = ?,
+                            attempts = attempts + 1, updated_at = ?
+                        WHERE id = ?""", (worker, now + lease_seconds, now, row[0]))
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return Task(row[0], row[1], row[2], row[3], row[4] + 1)
+
+    def heartbeat(self, task_id: int, worker: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        # 임대를 늘린다. 다른 작업자가 가져갔거나 이미 끝난 작업이면 False.
+        now = time.time()
+        with self.lock:
+            cursor = self.conn.execute("""
+                UPDATE tasks SET lease_until = ?, updated_at = ?
+                WHERE id = ? AND worker = ? AND status = 'leased'""", (now + lease_seconds, now, task_id, worker))
+        return cursor.rowcount == 1
+
+    def complete(self, task_id: int, worker: str, articles: int) -> bool:
+        # 결과를 올린 뒤에 부른다. 임대가 끝난 뒤라도 결과는 이미 올라갔으므로 done 으로 바꾼다.
+        with self.lock:
+            cursor = self.conn.execute("""
+                UPDATE tasks SET status = 'done', worker = ?, lease_until = NULL, articles = ?, error = NULL,
+                    updated_at = ?
+                WHERE id = ? AND status != 'done'""", (worker, articles, time.time(), task_id))
+        return cursor.rowcount == 1
+
+    def fail(self, task_id: int, worker: str, error: str):
+        # 가져간 횟수가 max_attempts 보다 적으면 다시 대기시키고, 아니면 failed 로 남긴다.
+        with self.lock:
+            self.conn.execute("""
+                UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                    worker = NULL, lease_until = NULL, error = ?, updated_at = ?
+                WHERE id = ? AND worker = ? AND status = 'leased'""",
+                              (self.max_attempts, error, time.time(), task_id, worker))
+
+    def release(self, task_id: int, worker: str):
+        # 작업자가 중단될 때: 실패로 세지 않고 돌려준다.
+        with self.lock:
+            self.conn.execute("""
+                UPDATE tasks SET status = 'pending', worker = NULL, lease_until = NULL,
+                    attempts = MAX(0, attempts - 1), updated_at = ?
+                WHERE id = ? AND worker = ? AND status = 'leased'""", (time.time(), task_id, worker))
+
+    def counts(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status"))
+
+    def articles(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COALESCE(SUM(articles), 0) FROM tasks WHERE status = 'done'").fetchone()[0]
+
+    def is_finished(self) -> bool:
+        # coordinator 가 작업을 모두 넣었고 남은(대기 / 임대 중) 작업이 없다.
+        if not self.get_meta("planned", False):
+            return False
+        counts = self.counts()
+        return counts.get("pending", 0) == 0 and counts.get("leased", 0) == 0
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "benchmarks"))
+
+from cnbc_crawler import queryly  # noqa: E402
+from mock_server import MockCnbcServer  # noqa: E402
+
+
+@pytest.fixture
+def mock_server(monkeypatch):
+    # 네트워크 없이 benchmarks/mock_server.py 로 크롤링한다(기사 60개 = batch_size 10 으로 6페이지).
+    with MockCnbcServer({"Amazon": 60}) as server:
+        monkeypatch.setattr(queryly, "QUERYLY_API_URL", server.api_url)
+        yield server
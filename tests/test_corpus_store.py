@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+from cnbc_crawler.corpus_store import INDEX_FILE_NAME, SEGMENT_FILE_NAME, PackedArticleStore
+
+
+@pytest.mark.parametrize("compression", ["none", "zstd"])
+def test_torn_segment_tail_is_cut_before_new_records(tmp_path, compression):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    keyword_dir = str(tmp_path)
+    with PackedArticleStore(keyword_dir, compression) as store:
+        store.put("1", "first")
+        store.put("2", "second")
+    with open(os.path.join(keyword_dir, SEGMENT_FILE_NAME), 'ab') as f:
+        f.write(b"CNA0\x01\x00\xff\x00\x00\x003partial")  # 쓰다가 끊긴 기록
+
+    with PackedArticleStore(keyword_dir, compression) as store:
+        store.put("4", "fourth")
+        store.put("5", "fifth")
+        store.compact()
+    with PackedArticleStore(keyword_dir, compression) as store:
+        assert sorted(store.ids()) == ["1", "2", "4", "5"]
+        assert dict(store.iter_articles()) == {"1": "first", "2": "second", "4": "fourth", "5": "fifth"}
+
+
+def test_records_missing_from_index_are_recovered(tmp_path):
+    keyword_dir = str(tmp_path)
+    with PackedArticleStore(keyword_dir, "none") as store:
+        store.put("1", "first")
+        store.put("2", "second")
+    index_path = os.path.join(keyword_dir, INDEX_FILE_NAME)
+    with open(index_path, 'rb') as f:
+        lines = f.readlines()
+    with open(index_path, 'wb') as f:  # 세그먼트는 썼지만 인덱스는 쓰지 못하고 끊겼다.
+        f.write(lines[0])
+
+    with PackedArticleStore(keyword_dir, "none") as store:
+        assert store.get("2") == "second"
+        store.put("3", "third")
+    with PackedArticleStore(keyword_dir, "none") as store:
+        assert sorted(store.ids()) == ["1", "2", "3"]
@@ -0,0 +1,61 @@
+import os
+
+from cnbc_crawler.checkpoint import CheckpointJournal
+from cnbc_crawler.page_log import PageLogWriter, iter_page_log, iter_page_log_pages
+
+
+def get_infos(page: int):
+    return [{"id": f"{page}{index}", "title": f"page {page}"} for index in range(3)]
+
+
+def test_page_log_drops_torn_line_and_later_pages(tmp_path):
+    path = str(tmp_path / "Amazon.ndjson")
+    with PageLogWriter(path, keep_page=0) as page_log:
+        for page in range(1, 5):
+            page_log.append_page(page, get_infos(page))
+    with open(path, 'ab') as f:
+        f.write(b'{"page": 5, "info": {"id": "5')  # 쓰다가 끊긴 줄
+
+    # 2페이지까지 끝난 것으로 보고 이어받는다: 3, 4 페이지와 끊긴 줄은 잘린다.
+    with PageLogWriter(path, keep_page=2) as page_log:
+        page_log.append_page(3, get_infos(3))
+    assert [page for page, infos in iter_page_log_pages(path)] == [1, 2, 3]
+    assert sum(1 for _ in iter_page_log(path)) == 9
+    with open(path, 'rb') as f:
+        assert f.read().endswith(b"\n")
+
+
+def test_page_log_reports_flushed_pages(tmp_path):
+    flushed = []
+    path = str(tmp_path / "Amazon.ndjson")
+    page_log = PageLogWriter(path, keep_page=0, flush_pages=2,
+                             on_flush=lambda page, array: flushed.append(page))
+    page_log.append_page(1, get_infos(1))
+    assert flushed == []
+    page_log.append_page(2, get_infos(2))
+    assert flushed == [1, 2]
+    page_log.append_page(3, get_infos(3))
+    page_log.close()
+    assert flushed == [1, 2, 3]
+
+
+def test_checkpoint_ignores_torn_and_corrupt_tail(tmp_path):
+    journal = CheckpointJournal(str(tmp_path))
+    for page in range(1, 4):
+        journal.append_page(page, [f"{page}0", f"{page}1"])
+    journal.close()
+    with open(journal.path, 'rb') as f:
+        lines = f.readlines()
+    # 마지막 줄은 crc 가 맞지 않게 바꾸고, 줄바꿈 없는 조각을 붙인다.
+    lines[-1] = lines[-1].replace(b'"30"', b'"39"')
+    with open(journal.path, 'wb') as f:
+        f.write(b"".join(lines) + b'0000 {"page":4')
+
+    journal = CheckpointJournal(str(tmp_path))
+    assert journal.last_completed_page() == 2
+    assert journal.completed_ids() == {"10", "11", "20", "21"}
+    journal.append_page(3, ["30"])  # 쓸 때 끊긴 꼬리를 먼저 잘라낸다.
+    journal.close()
+    assert CheckpointJournal(str(tmp_path)).completed_pages() == {1, 2, 3}
+    with open(journal.path, 'rb') as f:
+        assert len(f.readlines()) == 3
@@ -0,0 +1,48 @@
+import time
+
+from cnbc_crawler.rate_limiter import HostLimiter
+
+
+def test_concurrent_throttles_back_off_once():
+    # 동시에 보낸 요청 8개가 한꺼번에 429 를 받아도 속도는 한 번만 줄인다.
+    limiter = HostLimiter(rate=5.0)
+    for _ in range(8):
+        limiter.report(429, 0.1)
+    assert limiter.rate == 2.5
+    assert limiter.consecutive_throttles == 1
+    assert limiter.get_stats()["throttle_events"] == {"429": 8}
+    assert limiter.get_stats()["backoff_remaining"] <= 2.0
+
+
+def test_throttle_after_backoff_halves_again():
+    limiter = HostLimiter(rate=5.0)
+    limiter.report(429, 0.01)
+    limiter.backoff_until = 0  # 백오프가 끝났다.
+    time.sleep(0.02)
+    limiter.report(429, 0.005)  # 백오프 뒤에 보낸 요청
+    assert limiter.rate == 1.25
+    assert limiter.consecutive_throttles == 2
+
+
+def test_connection_errors_do_not_cut_rate():
+    limiter = HostLimiter(rate=5.0)
+    for _ in range(4):
+        limiter.report(0, 0.1)
+    limiter.report(500, 0.1)
+    assert limiter.rate == 5.0
+    assert limiter.consecutive_errors == 1
+    assert limiter.consecutive_throttles == 0
+
+
+def test_retry_after_on_5xx_is_a_throttle():
+    limiter = HostLimiter(rate=5.0)
+    limiter.report(503, 0.1, retry_after=3)
+    assert limiter.rate == 2.5
+    assert limiter.get_stats()["backoff_remaining"] > 2.5
+
+
+def test_success_increases_rate():
+    limiter = HostLimiter(rate=1.0, max_rate=1.25)
+    for _ in range(5):
+        limiter.report(200, 0.05)
+    assert limiter.rate == 1.25
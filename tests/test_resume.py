@@ -0,0 +1,62 @@
+import importlib.util
+import json
+import os
+
+import pytest
+
+from cnbc_crawler.config import CrawlConfig
+from cnbc_crawler.crawler import crawl_keyword, get_continue_start_page
+from cnbc_crawler.page_log import get_page_log_path
+from cnbc_crawler.session import CrawlSession
+
+# bs4 는 기사마다 수십 ms 가 걸려서 테스트가 느려진다. selectolax 가 있으면 그것으로 파싱한다.
+PARSER_BACKEND = "selectolax" if importlib.util.find_spec("selectolax") else "bs4"
+
+
+def get_config(**changes) -> CrawlConfig:
+    return CrawlConfig(save_format="json", rate_limit=None, page_log_flush_pages=1, parser_backend=PARSER_BACKEND,
+                       **changes)
+
+
+def read_ids(project_dir: str):
+    with open(os.path.join(project_dir, "Amazon", "info_Amazon.json"), 'r') as f:
+        return [info["id"] for info in json.load(f)]
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.mark.parametrize("article_store", ["files", "packed"])
+def test_resume_after_partial_page_log(mock_server, tmp_path, article_store):
+    config = get_config(article_store=article_store)
+    clean_dir = str(tmp_path / "clean")
+    with CrawlSession(config, clean_dir) as session:
+        session.crawl_pages("Amazon", 1, 6)
+    expected = read_ids(clean_dir)
+    assert len(expected) > 30
+
+    # 3페이지를 저장한 뒤 중단된 실행: 페이지 로그 끝에 쓰다가 끊긴 줄도 남긴다.
+    project_dir = str(tmp_path / "resume")
+    pages = []
+
+    def on_progress(keyword, page, target_page, article_count):
+        pages.append(page)
+        if len(pages) == 3:
+            raise Interrupted()
+
+    with pytest.raises(Interrupted):
+        crawl_keyword("Amazon", project_dir, config.to_setting(), None, 1, 6,
+                      on_progress=on_progress, show_progress_bar=False)
+    page_log_path = get_page_log_path(os.path.join(project_dir, "Amazon", "info_logs"), "Amazon")
+    with open(page_log_path, 'ab') as f:
+        f.write(b'{"page": 4, "info": {"id": ')
+
+    start_page = get_continue_start_page("Amazon", project_dir)
+    assert start_page == 4
+    with CrawlSession(config, project_dir) as session:
+        session.crawl_pages("Amazon", start_page, 6)
+    assert read_ids(project_dir) == expected
+    if article_store == "files":
+        assert sorted(os.listdir(os.path.join(project_dir, "Amazon", "articles"))) == \
+            sorted(f"{id}.txt" for id in expected)
@@ -0,0 +1,49 @@
+import time
+
+from cnbc_crawler.work_queue import WorkQueue, split_tasks
+
+
+def test_split_tasks():
+    assert split_tasks(1, 45, 20) == [(1, 20), (21, 40), (41, 45)]
+
+
+def test_expired_lease_is_taken_over(tmp_path):
+    with WorkQueue(str(tmp_path / "queue.sqlite")) as queue:
+        queue.add_keyword("Amazon", 40, [(1, 20), (21, 40)])
+        first = queue.claim("a", lease_seconds=0.05)
+        second = queue.claim("b", lease_seconds=60)
+        assert (first.first_page, second.first_page) == (1, 21)
+        assert queue.claim("c", lease_seconds=60) is None
+
+        time.sleep(0.1)  # a 는 heartbeat 없이 임대가 끝났다.
+        retaken = queue.claim("c", lease_seconds=60)
+        assert (retaken.id, retaken.attempts) == (first.id, 2)
+        assert not queue.heartbeat(first.id, "a")
+        assert queue.heartbeat(retaken.id, "c")
+
+        assert queue.complete(retaken.id, "c", 12)
+        assert not queue.complete(retaken.id, "a", 10)  # 늦게 끝낸 작업자는 기사 수를 바꾸지 않는다.
+        assert queue.complete(second.id, "b", 8)
+        assert queue.articles() == 20
+        assert queue.finished_keywords() == ["Amazon"]
+
+
+def test_task_fails_after_max_attempts(tmp_path):
+    with WorkQueue(str(tmp_path / "queue.sqlite"), max_attempts=2) as queue:
+        queue.add_keyword("Amazon", 20, [(1, 20)])
+        task = queue.claim("a")
+        queue.fail(task.id, "a", "boom")
+        task = queue.claim("b", lease_seconds=0.05)
+        assert task.attempts == 2
+        time.sleep(0.1)
+        assert queue.claim("c") is None
+        assert queue.counts() == {"failed": 1}
+        assert queue.failed_keywords() == {"Amazon": "boom"}
+
+
+def test_release_does_not_count_as_attempt(tmp_path):
+    with WorkQueue(str(tmp_path / "queue.sqlite")) as queue:
+        queue.add_keyword("Amazon", 20, [(1, 20)])
+        task = queue.claim("a")
+        queue.release(task.id, "a")
+        assert queue.claim("b").attempts == 1